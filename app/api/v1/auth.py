@@ -1,11 +1,18 @@
+import secrets
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from typing import AsyncGenerator, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
+from jose import jwt, JWTError, ExpiredSignatureError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import OperationalError
-from db.session import get_db
+from db.session import get_async_db
+from db.replica import async_read_session
 from db.models import Auth, User
 from schemas.auth import Token, TokenData
+from core.config import AUTH_VERIFY_MODE, INTERNAL_API_KEY
+from core.security import UserSnapshot, cache_token, token_cache, revoked_tokens
 import logging
 import os
 
@@ -20,12 +27,37 @@ router = APIRouter()
 # 토큰을 Bearer 방식으로 받아오는 OAuth2 스키마
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# internal API 접근 키 헤더
+internal_key_header = APIKeyHeader(name="X-Internal-Key", auto_error=False)
+
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
 
 
-async def validate_token(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+# 인증된 사용자 id를 요청 상태에 남겨 둠 (쓰기 요청 후 같은 사용자의 조회를 primary로 보내는 데 사용)
+async def validate_token(request: Request, db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)):
+    user = await authenticate_token(db, token)
+    request.state.user_id = user.id
+    return user
+
+
+# internal API 접근 확인 (INTERNAL_API_KEY가 없으면 internal API 자체를 사용하지 않음)
+def verify_internal_key(key: Optional[str] = Depends(internal_key_header)):
+    if not INTERNAL_API_KEY:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if key is None or not secrets.compare_digest(key.encode(), INTERNAL_API_KEY.encode()):
+        logger.error("Invalid internal API key")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid internal API key")
+
+
+# 조회 전용 DB 세션 (replica가 설정되어 있고 지연이 작으며 최근에 쓰기가 없었던 사용자면 replica 사용)
+async def get_async_read_db(current_user: UserSnapshot = Depends(validate_token)) -> AsyncGenerator[AsyncSession, None]:
+    async with async_read_session(current_user.id) as db:
+        yield db
+
+
+async def authenticate_token(db: AsyncSession, token: str):
     # 토큰을 확인하는 로그 추가
     logger.info(f"Received token: {token}")
 
@@ -35,8 +67,18 @@ async def validate_token(db: Session = Depends(get_db), token: str = Depends(oau
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+    # jwt 모드: 서명과 만료를 로컬에서 검증하고 auth 테이블은 조회하지 않음
+    if AUTH_VERIFY_MODE == "jwt":
+        return await verify_token_stateless(db, token, credentials_exception)
+
+    # 캐시에서 토큰 조회 (캐시 hit 시 DB 조회 없이 반환)
+    cached_user = token_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
     # 데이터베이스에서 토큰 조회
-    auth_entry = db.query(Auth).filter(Auth.access_token == token).first()
+    result = await db.execute(select(Auth).where(Auth.access_token == token))
+    auth_entry = result.scalars().first()
     
     if auth_entry is None:
         # 토큰 조회 실패 시 로그 기록
@@ -54,7 +96,49 @@ async def validate_token(db: Session = Depends(get_db), token: str = Depends(oau
         )
     
     # 여기서 User 객체 반환
-    user = db.query(User).filter(User.id == auth_entry.user_id).first()
+    return await load_user_snapshot(db, token, auth_entry.user_id, auth_entry.access_expired_at)
+
+
+async def verify_token_stateless(db: AsyncSession, token: str, credentials_exception: HTTPException):
+    # 폐기 목록은 캐시보다 먼저 확인 (캐시에 남아 있는 토큰도 즉시 거부)
+    if revoked_tokens.is_revoked(token):
+        logger.error(f"Token revoked: {token}")
+        raise credentials_exception
+
+    cached_user = token_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except ExpiredSignatureError:
+        logger.error(f"Token expired: {token}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has expired",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except JWTError as e:
+        logger.error(f"Token validation failed: {e}")
+        raise credentials_exception
+
+    # refresh 토큰 등 access 토큰이 아닌 토큰은 거부 (서명은 같은 키로 되어 있음)
+    if payload.get("typ") != "access":
+        logger.error(f"Not an access token: {token}")
+        raise credentials_exception
+
+    user_id = payload.get("user_id")
+    if user_id is None:
+        logger.error(f"user_id claim missing in token: {token}")
+        raise credentials_exception
+
+    # 캐시 miss 시에만 사용자 정보를 기본 키로 조회
+    return await load_user_snapshot(db, token, user_id, datetime.utcfromtimestamp(payload["exp"]))
+
+
+async def load_user_snapshot(db: AsyncSession, token: str, user_id: int, expired_at: datetime):
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalars().first()
     if user is None:
         logger.error(f"User not found for token: {token}")
         raise HTTPException(
@@ -63,5 +147,9 @@ async def validate_token(db: Session = Depends(get_db), token: str = Depends(oau
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    logger.info(f"Returning user object: {user} of type {type(user)}")
-    return user
\ No newline at end of file
+    # 세션과 분리된 스냅샷을 캐시에 저장 (토큰 만료 시각까지만 유지)
+    snapshot = UserSnapshot.from_user(user)
+    cache_token(token, snapshot, expired_at)
+
+    logger.info(f"Returning user object: {snapshot} of type {type(snapshot)}")
+    return snapshot
\ No newline at end of file
@@ -1,14 +1,24 @@
 # history.py
+import base64
+import binascii
+import json
 from decimal import Decimal
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from db.session import get_db
-from db.crud import create_history, get_meals_by_user_and_date
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import HISTORY_PAGE_SIZE, HISTORY_PAGE_MAX_SIZE, HISTORY_BATCH_MAX_SIZE
+from db.session import get_async_db
+from db.replica import async_read_session
+from db.crud import save_history_and_get_meals, create_histories, get_meals_by_user_and_days, \
+    get_rollups_by_range, ROLLUP_PERIODS, stream_meal_history, to_meal_row
+from services.food_service import ensure_food_catalog
+from services.meal_type_service import ensure_meal_type_registry
 from db.models import History, Food_List, Meal_Type
-from schemas.history import HistoryCreateRequest
+from schemas.history import HistoryCreateRequest, HistoryBatchCreateRequest
 from datetime import datetime
-from api.v1.auth import validate_token
+from api.v1.auth import validate_token, get_async_read_db
 from db.models import User
 import logging
 
@@ -45,10 +55,42 @@ def fix_date_format(date_str):
         raise ValueError(f"Invalid date format: {str(e)}")
 
 
+def meal_to_dict(meal):
+    """MealRow를 응답용 dict로 변환"""
+    return {
+        "history_id": meal.history_id,
+        "meal_type_name": meal.meal_type_name,
+        "category_name": meal.category_name,
+        "food_kcal": decimal_to_float(meal.food_kcal),
+        "food_car": round(decimal_to_float(meal.food_car)),
+        "food_prot": round(decimal_to_float(meal.food_prot)),
+        "food_fat": round(decimal_to_float(meal.food_fat)),
+        "date": datetime_to_string(meal.date)
+    }
+
+# 페이지 커서: 마지막 행의 (date, history_id)를 base64로 감싼 불투명한 문자열
+def encode_history_cursor(date: datetime, history_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{date.isoformat()}|{history_id}".encode()).decode()
+
+def decode_history_cursor(cursor: str):
+    try:
+        date, history_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(date), int(history_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+# 한 번에 전송할 식사 기록 수
+HISTORY_STREAM_CHUNK = 100
+
+def dump_json(obj) -> str:
+    # JSONResponse와 같은 형식 (UTF-8 그대로, 공백 없음)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
 @router.post("/save_and_get")
-def save_to_history_and_get_today_history(
+async def save_to_history_and_get_today_history(
     history_data: HistoryCreateRequest,  
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(validate_token)
 ):
     
@@ -69,8 +111,19 @@ def save_to_history_and_get_today_history(
         logger.debug(f"Received history data: {history_data}")
         
         
-        # 새 기록을 데이터베이스에 저장
-        new_history = create_history(
+        # 음식 정보가 없으면 저장하지 않음 (메모리 카탈로그로 확인)
+        if history_data.category_id not in await ensure_food_catalog():
+            return JSONResponse(
+                {
+                    "status": "Not Found",
+                    "status_code": 404,
+                    "detail": "Food category not found"
+                },
+                status_code=404
+            )
+
+        # 하루 기록 수 확인, 저장, 같은 날짜의 식사 목록 조회를 한 문장으로 처리
+        new_history_id, meals = await save_history_and_get_meals(
             db=db,
             current_user=current_user,
             category_id=history_data.category_id,
@@ -78,15 +131,10 @@ def save_to_history_and_get_today_history(
             image_url=history_data.image_url,
             date=history_data.date
         )
-        logger.info(f"New history saved: {new_history}")
-
-
-        # 기록과 음식 정보 조회
-        meals = get_meals_by_user_and_date(db, current_user, history_data.date)
         logger.info(f"Meals retrieved for user {current_user.id} on {history_data.date}: {meals}")
-        
-        # 오늘 기록된 식사 내역이 10개 이상이면 에러 반환
-        if len(meals) >= 10:
+
+        # 오늘 기록된 식사 내역이 이미 최대 개수이면 저장하지 않고 에러 반환
+        if new_history_id is None:
             return JSONResponse(
                 {
                     "status": "Too Many Requests",
@@ -95,22 +143,10 @@ def save_to_history_and_get_today_history(
                 },
                 status_code=429
             )
-    
+        logger.info(f"New history saved: {new_history_id}")
 
         # 응답 데이터 포맷팅
-        meal_list = []
-        for meal in meals:
-            meal_list.append({
-                "history_id": meal.history_id,
-                "meal_type_name": meal.meal_type_name.encode('utf-8').decode('utf-8'),
-                "category_name": meal.category_name.encode('utf-8').decode('utf-8'),
-                "food_kcal": decimal_to_float(meal.food_kcal),
-                "food_car": round(decimal_to_float(meal.food_car)),
-                "food_prot": round(decimal_to_float(meal.food_prot)),
-                "food_fat": round(decimal_to_float(meal.food_fat)),
-
-                "date": datetime_to_string(meal.date)   # datetime을 문자열로 변환
-            })
+        meal_list = [meal_to_dict(meal) for meal in meals]
         logger.info(f"Formatted meal list for response: {meal_list}")
 
             
@@ -126,8 +162,22 @@ def save_to_history_and_get_today_history(
         media_type="application/json; charset=utf-8"  # UTF-8 인코딩을 명시적으로 설정
     )
         
+    except HTTPException as e:
+        # 음식 정보 없음(카탈로그 갱신 전 삭제) 등 crud에서 판단한 오류
+        await db.rollback()
+        logger.error(f"Failed to save history: {e.detail}")
+        return JSONResponse(
+            {
+                "status": "Not Found" if e.status_code == 404 else "Error",
+                "status_code": e.status_code,
+                "detail": e.detail
+            },
+            status_code=e.status_code
+        )
+
     except Exception as e:
-        # 저장 실패 시 에러 처리
+        # 저장 실패 시 에러 처리 (응답을 반환하면 get_async_db가 commit하므로 이미 실행한 저장을 되돌림)
+        await db.rollback()
         logger.error(f"Failed to save history: {e}")
         return JSONResponse(
             {
@@ -139,3 +189,242 @@ def save_to_history_and_get_today_history(
         )
 
 
+# 여러 식사 기록 일괄 저장 (하루치 기록, 오프라인 동기화 등)
+#   전부 저장하거나 전부 저장하지 않으며, 저장한 날짜별 식사 목록을 반환
+@router.post("/save_batch")
+async def save_batch_to_history(
+    batch: HistoryBatchCreateRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(validate_token)
+):
+    items = batch.items
+    if not 1 <= len(items) <= HISTORY_BATCH_MAX_SIZE:
+        return JSONResponse(
+            {
+                "status": "Bad Request",
+                "status_code": 400,
+                "detail": f"items must contain between 1 and {HISTORY_BATCH_MAX_SIZE} meal records."
+            },
+            status_code=400
+        )
+
+    # 저장 전에 음식/식사 종류를 메모리 카탈로그/레지스트리로 확인
+    catalog = await ensure_food_catalog()
+    meal_types = await ensure_meal_type_registry()
+    invalid = [
+        index for index, item in enumerate(items)
+        if item.category_id not in catalog or item.meal_type_id not in meal_types or len(item.image_url) > 255
+    ]
+    if invalid:
+        return JSONResponse(
+            {
+                "status": "Bad Request",
+                "status_code": 400,
+                "detail": f"Invalid category_id, meal_type_id or image_url at items {invalid}."
+            },
+            status_code=400
+        )
+
+    try:
+        saved = await create_histories(db, current_user, items)
+        meals_by_day = await get_meals_by_user_and_days(db, current_user, [row.date.date() for row in saved])
+    except HTTPException as e:
+        logger.error(f"Failed to save history batch: {e.detail}")
+        return JSONResponse(
+            {
+                "status": "Too Many Requests" if e.status_code == 429 else "Error",
+                "status_code": e.status_code,
+                "detail": e.detail
+            },
+            status_code=e.status_code
+        )
+    logger.info(f"{len(saved)} meals saved for user {current_user.id}")
+
+    return JSONResponse(
+        content={
+            "status": "success",
+            "status_code": 201,
+            "detail": {
+                "Wellness_meal_lists": [
+                    {
+                        "date": day.isoformat(),
+                        "Wellness_meal_list": [meal_to_dict(meal) for meal in meals]
+                    }
+                    for day, meals in meals_by_day.items()
+                ]
+            },
+            "message": "meal_list information saved successfully"
+        },
+        media_type="application/json; charset=utf-8"
+    )
+
+
+# 기간별(day/week/month) 영양소 집계 조회 (달력/추세 화면용)
+@router.get("/range")
+async def get_history_range(
+    start: str = Query(...),
+    end: str = Query(...),
+    period: str = Query("day"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(validate_token)
+):
+    try:
+        start_date = datetime.strptime(start, "%Y-%m-%d").date()
+        end_date = datetime.strptime(end, "%Y-%m-%d").date()
+    except ValueError:
+        return JSONResponse(
+            {
+                "status": "Bad Request",
+                "status_code": 400,
+                "detail": "Invalid date format. Please use YYYY-MM-DD."
+            },
+            status_code=400
+        )
+
+    if period not in ROLLUP_PERIODS or start_date > end_date:
+        return JSONResponse(
+            {
+                "status": "Bad Request",
+                "status_code": 400,
+                "detail": f"period must be one of {', '.join(ROLLUP_PERIODS)} and start must not be after end."
+            },
+            status_code=400
+        )
+
+    try:
+        rollups = await get_rollups_by_range(db, current_user.id, period, start_date, end_date)
+    except Exception as e:
+        logger.error(f"Failed to get history range: {e}")
+        return JSONResponse(
+            {
+                "status": "Internal Server Error",
+                "status_code": 500,
+                "detail": "An error occurred while retrieving the information."
+            },
+            status_code=500
+        )
+
+    range_list = [
+        {
+            "period_start": rollup.period_start.isoformat(),
+            "total_kcal": decimal_to_float(rollup.total_kcal),
+            "total_car": decimal_to_float(rollup.total_car),
+            "total_prot": decimal_to_float(rollup.total_prot),
+            "total_fat": decimal_to_float(rollup.total_fat),
+            "meal_count": rollup.meal_count,
+        }
+        for rollup in rollups
+    ]
+
+    return JSONResponse(
+        content={
+            "status": "success",
+            "status_code": 200,
+            "detail": {
+                "period": period,
+                "Wellness_nutrition_range": range_list
+            },
+            "message": "nutrition range retrieved successfully"
+        },
+        media_type="application/json; charset=utf-8"
+    )
+
+
+
+# 서버 측 커서에서 읽은 행을 바로 JSON으로 인코딩해 조금씩 전송 (전체 목록을 메모리에 만들지 않음)
+#   result는 limit + 1개까지 조회한 결과. 마지막 한 행은 다음 페이지가 있는지 확인하는 용도
+async def encode_history_page(result, limit: int):
+    try:
+        catalog = await ensure_food_catalog()
+        meal_types = await ensure_meal_type_registry()
+        yield '{"status":"success","status_code":200,"detail":{"Wellness_meal_list":['.encode()
+
+        count, last, has_more, first = 0, None, False, True
+        async for partition in result.partitions():
+            chunk = []
+            for row in partition:
+                if count == limit:
+                    has_more = True
+                    continue
+                count += 1
+                last = row
+                meal = to_meal_row(row, catalog, meal_types)
+                if meal is not None:
+                    chunk.append(dump_json(meal_to_dict(meal)))
+                if len(chunk) >= HISTORY_STREAM_CHUNK:
+                    yield (("" if first else ",") + ",".join(chunk)).encode()
+                    chunk, first = [], False
+            if chunk:
+                yield (("" if first else ",") + ",".join(chunk)).encode()
+                first = False
+
+        next_cursor = encode_history_cursor(last.date, last.history_id) if has_more else None
+        yield f'],"next_cursor":{dump_json(next_cursor)}}},"message":"meal history retrieved successfully"}}'.encode()
+    except Exception as e:
+        # 이미 응답을 보내기 시작했으므로 상태 코드를 바꿀 수 없음 (잘린 JSON으로 클라이언트가 실패를 알 수 있음)
+        logger.error(f"Failed to stream meal history: {e}")
+        raise
+
+
+# 응답 본문을 만드는 조회 세션을 응답이 소유
+#   클라이언트가 본문을 받기 전에 끊거나 전송 중 오류가 나서 본문 제너레이터가 끝까지 돌지 않아도 세션(연결)을 반환
+class SessionStreamingResponse(StreamingResponse):
+    def __init__(self, content, db: AsyncSession, **kwargs):
+        super().__init__(content, **kwargs)
+        self.db = db
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.db.close()
+
+
+# 전체 식사 기록 조회 (최신순, 커서 기반 페이지네이션)
+#   첫 페이지는 cursor 없이 요청하고, 다음 페이지는 응답의 next_cursor를 그대로 전달
+@router.get("")
+async def get_history_page(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(HISTORY_PAGE_SIZE),
+    current_user: User = Depends(validate_token)
+):
+    if not 1 <= limit <= HISTORY_PAGE_MAX_SIZE:
+        return JSONResponse(
+            {
+                "status": "Bad Request",
+                "status_code": 400,
+                "detail": f"limit must be between 1 and {HISTORY_PAGE_MAX_SIZE}."
+            },
+            status_code=400
+        )
+
+    try:
+        before = decode_history_cursor(cursor) if cursor else None
+    except ValueError as e:
+        logger.error(str(e))
+        return JSONResponse(
+            {
+                "status": "Bad Request",
+                "status_code": 400,
+                "detail": "Invalid cursor."
+            },
+            status_code=400
+        )
+
+    # 응답을 다 보낼 때까지 커서를 유지해야 하므로 요청 의존성(get_async_read_db)과 별도의 조회 전용 세션 사용 (응답이 닫음)
+    db = async_read_session(current_user.id)
+    try:
+        result = await stream_meal_history(db, current_user.id, limit + 1, before)
+    except SQLAlchemyError as e:
+        await db.close()
+        logger.error(f"Failed to get meal history: {e}")
+        return JSONResponse(
+            {
+                "status": "Internal Server Error",
+                "status_code": 500,
+                "detail": "An error occurred while retrieving the information."
+            },
+            status_code=500
+        )
+
+    return SessionStreamingResponse(encode_history_page(result, limit), db, media_type="application/json; charset=utf-8")
@@ -0,0 +1,55 @@
+# /app/api/v1/internal.py
+from fastapi import APIRouter
+from core.security import token_cache
+from db.session import get_async_engine
+from db.pool import pool_status
+from db.replica import replica_status
+from services.food_service import get_food_catalog
+from services.prediction_service import prediction_status
+
+router = APIRouter()
+
+# 토큰 검증 캐시 hit/miss 통계
+@router.get("/token_cache")
+def get_token_cache_stats():
+    return {
+        "status": "success",
+        "status_code": 200,
+        "detail": token_cache.stats(),
+    }
+
+# DB 커넥션 풀 상태(사용 중/유휴/overflow)와 checkout 대기 시간 통계
+@router.get("/db_pool")
+def get_db_pool_stats():
+    return {
+        "status": "success",
+        "status_code": 200,
+        "detail": pool_status(get_async_engine().pool),
+    }
+
+# food_list 메모리 카탈로그 크기/버전
+@router.get("/food_catalog")
+def get_food_catalog_stats():
+    return {
+        "status": "success",
+        "status_code": 200,
+        "detail": get_food_catalog().stats(),
+    }
+
+# replica 복제 지연과 조회 라우팅(replica/primary) 결과 통계
+@router.get("/db_replica")
+def get_db_replica_stats():
+    return {
+        "status": "success",
+        "status_code": 200,
+        "detail": replica_status(),
+    }
+
+# 이미지 분류 결과 캐시 hit/miss와 중복 이미지라 생략한 S3 업로드/바이트 수
+@router.get("/prediction_cache")
+def get_prediction_cache_stats():
+    return {
+        "status": "success",
+        "status_code": 200,
+        "detail": prediction_status(),
+    }
@@ -1,11 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import jwt, JWTError
 from schemas.user import UserLogin
-from db.session import get_db
+from db import crud
+from db.session import get_async_db, after_commit
 from db.models import Auth, User
+from core.security import UserSnapshot, invalidate_user_tokens, revoke_access_token
+from api.v1.auth import oauth2_scheme, validate_token
 import os
+import secrets
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 import logging
@@ -25,15 +29,18 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# 날짜 및 시간 형식을 'YYYY-MM-DD HH:MM:SS'로 포맷
+# 날짜 및 시간을 'YYYY-MM-DD HH:MM:SS' 정밀도(초 단위)로 맞춤
+# (asyncpg는 문자열이 아닌 datetime 객체를 요구)
 def format_datetime(dt: datetime):
-    return dt.strftime("%Y-%m-%d %H:%M:%S")
+    return dt.replace(microsecond=0)
 
 # Access 토큰 생성
 def create_access_token(data: dict, expires_delta: int):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=expires_delta)
-    to_encode.update({"exp": expire})
+    # typ: jwt 모드에서 refresh 토큰을 access 토큰으로 쓰지 못하도록 구분
+    # jti: 같은 초에 다시 발급해도 폐기된 토큰과 같은 문자열이 되지 않도록 토큰마다 다른 값
+    to_encode.update({"exp": expire, "typ": "access", "jti": secrets.token_urlsafe(8)})
     token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     logger.info(f"Access Token 생성 완료: {token}")
     return token
@@ -42,7 +49,7 @@ def create_access_token(data: dict, expires_delta: int):
 def create_refresh_token(data: dict, expires_delta: int):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=expires_delta)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "typ": "refresh", "jti": secrets.token_urlsafe(8)})
     token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     logger.info(f"Refresh Token 생성 완료: {token}")
     return token
@@ -66,12 +73,55 @@ def verify_refresh_token(token: str, expiry_time: datetime):
         raise HTTPException(
             status_code=401, detail="Refresh token invalid or expired")
 
+# access/refresh 토큰을 새로 발급해 auth 행에 upsert (사용자당 한 행 유지)
+async def issue_new_tokens(db: AsyncSession, db_user: User):
+    access_token = create_access_token(
+        data={"user_id": db_user.id, "user_email": db_user.email},
+        expires_delta=ACCESS_TOKEN_EXPIRE_MINUTES
+    )
+    refresh_token = create_refresh_token(
+        data={"user_id": db_user.id, "user_email": db_user.email},
+        expires_delta=REFRESH_TOKEN_EXPIRE_DAYS
+    )
+
+    await crud.upsert_auth(
+        db,
+        user_id=db_user.id,
+        access_token=access_token,
+        refresh_token=refresh_token,
+        access_expired_at=datetime.utcnow().replace(microsecond=0) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+        refresh_expired_at=datetime.utcnow().replace(microsecond=0) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+    after_commit(db, lambda: invalidate_user_tokens(db_user.id))
+
+    logger.info(f"Upserted auth entry for user_id {db_user.id}")
+    return {
+        "status": "success",
+        "status_code": 201,
+        "detail": {
+            "wellness_info": {
+                "access_token": access_token,
+                "refresh_token": refresh_token,
+                "token_type": "bearer",
+                "user_email": db_user.email,
+                "user_nickname": db_user.nickname,
+                "user_birthday": db_user.birthday,
+                "user_gender": db_user.gender,
+                "user_height": db_user.height,
+                "user_weight": db_user.weight,
+                "user_age": db_user.age,
+            }
+        },
+        "message": "New access and refresh tokens issued."
+    }
+
 @router.post("/login")
-async def login(user: UserLogin, db: Session = Depends(get_db)):
+async def login(user: UserLogin, db: AsyncSession = Depends(get_async_db)):
     logger.info(f"로그인 시도: {user.email}, {user.nickname}")
 
     # 사용자 확인
-    db_user = db.query(User).filter(User.email == user.email).first()
+    result = await db.execute(select(User).where(User.email == user.email))
+    db_user = result.scalars().first()
     if db_user:
         logger.info(f"DB User found: {db_user.email}, ID: {db_user.id}")
     else:
@@ -79,103 +129,66 @@ async def login(user: UserLogin, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="User not found")
 
     # auth 테이블에서 사용자 토큰 확인
-    auth_entry = db.query(Auth).filter(Auth.user_id == db_user.id).first()
+    result = await db.execute(select(Auth).where(Auth.user_id == db_user.id))
+    auth_entry = result.scalars().first()
 
     if auth_entry:
         # 엑세스 토큰 만료 확인
         if is_access_token_expired(auth_entry.access_expired_at):
+            # refresh 토큰 검증 (만료/위조된 경우에만 새로 발급하고, 그 밖의 오류는 요청 실패)
             try:
-                # refresh 토큰 검증
                 verify_refresh_token(auth_entry.refresh_token, auth_entry.refresh_expired_at)
+            except HTTPException:
+                # 엑세스 토큰과 리프레시 토큰이 모두 만료된 경우 새로 발급 (기존 토큰은 폐기)
+                await revoke_access_token(db, auth_entry.access_token)
+                return await issue_new_tokens(db, db_user)
+
+            # refresh 토큰이 유효하므로 access 토큰만 재발급
+            access_token = create_access_token(
+                data={"user_id": db_user.id, "user_email": db_user.email},
+                expires_delta=ACCESS_TOKEN_EXPIRE_MINUTES
+            )
+            replaced_token = auth_entry.access_token
+            auth_entry.access_token = access_token
+            auth_entry.access_created_at = format_datetime(datetime.utcnow())
+            auth_entry.access_expired_at = format_datetime(
+                datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+            )
+            logger.info(f"access_created_at: {auth_entry.access_created_at}, access_expired_at: {auth_entry.access_expired_at}")
+            
+            # commit은 요청이 끝날 때 get_async_db에서 수행 (DB 오류는 그대로 올려 get_async_db에서 rollback)
+            await db.flush()
+            # 교체된 토큰은 jwt 모드에서도 더 이상 쓰지 못하도록 폐기
+            await revoke_access_token(db, replaced_token)
+
+            # 재발급된 토큰으로 교체되었으므로 commit 후 기존 토큰 캐시 무효화
+            after_commit(db, lambda: invalidate_user_tokens(db_user.id))
 
-                # refresh 토큰이 유효하므로 access 토큰만 재발급
-                access_token = create_access_token(
-                    data={"user_id": db_user.id, "user_email": db_user.email},
-                    expires_delta=ACCESS_TOKEN_EXPIRE_MINUTES
-                )
-                auth_entry.access_token = access_token
-                auth_entry.access_created_at = format_datetime(datetime.utcnow())
-                auth_entry.access_expired_at = format_datetime(
-                    datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-                )
-                logger.info(f"access_created_at: {auth_entry.access_created_at}, access_expired_at: {auth_entry.access_expired_at}")
-                
-                try:
-                    db.commit()
-                    
-                except SQLAlchemyError as e:
-                    db.rollback()
-                    logger.error(f"failed to commit to DB: {e}")
-                    raise HTTPException(status_code=500, detail="Failed to issue new token")
-                    
-                return {
-                    "status": "success",
-                    "status_code": 200,
-                    "detail": {
-                        "wellness_info": {
-                            "access_token": auth_entry.access_token,
-                            "refresh_token": auth_entry.refresh_token,  # refresh 토큰은 유지
-                            "token_type": "bearer",
-                            "user_email": db_user.email,
-                            "user_nickname": db_user.nickname,
-                            "user_birthday": db_user.birthday,
-                            "user_gender": db_user.gender,
-                            "user_height": db_user.height,
-                            "user_weight": db_user.weight,
-                            "user_age": db_user.age,
-                        }
-                    },
-                    "message": "Access token renewed."
-                }
+            return {
+                "status": "success",
+                "status_code": 200,
+                "detail": {
+                    "wellness_info": {
+                        "access_token": auth_entry.access_token,
+                        "refresh_token": auth_entry.refresh_token,  # refresh 토큰은 유지
+                        "token_type": "bearer",
+                        "user_email": db_user.email,
+                        "user_nickname": db_user.nickname,
+                        "user_birthday": db_user.birthday,
+                        "user_gender": db_user.gender,
+                        "user_height": db_user.height,
+                        "user_weight": db_user.weight,
+                        "user_age": db_user.age,
+                    }
+                },
+                "message": "Access token renewed."
+            }
 
-            except HTTPException:
-                # 엑세스 토큰과 리프레시 토큰이 모두 만료된 경우 새로 발급
-                access_token = create_access_token(
-                    data={"user_id": db_user.id, "user_email": db_user.email},
-                    expires_delta=ACCESS_TOKEN_EXPIRE_MINUTES
-                )
-                refresh_token = create_refresh_token(
-                    data={"user_id": db_user.id, "user_email": db_user.email},
-                    expires_delta=REFRESH_TOKEN_EXPIRE_DAYS
-                )
-
-                # auth 테이블에 새 토큰 저장
-                new_auth_entry = Auth(
-                    user_id=db_user.id,
-                    access_token=access_token,
-                    refresh_token=refresh_token,
-                    access_created_at=format_datetime(datetime.utcnow()),
-                    access_expired_at=format_datetime(
-                        datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-                    ),
-                    refresh_created_at=format_datetime(datetime.utcnow()),
-                    refresh_expired_at=format_datetime(
-                        datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-                    ),
-                )
-                db.add(new_auth_entry)
-                db.commit()
-
-                logger.info(f"Committing new auth entry for user_id {db_user.id}")
-                return {
-                    "status": "success",
-                    "status_code": 201,
-                    "detail": {
-                        "wellness_info": {
-                            "access_token": new_auth_entry.access_token,
-                            "refresh_token": new_auth_entry.refresh_token,
-                            "token_type": "bearer",
-                            "user_email": db_user.email,
-                            "user_nickname": db_user.nickname,
-                            "user_birthday": db_user.birthday,
-                            "user_gender": db_user.gender,
-                            "user_height": db_user.height,
-                            "user_weight": db_user.weight,
-                            "user_age": db_user.age,
-                        }
-                    },
-                    "message": "New access and refresh tokens issued."
-                }
+        elif jwt.get_unverified_claims(auth_entry.access_token).get("typ") != "access":
+            # typ claim이 생기기 전에 발급된 토큰은 jwt 모드에서 거부되므로 만료 전이라도 새로 발급 (기존 토큰은 폐기)
+            logger.info(f"Access token without typ claim for user_id: {db_user.id}, issuing new tokens")
+            await revoke_access_token(db, auth_entry.access_token)
+            return await issue_new_tokens(db, db_user)
 
         else:
             # 엑세스 토큰이 아직 유효한 경우
@@ -201,5 +214,27 @@ async def login(user: UserLogin, db: Session = Depends(get_db)):
             }
 
     else:
-        logger.error(f"No auth entry found for user_id: {db_user.id}")
-        raise HTTPException(status_code=400, detail="No auth entry found.")
+        # 만료된 auth 행이 정리(sweep_expired_auth)되었거나 토큰이 없는 사용자는 새로 발급
+        logger.info(f"No auth entry found for user_id: {db_user.id}, issuing new tokens")
+        return await issue_new_tokens(db, db_user)
+
+
+# 로그아웃: 현재 access token 폐기 (db 모드는 auth 행의 만료 시각, jwt 모드는 폐기 목록으로 거부)
+#   refresh 토큰은 유지되므로 다음 로그인에서 access 토큰만 재발급
+@router.post("/logout")
+async def logout(
+    token: str = Depends(oauth2_scheme),
+    current_user: UserSnapshot = Depends(validate_token),
+    db: AsyncSession = Depends(get_async_db)
+):
+    await crud.expire_access_token(db, current_user.id, token)
+    await revoke_access_token(db, token)
+    after_commit(db, lambda: invalidate_user_tokens(current_user.id))
+
+    logger.info(f"Logged out user_id: {current_user.id}")
+    return {
+        "status": "success",
+        "status_code": 200,
+        "detail": "Access token revoked.",
+        "message": "Logged out successfully."
+    }
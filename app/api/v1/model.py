@@ -1,41 +1,80 @@
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, status
-import requests
-from sqlalchemy.orm import Session
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
 from api.v1.auth import validate_token
-from db.session import get_db
-from db.crud import get_food_by_category, get_recommend_by_user
-from utils.image_processing import extract_exif_data, determine_meal_type
-from utils.s3 import upload_image_to_s3
+from db.session import get_async_db
+from db.crud import get_recommend_by_user
+from services.food_service import ensure_food_catalog
+from services.meal_type_service import ensure_meal_type_registry, OTHER
+from services.prediction_service import prediction_cache, upload_stats
+from utils.image_processing import (
+    extract_exif_data, determine_meal_type, sniff_image_type, make_derived_images, IMAGE_EXTENSIONS,
+)
+from utils.s3 import (
+    upload_stream_to_s3_if_absent_async, upload_image_to_s3_if_absent_async, check_upload_size, hash_stream, object_url,
+)
+from utils.model_client import predict_image_url
 import mimetypes  # mimetypes 모듈 추가
-from io import BytesIO
+import asyncio
+import logging
 import os
-import uuid
+import time
 import datetime
 from fastapi.responses import JSONResponse
+from PIL import UnidentifiedImageError
 from decimal import Decimal
 from db import models
+from core.config import (
+    MAX_UPLOAD_BYTES, IMAGE_HEADER_BYTES, MODEL_IMAGE_SIZE, THUMBNAIL_SIZE, STORE_ORIGINAL_IMAGE,
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 # 허용된 이미지 파일 형식 (MIME 타입)
 ALLOWED_MIME_TYPES = ["image/jpeg", "image/png", "image/jpg"]
 
+# 업로드 크기 제한을 넘은 경우의 응답
+def upload_too_large_response(detail: str) -> JSONResponse:
+    return JSONResponse(
+        {
+            "status": "Payload Too Large",
+            "status_code": 413,
+            "detail": detail
+        },
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    )
+
 # Decimal 타입을 float으로 변환하는 함수
 def decimal_to_float(obj):
     if isinstance(obj, Decimal):
         return float(obj)
     raise TypeError
 
+# 단계별 소요 시간(ms)을 timings[name]에 기록하며 실행
+async def timed(name: str, awaitable, timings: dict):
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[name] = (time.perf_counter() - start) * 1000
+
+# 단계별 소요 시간을 Server-Timing 헤더 형식으로 변환
+def stage_timing(timings: dict) -> str:
+    return ", ".join(f"{name};dur={duration:.2f}" for name, duration in timings.items())
+
 @router.post("/predict")
 async def classify_image(
     current_user: models.User = Depends(validate_token),  # 토큰 검증 추가
     file: UploadFile = File(...), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
+    timings = {}
+    # 토큰 검증(캐시 miss)에서 시작한 트랜잭션을 끝내 해시/S3 업로드/모델 호출 동안 연결을 풀에 반환
+    # (권장 영양소는 추론이 끝난 뒤 새 트랜잭션에서 조회)
+    await db.commit()
     try:
-        file_bytes = await file.read()
-        file_extension = file.filename.split(".")[-1]
-        unique_file_name = f"{uuid.uuid4()}.{file_extension}"
         bucket_name = os.getenv("BUCKET_NAME", "default_bucket_name")
         
         # MIME 타입 확인을 위해 파일 확장자를 기반으로 MIME 타입을 추론
@@ -51,66 +90,139 @@ async def classify_image(
                 },
                 status_code=status.HTTP_403_FORBIDDEN
             )
-        # 이미지 S3 업로드 처리
+
+        # multipart 파싱 때 기록된 크기로 먼저 확인 (업로드 중에도 읽은 크기로 다시 확인)
         try:
-            image_url = upload_image_to_s3(BytesIO(file_bytes), bucket_name, unique_file_name)
-        except Exception as e:
+            check_upload_size(file.size or 0, MAX_UPLOAD_BYTES)
+        except HTTPException as e:
+            return upload_too_large_response(e.detail)
+
+        # 파일 앞부분만 읽어 실제 내용이 JPEG/PNG인지 확인 (EXIF도 이 부분에서 추출)
+        header = await timed("read", file.read(IMAGE_HEADER_BYTES), timings)
+        mime_type = sniff_image_type(header)
+        if mime_type is None:
             return JSONResponse(
                 {
-                    "status": "Bad Request",
+                    "status": "ForBidden",
                     "status_code": 403,
-                    "detail": f"failed to upload image to s3: {str(e)}"
+                    "detail": "Invalid file type. Allowed types: jpg, jpeg, png."
                 },
                 status_code=status.HTTP_403_FORBIDDEN
             )
-        
-        # EXIF 데이터에서 날짜 추출
-        date = extract_exif_data(file_bytes)
+
+        # 내용 해시로 S3 객체 키를 정함 (같은 사진은 같은 키, 나머지 부분은 spool 파일에서 청크 단위로 읽음)
+        try:
+            digest, file_size = await timed("hash", asyncio.to_thread(hash_stream, file.file, header, MAX_UPLOAD_BYTES), timings)
+        except HTTPException as e:
+            return upload_too_large_response(e.detail)
+        file_name = f"{digest}.{IMAGE_EXTENSIONS[mime_type]}"
+        # 모델 입력용 축소 이미지와 썸네일 키 (크기 설정이 바뀌면 다른 키)
+        model_image_name = f"{digest}_{MODEL_IMAGE_SIZE}.jpg" if MODEL_IMAGE_SIZE else None
+        thumbnail_name = f"{digest}_thumb{THUMBNAIL_SIZE}.jpg" if MODEL_IMAGE_SIZE else None
+        store_original = STORE_ORIGINAL_IMAGE or not MODEL_IMAGE_SIZE
+        image_url = object_url(bucket_name, file_name if store_original else model_image_name)
+        model_image_url = object_url(bucket_name, model_image_name) if model_image_name else image_url
+        thumbnail_url = object_url(bucket_name, thumbnail_name) if thumbnail_name else None
+
+        # 이전에 분류한 사진이면 S3 업로드와 모델 호출 없이 캐시된 결과 사용
+        category_id = prediction_cache.get(image_url)
+        if category_id is not None:
+            upload_stats.record(file_size, uploaded=False)
+            date = await timed("exif", asyncio.to_thread(extract_exif_data, header), timings)
+        else:
+            # 저장할 객체: (timing 이름, 업로드 코루틴, 크기). 같은 키의 객체가 이미 있으면 업로드 생략
+            objects = []
+            if MODEL_IMAGE_SIZE:
+                try:
+                    derived = await timed("resize", asyncio.to_thread(make_derived_images, file.file, MODEL_IMAGE_SIZE, THUMBNAIL_SIZE), timings)
+                except (UnidentifiedImageError, OSError) as e:
+                    return JSONResponse(
+                        {
+                            "status": "ForBidden",
+                            "status_code": 403,
+                            "detail": f"invalid image format: {str(e)}"
+                        },
+                        status_code=status.HTTP_403_FORBIDDEN
+                    )
+                objects.append(("s3_model_image", upload_image_to_s3_if_absent_async(
+                    derived.model_image, bucket_name, model_image_name, "image/jpeg"), len(derived.model_image)))
+                objects.append(("s3_thumbnail", upload_image_to_s3_if_absent_async(
+                    derived.thumbnail, bucket_name, thumbnail_name, "image/jpeg"), len(derived.thumbnail)))
+            if store_original:
+                # 나머지는 업로드 스레드가 파트 단위로 읽어 S3로 전송
+                objects.append(("s3", upload_stream_to_s3_if_absent_async(
+                    file.file, header, bucket_name, file_name, mime_type), file_size))
+            uploads = {name: asyncio.ensure_future(timed(name, upload, timings)) for name, upload, _ in objects}
+
+            # 모델 API는 S3 URL로 이미지를 가져가므로 모델 입력 이미지의 업로드가 끝난 뒤 호출
+            # (축소 이미지를 쓰면 원본 업로드는 모델 호출과 동시에 진행)
+            async def classify():
+                await uploads["s3_model_image" if MODEL_IMAGE_SIZE else "s3"]
+                return await timed("model", predict_image_url(model_image_url), timings)
+
+            # S3 업로드, 모델 호출, EXIF 날짜 추출(앞부분만 사용)을 동시에 실행
+            parallel_start = time.perf_counter()
+            *upload_results, prediction, date = await asyncio.gather(
+                *uploads.values(),
+                classify(),
+                timed("exif", asyncio.to_thread(extract_exif_data, header), timings),
+                return_exceptions=True,
+            )
+            timings["upload_model_wall"] = (time.perf_counter() - parallel_start) * 1000
+            for upload in upload_results:
+                if isinstance(upload, HTTPException) and upload.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE:
+                    return upload_too_large_response(upload.detail)
+                if isinstance(upload, Exception):
+                    e = upload
+                    return JSONResponse(
+                        {
+                            "status": "Bad Request",
+                            "status_code": 403,
+                            "detail": f"failed to upload image to s3: {str(e)}"
+                        },
+                        status_code=status.HTTP_403_FORBIDDEN
+                    )
+            for (_, _, size), (_, uploaded) in zip(objects, upload_results):
+                upload_stats.record(size, uploaded)
+
+            # Model API 호출 결과 (공유 비동기 클라이언트로 호출하므로 추론 중에도 이벤트 루프를 막지 않음)
+            if isinstance(prediction, httpx.HTTPError):
+                return JSONResponse(
+                    {
+                        "status": "Internal Server Error",
+                        "status_code": 500,
+                        "detail": f"Model API request failed: {str(prediction)}"
+                    },
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+            if isinstance(prediction, Exception):
+                raise prediction
+
+            # 모델 응답에서 category_id 가져오기
+            category_id = prediction.get("category_id")
+            if category_id is None:
+                return JSONResponse(
+                    {
+                        "status": "Bad Request",
+                        "status_code": 400,
+                        "detail": "Category ID is required"
+                    },
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                )
+            prediction_cache.set(image_url, category_id)
+        if isinstance(date, Exception):
+            raise date
         if date is None:
             date = datetime.datetime.now().strftime("%Y:%m:%d %H:%M:%S")  # 현재 시간을 문자열로 설정
         
         # meal_type 및 meal_type_id 설정
-        meal_type = determine_meal_type(date) if date else "기타"
-        
-        # 식사 종류에 따른 ID를 수동으로 설정 (예시: 아침 -> 1, 점심 -> 2, 저녁 -> 3, 기타 -> 4)
-        meal_type_id_map = {
-            "아침": 0,
-            "점심": 1,
-            "저녁": 2,
-            "기타": 3
-        }
-        
-        meal_type_id = meal_type_id_map.get(meal_type, 3)  # 기본값을 기타로 설정
+        meal_type = determine_meal_type(date) if date else OTHER
 
-        # Model API 호출
-        model_api_url = "http://127.0.0.1:8001/predict_url/"
-        try:
-            response = requests.post(model_api_url, params={"image_url": image_url})
-            response.raise_for_status()
-        except requests.RequestException as e:
-            return JSONResponse(
-                {
-                    "status": "Internal Server Error",
-                    "status_code": 500,
-                    "detail": f"Model API request failed: {str(e)}"
-                },
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        # 식사 종류 이름을 meal_type 테이블의 id로 변환 (등록되지 않은 이름은 기타)
+        meal_type_id = (await ensure_meal_type_registry()).id_for(meal_type)
 
-        # 모델 응답에서 category_id 가져오기
-        category_id = response.json().get("category_id")
-        if category_id is None:
-            return JSONResponse(
-                {
-                    "status": "Bad Request",
-                    "status_code": 400,
-                    "detail": "Category ID is required"
-                },
-                status_code=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # 음식 카테고리 가져오기
-        food = get_food_by_category(db, category_id)
+        # 음식 카테고리 가져오기 (DB 조회 없이 메모리 카탈로그 사용)
+        food = (await ensure_food_catalog()).get(category_id)
         if not food:
             return JSONResponse(
                 {
@@ -122,7 +234,7 @@ async def classify_image(
             )
 
         # 사용자 권장 영양소 정보 가져오기
-        recommend = get_recommend_by_user(db, current_user)
+        recommend = await get_recommend_by_user(db, current_user)
         if not recommend:
             return JSONResponse(
                 {
@@ -133,6 +245,8 @@ async def classify_image(
                 status_code=status.HTTP_404_NOT_FOUND,
             )
 
+        logger.info(f"predict stages (ms): {', '.join(f'{name}={duration:.1f}' for name, duration in timings.items())}")
+
         # meal_type과 category_name을 UTF-8로 인코딩
         meal_type_utf8 = meal_type.encode('utf-8').decode('utf-8')
         category_name_utf8 = food.category_name.encode('utf-8').decode('utf-8')
@@ -157,15 +271,19 @@ async def classify_image(
                         "rec_car": round(float(recommend.rec_car)),
                         "rec_prot": round(float(recommend.rec_prot)),
                         "rec_fat": round(float(recommend.rec_fat)),
-                        "image_url": image_url
+                        "image_url": image_url,
+                        "thumbnail_url": thumbnail_url
                     }
                 },
                 "message": "Image Classify Information saved successfully"
             },
-            media_type="application/json; charset=utf-8"
+            media_type="application/json; charset=utf-8",
+            headers={"Server-Timing": stage_timing(timings)}
         )
 
     except Exception as e:
+        # 응답을 반환하면 get_async_db가 commit하므로 요청 중의 변경은 되돌림
+        await db.rollback()
         return JSONResponse(
             {
                 "status": "Internal Server Error",
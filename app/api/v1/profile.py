@@ -0,0 +1,83 @@
+# /app/api/v1/profile.py
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from api.v1.auth import validate_token
+from core.security import invalidate_user_tokens
+from db import crud, models
+from db.session import get_async_db, after_commit
+from schemas.user import UserUpdate
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# 프로필 수정 (키/몸무게/생년월일 등이 바뀌면 권장 영양소를 같은 트랜잭션에서 다시 계산)
+@router.patch("/profile")
+async def update_profile(
+    user_update: UserUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(validate_token)
+):
+    changes = user_update.model_dump(exclude_unset=True, exclude_none=True)
+    if not changes:
+        return {
+            "status": "Bad Request",
+            "status_code": 400,
+            "detail": "No profile fields to update"
+        }
+
+    # 키와 몸무게가 0보다 큰지 확인
+    if changes.get("height", 1) <= 0 or changes.get("weight", 1) <= 0:
+        return {
+            "status": "Bad Request",
+            "status_code": 400,
+            "detail": "키와 몸무게는 0보다 커야 합니다."
+        }
+
+    # 이메일 중복 확인
+    if "email" in changes:
+        existing_user = await crud.get_user_by_email(db, email=changes["email"])
+        if existing_user and existing_user.id != current_user.id:
+            return {
+                "status": "Bad Request",
+                "status_code": 400,
+                "detail": "Email already registered"
+            }
+
+    try:
+        user, recommendation = await crud.update_user_profile(db, current_user.id, changes)
+    except HTTPException as e:
+        logger.error(f"Failed to update profile for user {current_user.id}: {e.detail}")
+        return {
+            "status": "Error",
+            "status_code": e.status_code,
+            "detail": e.detail
+        }
+
+    # 캐시된 사용자 정보(키, 몸무게 등)가 더 이상 맞지 않으므로 commit 후 제거
+    after_commit(db, lambda: invalidate_user_tokens(user.id))
+    logger.info(f"Profile updated for user {user.id}: {list(changes)}")
+
+    return {
+        "status": "success",
+        "status_code": 200,
+        "detail": {
+            "wellness_info": {
+                "user_email": user.email,
+                "user_nickname": user.nickname,
+                "user_birthday": user.birthday,
+                "user_gender": user.gender,
+                "user_height": user.height,
+                "user_weight": user.weight,
+                "user_age": user.age,
+            },
+            "recommendations": {
+                "rec_kcal": recommendation.rec_kcal,
+                "rec_car": recommendation.rec_car,
+                "rec_prot": recommendation.rec_prot,
+                "rec_fat": recommendation.rec_fat,
+            }
+        },
+        "message": "Profile updated successfully."
+    }
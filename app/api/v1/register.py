@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 from jose import jwt
 from db import crud
 from db.crud import calculate_age, get_user_by_email
-from db.session import get_db
+from db.session import get_async_db, after_commit
 from db.models import Auth, User
+from core.security import invalidate_user_tokens
 import os
+import secrets
 from dotenv import load_dotenv
 from datetime import date, datetime, timedelta
 from schemas.user import UserCreate
@@ -26,15 +29,18 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# 날짜 및 시간 형식을 'YYYY-MM-DD HH:MM:SS'로 포맷
+# 날짜 및 시간을 'YYYY-MM-DD HH:MM:SS' 정밀도(초 단위)로 맞춤
+# (asyncpg는 문자열이 아닌 datetime 객체를 요구)
 def format_datetime(dt: datetime):
-    return dt.strftime("%Y-%m-%d %H:%M:%S")
+    return dt.replace(microsecond=0)
 
 # Access 토큰 생성
 def create_access_token(data: dict, expires_delta: int):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=expires_delta)
-    to_encode.update({"exp": expire})
+    # typ: jwt 모드에서 refresh 토큰을 access 토큰으로 쓰지 못하도록 구분
+    # jti: 같은 초에 다시 발급해도 폐기된 토큰과 같은 문자열이 되지 않도록 토큰마다 다른 값
+    to_encode.update({"exp": expire, "typ": "access", "jti": secrets.token_urlsafe(8)})
     token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     logger.info(f"Access Token 생성 완료: {token}")
     return token
@@ -43,15 +49,15 @@ def create_access_token(data: dict, expires_delta: int):
 def create_refresh_token(data: dict, expires_delta: int):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=expires_delta)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "typ": "refresh", "jti": secrets.token_urlsafe(8)})
     token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     logger.info(f"Refresh Token 생성 완료: {token}")
     return token
 
 @router.post("/register")
-async def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # 이메일 중복 확인
-    existing_user = crud.get_user_by_email(db, email=user.email)
+    existing_user = await crud.get_user_by_email(db, email=user.email)
     if existing_user:
         return {
             "status": "Bad Request",
@@ -66,29 +72,33 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
     
     # 생년월일로 나이를 계산
     user_age = calculate_age(user.birthday)
-    
+
+    # 사용자, 권장 영양소, total_today, 토큰은 요청이 끝날 때 한 번에 commit (get_async_db)
+    try:
+        new_user = await crud.create_user(db=db, user=user, age=user_age)
+    except IntegrityError:
+        # 같은 이메일로 동시에 가입하면 위의 중복 확인을 함께 통과하고 unique 제약(uq_user_info_email)에 걸림
+        await db.rollback()
+        logger.info(f"Concurrent registration for email: {user.email}")
+        return {
+            "status": "Bad Request",
+            "status_code": 400,
+            "detail": "Email already registered"
+        }
+
     try:
-               
-        new_user = crud.create_user(db=db, user=user, age=user_age)
-        
         # 권장 영양소 계산 및 저장
         recommendation = crud.calculate_and_save_recommendation(db, new_user)
         db.add(recommendation)
-        db.flush()  # 이 시점에서 recommendation에 id가 할당
         
         logger.info(f"User weight: {user.weight}, height: {user.height}, age: {user_age}, gender: {user.gender}")
         
         # total_today 생성
         today = date.today()
-        total_today = crud.create_total_today(db, new_user.id, today)
-    
-        db.commit()
-        db.refresh(recommendation)
-        db.refresh(new_user)
-        db.refresh(total_today)
+        await crud.create_total_today(db, new_user.id, today)
         
     except HTTPException as e:
-        db.rollback()
+        await db.rollback()
         logger.info(f"Creating total_today for user: {new_user.id} on date: {today}")
         return {
             "status": "Error",
@@ -121,7 +131,7 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
                             ),
                      )
     db.add(new_user_auth_entry)
-    db.commit()
+    after_commit(db, lambda: invalidate_user_tokens(new_user.id))
     
     return {
         "status": "success",
@@ -8,4 +8,87 @@ load_dotenv()
 # 환경 변수들 설정
 DATABASE_URL = os.getenv("DATABASE_URL")
 TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
-bucket_name = os.getenv("BUCKET_NAME") 
+bucket_name = os.getenv("BUCKET_NAME")
+
+# 토큰 검증 캐시 설정
+TOKEN_CACHE_MAXSIZE = int(os.getenv("TOKEN_CACHE_MAXSIZE", "10000"))
+TOKEN_CACHE_TTL_SECONDS = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "60"))
+
+# 토큰 검증 방식: "db"(auth 테이블 조회) 또는 "jwt"(서명/만료 로컬 검증)
+AUTH_VERIFY_MODE = os.getenv("AUTH_VERIFY_MODE", "db")
+REVOCATION_REFRESH_SECONDS = int(os.getenv("REVOCATION_REFRESH_SECONDS", "30"))
+
+# /api/v1/internal(캐시/커넥션 풀 통계) 접근 키. 요청의 X-Internal-Key 헤더와 비교
+# 설정하지 않으면 internal API는 404 (운영에서 실수로 공개되지 않도록)
+INTERNAL_API_KEY = os.getenv("INTERNAL_API_KEY")
+
+# 만료된 auth 행 정리 주기와 한 번에 삭제할 행 수
+AUTH_SWEEP_INTERVAL_SECONDS = int(os.getenv("AUTH_SWEEP_INTERVAL_SECONDS", "3600"))
+AUTH_SWEEP_BATCH_SIZE = int(os.getenv("AUTH_SWEEP_BATCH_SIZE", "1000"))
+
+# DB 커넥션 풀 설정
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# DB/프록시가 유휴 연결을 끊기 전에 재연결하도록 연결 재사용 시간(초) 제한
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# checkout 시 연결이 살아있는지 확인
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# food_list 메모리 카탈로그 변경 확인 주기(초)
+FOOD_CATALOG_REFRESH_SECONDS = int(os.getenv("FOOD_CATALOG_REFRESH_SECONDS", "60"))
+
+# GET /api/v1/history 페이지 크기 (기본값, 최대값)
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "50"))
+HISTORY_PAGE_MAX_SIZE = int(os.getenv("HISTORY_PAGE_MAX_SIZE", "1000"))
+
+# POST /api/v1/history/save_batch 한 번에 저장할 수 있는 최대 식사 기록 수
+HISTORY_BATCH_MAX_SIZE = int(os.getenv("HISTORY_BATCH_MAX_SIZE", "100"))
+
+# 읽기 전용 복제본(replica) DB URL (없으면 모든 조회를 primary로 보냄)
+REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+# 복제 지연이 이 값(초)을 넘으면 조회를 primary로 보냄
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+# 복제 지연 확인 주기(초)
+REPLICA_LAG_CHECK_SECONDS = int(os.getenv("REPLICA_LAG_CHECK_SECONDS", "5"))
+# 쓰기 요청 후 이 시간(초) 동안은 같은 사용자의 조회를 primary로 보냄 (자신이 쓴 데이터를 바로 읽도록)
+# REPLICA_MAX_LAG_SECONDS + REPLICA_LAG_CHECK_SECONDS보다 크게 설정
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "15"))
+
+# 한 요청에서 같은 SQL 문이 이 횟수 이상 실행되면 N+1 의심 경고 로그
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+
+# 음식 분류 모델 API (keep-alive 연결을 재사용하는 공유 httpx 클라이언트로 호출)
+MODEL_API_URL = os.getenv("MODEL_API_URL", "http://127.0.0.1:8001/predict_url/")
+MODEL_API_CONNECT_TIMEOUT = float(os.getenv("MODEL_API_CONNECT_TIMEOUT", "2"))
+MODEL_API_READ_TIMEOUT = float(os.getenv("MODEL_API_READ_TIMEOUT", "30"))
+# 연결 실패, 끊긴 keep-alive 연결, 502/503/504 응답일 때 다시 시도할 횟수
+MODEL_API_RETRIES = int(os.getenv("MODEL_API_RETRIES", "2"))
+MODEL_API_MAX_CONNECTIONS = int(os.getenv("MODEL_API_MAX_CONNECTIONS", "20"))
+MODEL_API_MAX_KEEPALIVE = int(os.getenv("MODEL_API_MAX_KEEPALIVE", "20"))
+
+# S3 업로드 설정 (S3_ENDPOINT_URL은 로컬 S3 호환 서버(moto 등)를 쓸 때만 지정)
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+# 업로드 스레드 수와 S3 클라이언트 커넥션 풀 크기 (스레드마다 연결 하나를 쓰므로 같은 값 권장)
+S3_UPLOAD_WORKERS = int(os.getenv("S3_UPLOAD_WORKERS", "8"))
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "8"))
+S3_CONNECT_TIMEOUT = float(os.getenv("S3_CONNECT_TIMEOUT", "2"))
+S3_READ_TIMEOUT = float(os.getenv("S3_READ_TIMEOUT", "30"))
+S3_MAX_ATTEMPTS = int(os.getenv("S3_MAX_ATTEMPTS", "3"))
+# 업로드 이미지 최대 크기 (읽는 중에 넘으면 업로드를 중단하고 413)
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+# 멀티파트 업로드 파트 크기 (S3 최소값 5MB, 이보다 작은 파일은 PutObject 한 번으로 업로드)
+# 기본값은 boto3와 같은 8MB (대부분의 휴대폰 사진은 요청 한 번으로 업로드)
+S3_PART_SIZE = max(int(os.getenv("S3_PART_SIZE", str(8 * 1024 * 1024))), 5 * 1024 * 1024)
+# 형식 확인과 EXIF 추출에 쓰는 파일 앞부분 크기 (JPEG EXIF(APP1)는 최대 64KB)
+IMAGE_HEADER_BYTES = int(os.getenv("IMAGE_HEADER_BYTES", str(128 * 1024)))
+# 이미지 내용 해시 -> 모델 분류 결과 캐시 (같은 사진을 다시 올리면 S3 업로드와 모델 호출 생략)
+# 모델을 다시 배포하면 TTL이 지난 뒤부터 새 결과를 사용
+PREDICTION_CACHE_MAXSIZE = int(os.getenv("PREDICTION_CACHE_MAXSIZE", "10000"))
+PREDICTION_CACHE_TTL_SECONDS = int(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "86400"))
+# 모델 입력용 축소 이미지의 긴 변(px)과 썸네일 크기 (MODEL_IMAGE_SIZE=0이면 축소하지 않고 원본 URL을 모델에 전달)
+MODEL_IMAGE_SIZE = int(os.getenv("MODEL_IMAGE_SIZE", "512"))
+THUMBNAIL_SIZE = int(os.getenv("THUMBNAIL_SIZE", "256"))
+DERIVED_IMAGE_QUALITY = int(os.getenv("DERIVED_IMAGE_QUALITY", "85"))
+# false면 원본은 저장하지 않고 축소 이미지와 썸네일만 저장 (MODEL_IMAGE_SIZE=0이면 원본은 항상 저장)
+STORE_ORIGINAL_IMAGE = os.getenv("STORE_ORIGINAL_IMAGE", "true").lower() in ("1", "true", "yes")
@@ -1 +1,139 @@
+# /app/core/security.py
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable
+from core.config import (
+    TOKEN_CACHE_MAXSIZE, TOKEN_CACHE_TTL_SECONDS, REVOCATION_REFRESH_SECONDS,
+    AUTH_SWEEP_INTERVAL_SECONDS, AUTH_SWEEP_BATCH_SIZE,
+)
+from jose import jwt
+from sqlalchemy.ext.asyncio import AsyncSession
+from db import crud
+from db.session import async_session, after_commit
+from utils.cache import TTLCache
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """인증된 사용자 정보의 스냅샷 (DB 세션과 분리되어 캐시에 보관 가능)"""
+    id: int
+    age: int
+    gender: int
+    height: Decimal
+    weight: Decimal
+    birthday: date
+    email: str
+    nickname: str
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_user(cls, user) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            age=user.age,
+            gender=user.gender,
+            height=user.height,
+            weight=user.weight,
+            birthday=user.birthday,
+            email=user.email,
+            nickname=user.nickname,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+# access token -> UserSnapshot 캐시
+token_cache = TTLCache(maxsize=TOKEN_CACHE_MAXSIZE, ttl=TOKEN_CACHE_TTL_SECONDS)
+
+
+def cache_token(token: str, user: UserSnapshot, expired_at: datetime):
+    # 캐시 만료 시간은 토큰 만료 시각을 넘지 않도록 제한
+    remaining = (expired_at - datetime.utcnow()).total_seconds()
+    token_cache.set(token, user, ttl=remaining)
+
+
+def invalidate_user_tokens(user_id: int) -> int:
+    # 토큰이 재발급되면 해당 사용자의 캐시 항목을 모두 제거
+    return token_cache.evict_where(lambda user: user.id == user_id)
+
+
+class RevocationList:
+    """폐기된 access token 목록 (DB에서 주기적으로 갱신되는 메모리 사본)"""
+
+    def __init__(self):
+        self._tokens = frozenset()
+        self.refreshed_at = None
+
+    def is_revoked(self, token: str) -> bool:
+        return token in self._tokens
+
+    def add(self, token: str):
+        # 이 인스턴스에서 폐기한 토큰은 다음 갱신을 기다리지 않고 바로 반영
+        self._tokens = self._tokens | {token}
+
+    def replace(self, tokens: Iterable[str]):
+        # 집합 전체를 교체하므로 조회 중인 요청과 경합이 없음
+        self._tokens = frozenset(tokens)
+        self.refreshed_at = datetime.utcnow()
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+
+revoked_tokens = RevocationList()
+
+
+# 교체되거나 로그아웃된 access token을 원래 만료 시각까지 폐기 목록에 등록
+# (jwt 모드는 서명과 만료만 확인하므로 이 목록이 없으면 만료 전까지 계속 유효)
+async def revoke_access_token(db: AsyncSession, token: str):
+    # 이 서버가 발급한 토큰이므로 서명 검증 없이 exp만 읽음
+    expired_at = datetime.utcfromtimestamp(jwt.get_unverified_claims(token)["exp"])
+    await crud.revoke_token(db, token, expired_at)
+    after_commit(db, lambda: revoked_tokens.add(token))
+
+
+async def refresh_revoked_tokens():
+    # 아직 만료되지 않은 폐기 토큰만 불러오면 되므로 목록은 작게 유지됨
+    async with async_session() as db:
+        revoked_tokens.replace(await crud.get_active_revoked_tokens(db))
+
+
+async def refresh_revoked_tokens_periodically(interval: int = REVOCATION_REFRESH_SECONDS):
+    while True:
+        try:
+            await refresh_revoked_tokens()
+            logger.info(f"Revoked token list refreshed: {len(revoked_tokens)} tokens")
+        except Exception as e:
+            logger.error(f"Failed to refresh revoked tokens: {str(e)}")
+        await asyncio.sleep(interval)
+
+
+async def sweep_expired_auth(batch_size: int = AUTH_SWEEP_BATCH_SIZE) -> int:
+    # 한 번에 batch_size 행씩 나눠 삭제하여 긴 잠금을 피함
+    total = 0
+    async with async_session() as db:
+        while True:
+            deleted = await crud.delete_expired_auth(db, batch_size)
+            total += deleted
+            if deleted < batch_size:
+                return total
+
+
+async def sweep_expired_auth_periodically(interval: int = AUTH_SWEEP_INTERVAL_SECONDS):
+    while True:
+        try:
+            deleted = await sweep_expired_auth()
+            logger.info(f"Expired auth rows swept: {deleted}")
+            # 만료된 폐기 토큰은 서명 검증에서 거부되므로 목록에서 제거
+            async with async_session() as db:
+                deleted = await crud.delete_expired_revoked_tokens(db)
+            logger.info(f"Expired revoked tokens swept: {deleted}")
+        except Exception as e:
+            logger.error(f"Failed to sweep expired auth rows: {str(e)}")
+        await asyncio.sleep(interval)
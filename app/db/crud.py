@@ -1,55 +1,29 @@
 # crud.py
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError, DataError
+from sqlalchemy import select, update, delete, text, tuple_, and_, or_, literal, literal_column, false, values, column, bindparam, cast, Boolean, Integer, Numeric, String, DATE, TIMESTAMP
+from sqlalchemy.dialects.postgresql import insert as pg_insert, aggregate_order_by, ARRAY
 from services import recommend_service
-from api.v1 import recommend
-from api.v1.auth import validate_token
-from db.models import Food_List, Recommend, Total_Today, History, Meal_Type, User, Auth
+from services.food_service import ensure_food_catalog
+from services.meal_type_service import ensure_meal_type_registry
+from db.models import Food_List, Recommend, Total_Today, History, User, Auth, Revoked_Token, Nutrition_Rollup
 from db import models
 from sqlalchemy.sql import func
 from decimal import Decimal, ROUND_HALF_UP
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from db import models
 from schemas import UserCreate
 import schemas
 import logging
+from typing import NamedTuple, Optional, Tuple
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
 
-# 공통 예외 처리 헬퍼 함수
-def execute_db_operation(db: Session, operation):
-    try:
-        result = operation()
-        db.commit()
-        return result
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail="Database operation failed: {str(e)}")
-
-# 사용자의 마지막 업데이트 기록 조회
-def get_user_updated_at(db: Session, current_user: models.User):
-    try:
-        user = db.query(models.User).filter(models.User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        return user.updated_at
-    except SQLAlchemyError as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-
-# 사용자 ID로 권장 영양소 조회
-def get_recommend_by_user_id(db: Session, user_id: int):
-    try:
-        recommend = db.query(models.Recommend).filter(models.Recommend.user_id == user_id).first()
-        return recommend
-    except SQLAlchemyError as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-              
 # 권장 영양소 계산 및 저장(register api에 사용)
-def calculate_and_save_recommendation(db: Session, user: models.User):
+def calculate_and_save_recommendation(db: AsyncSession, user: models.User):
     recommendation_result = recommend_service.recommend_nutrition(user.weight, user.height, user.age, user.gender)
     return models.Recommend(
         user_id=user.id,
@@ -58,170 +32,650 @@ def calculate_and_save_recommendation(db: Session, user: models.User):
         rec_prot=recommendation_result["rec_prot"],
         rec_fat=recommendation_result["rec_fat"]
     )
-    
-# 사용자 권장 영양소를 조회하거나 업데이트(recommend_eaten api에 사용)
-def get_or_update_recommendation(db: Session, current_user: models.User):
+
+# 0.01 단위 정수를 numeric으로 나누면 DECIMAL(6, 2)로 정확히 저장됨
+def hundredths(col):
+    return cast(col, Numeric) / 100
+
+# 생일이 지나 나이가 바뀐 사용자의 나이와 권장 영양소를 일괄 갱신
+#   chunk_size명씩 id 순으로 읽어 NumPy로 계산하고, 청크마다 UPDATE 한 번으로 저장 후 커밋
+async def refresh_aged_recommendations(db: AsyncSession, today: date = None, chunk_size: int = 50000) -> int:
+    today = today or date.today()
+    # calculate_age와 같은 기준 (생일이 지나지 않았으면 - 1)
+    current_age = cast(func.extract("year", func.age(cast(literal(today, DATE), TIMESTAMP), cast(User.birthday, TIMESTAMP))), Integer)
+    aged = select(
+        User.id.label("user_id"),
+        current_age.label("age"),
+        cast(User.weight * 10, Integer).label("weight_tenths"),
+        cast(User.height * 10, Integer).label("height_tenths"),
+        User.gender,
+    ).where(User.age != current_age, User.id > bindparam("last_id")).order_by(User.id).limit(chunk_size).subquery()
+    # 행 단위 대신 열마다 배열 하나로 받아 NumPy 배열로 바로 변환
+    aged_columns = select(*(func.array_agg(col) for col in aged.c))
+
+    # unnest한 배열 하나로 user_info.age와 recommend를 같은 문장에서 갱신
+    rows = func.unnest(
+        bindparam("user_ids", type_=ARRAY(Integer)),
+        bindparam("ages", type_=ARRAY(Integer)),
+        bindparam("rec_kcal", type_=ARRAY(Integer)),
+        bindparam("rec_car", type_=ARRAY(Integer)),
+        bindparam("rec_prot", type_=ARRAY(Integer)),
+        bindparam("rec_fat", type_=ARRAY(Integer)),
+        bindparam("valid", type_=ARRAY(Boolean)),
+    ).table_valued("user_id", "age", "rec_kcal", "rec_car", "rec_prot", "rec_fat", "valid").render_derived("aged")
+    update_age = update(User).where(User.id == rows.c.user_id).values(age=rows.c.age).cte("update_age")
+    # 바인드 파라미터를 넘겨도 ORM bulk insert로 해석되지 않도록 Table에 대해 실행
+    save = pg_insert(Recommend.__table__).from_select(
+        [Recommend.user_id, Recommend.rec_kcal, Recommend.rec_car, Recommend.rec_prot, Recommend.rec_fat,
+         Recommend.updated_at],
+        select(
+            rows.c.user_id,
+            hundredths(rows.c.rec_kcal),
+            hundredths(rows.c.rec_car),
+            hundredths(rows.c.rec_prot),
+            hundredths(rows.c.rec_fat),
+            func.now(),
+        ).where(rows.c.valid),
+    )
+    save = save.on_conflict_do_update(
+        constraint="uq_recommend_user_id",
+        set_={
+            "rec_kcal": save.excluded.rec_kcal,
+            "rec_car": save.excluded.rec_car,
+            "rec_prot": save.excluded.rec_prot,
+            "rec_fat": save.excluded.rec_fat,
+            "updated_at": func.now(),
+        },
+    ).add_cte(update_age)
+
+    updated = 0
+    last_id = 0
+    while True:
+        result = await db.execute(aged_columns, {"last_id": last_id})
+        columns = result.one()
+        if columns[0] is None:
+            break
+        user_ids, ages, weight_tenths, height_tenths, genders = (np.array(col, dtype=np.int64) for col in columns)
+        recommendation = recommend_service.recommend_nutrition_bulk(weight_tenths, height_tenths, ages, genders)
+        # DECIMAL(6, 2)를 넘는 값은 recommend_nutrition으로 저장할 때와 마찬가지로 저장하지 않음
+        valid = recommendation["valid"] & (recommendation["rec_kcal"] < 1_000_000)
+        skipped = int(len(valid) - valid.sum())
+        if skipped:
+            logger.warning(f"Skipped recommendation for {skipped} users with invalid profile values")
+
+        await db.execute(save, {
+            "user_ids": user_ids.tolist(),
+            "ages": ages.tolist(),
+            "rec_kcal": recommendation["rec_kcal"].tolist(),
+            "rec_car": recommendation["rec_car"].tolist(),
+            "rec_prot": recommendation["rec_prot"].tolist(),
+            "rec_fat": recommendation["rec_fat"].tolist(),
+            "valid": valid.tolist(),
+        })
+        await db.commit()
+        updated += len(user_ids)
+        last_id = int(user_ids.max())
+        logger.info(f"Refreshed age and recommendation for {updated} users (last id {last_id})")
+    return updated
+
+# 사용자 정보로 권장 영양소를 계산해 저장 (행이 없으면 생성)
+async def upsert_recommendation(db: AsyncSession, user: models.User):
+    values = recommend_service.recommend_nutrition(user.weight, user.height, user.age, user.gender)
+    stmt = pg_insert(Recommend).values(user_id=user.id, updated_at=func.now(), **values)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_recommend_user_id",
+        set_={**{key: stmt.excluded[key] for key in values}, "updated_at": func.now()},
+    ).returning(Recommend)
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    return result.scalars().one()
+
+# 프로필 수정과 권장 영양소 재계산을 하나의 트랜잭션으로 처리 (profile api에 사용)
+async def update_user_profile(db: AsyncSession, user_id: int, changes: dict):
     try:
-        # recommend 테이블에 기록 조회
-        recommendation = db.query(models.Recommend).filter(models.Recommend.user_id == current_user.id).first()
-        
-        # 추천 정보가 없거나 사용자 정보가 최근에 업데이트된 경우
-        if not recommendation or recommendation.updated_at < current_user.updated_at:
-            # 새로운 추천 영양소 계산
-            new_values = recommend_service.recommend_nutrition(current_user.weight, current_user.height, current_user.age, current_user.gender)
-            
-            if not recommendation:
-                recommendation = models.Recommend(user_id=current_user.id)
-                db.add(recommendation)
-            # 새 값으로 recommendation 업데이트     
-            recommendation.rec_kcal = new_values["rec_kcal"]
-            recommendation.rec_car = new_values["rec_car"]
-            recommendation.rec_prot = new_values["rec_prot"]
-            recommendation.rec_fat = new_values["rec_fat"]
-            recommendation.updated_at = func.now()
-            
-            db.commit()
-            db.refresh(recommendation)
-
-        return recommendation
+        # 같은 사용자의 동시 수정이 권장 영양소와 어긋나지 않도록 행 잠금
+        result = await db.execute(select(models.User).where(models.User.id == user_id).with_for_update())
+        user = result.scalars().first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        for key, value in changes.items():
+            setattr(user, key, value)
+        if "birthday" in changes:
+            user.age = calculate_age(user.birthday)
+        await db.flush()
 
+        recommendation = await upsert_recommendation(db, user)
+        return user, recommendation
+
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=f"Invalid input: {str(e)}")
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Invalid data: Integrity constraint violated")
     except DataError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Invalid data: Data type mismatch")
-    except ValueError as e: 
-        raise HTTPException(status_code=400, detail=f"Invalid input: {str(e)}")
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-    
-# 총 섭취량 조회
-def get_total_today(db: Session, current_user: models.User, date_obj: date):
+
+# 권장 영양소와 해당 날짜의 총 섭취량을 한 번에 조회 (읽기 전용)
+#   total_today 행이 아직 없으면 섭취량은 0, 권장 영양소가 없으면 None
+async def get_recommend_with_total_today(db: AsyncSession, user_id: int, date_obj: date):
     try:
-        logger.info(f"Checking total_today for user: {current_user.id} on date: {date_obj}")
-        total_today = db.query(Total_Today).filter_by(user_id=current_user.id, today=date_obj).first()
-        return total_today
-    
+        result = await db.execute(
+            select(
+                Recommend.rec_kcal,
+                Recommend.rec_car,
+                Recommend.rec_prot,
+                Recommend.rec_fat,
+                func.coalesce(Total_Today.total_kcal, 0).label("total_kcal"),
+                func.coalesce(Total_Today.total_car, 0).label("total_car"),
+                func.coalesce(Total_Today.total_prot, 0).label("total_prot"),
+                func.coalesce(Total_Today.total_fat, 0).label("total_fat"),
+            ).outerjoin(Total_Today, (Total_Today.user_id == Recommend.user_id) & (Total_Today.today == date_obj))
+             .where(Recommend.user_id == user_id)
+        )
+        return result.first()
     except SQLAlchemyError as e:
-        logger.error(f"SQLAlchemyError occurred while fetching total_today: {str(e)}")
+        logger.error(f"SQLAlchemyError occurred while fetching recommend and total_today: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-    
+
 # 총 섭취량 생성
-def create_total_today(db: Session, user_id: int, date_obj: date):
+async def create_total_today(db: AsyncSession, user_id: int, date_obj: date):
     try:
         logger.info(f"Creating total_today for user: {user_id} on date: {date_obj}")
 
         total_today = Total_Today(
-            user_id=user_id, 
-            total_kcal=Decimal('0'), 
+            user_id=user_id,
+            total_kcal=Decimal('0'),
             total_car=Decimal('0'),
-            total_prot=Decimal('0'), 
-            total_fat=Decimal('0'), 
+            total_prot=Decimal('0'),
+            total_fat=Decimal('0'),
             condition=False,
-            created_at=func.now(), 
-            updated_at=func.now(), 
-            today=date_obj, 
+            created_at=func.now(),
+            updated_at=func.now(),
+            today=date_obj,
             history_ids=[]
         )
         db.add(total_today)
-        db.commit()
-        db.refresh(total_today)
+        await db.flush()
         return total_today
-    
+
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         logger.error("IntegrityError occurred while creating total_today")
         raise HTTPException(status_code=400, detail="Invalid data: Integrity constraint violated")
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"SQLAlchemyError occurred: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-# Total_Today 업데이트
-def update_total_today(db: Session, total_today: models.Total_Today):
+async def get_recommend_by_user(db: AsyncSession, currnet_user: models.User) -> Recommend:
+     result = await db.execute(select(Recommend).where(Recommend.user_id == currnet_user.id))
+     Recommendation = result.scalars().first()
+
+     if not Recommendation:
+          raise HTTPException(status_code=400, detail="Recommendation not found")
+
+     return Recommendation
+
+# 식사 기록 저장 + 같은 date의 식사 목록 조회 (SQL 한 문장)
+#   1. history id를 먼저 받아 total_today를 upsert. 그날 기록 수가 :max_meals 미만일 때만 갱신(RETURNING)
+#   2. total_today가 갱신된 경우에만 history, nutrition_rollup에 저장
+#   3. 기존 기록과 새 기록(RETURNING)을 합쳐 반환 (같은 문장의 CTE에서 저장한 행은 다시 조회해도 보이지 않음)
+#   4. missed: 갱신한 total_today의 그날 기록 수가 이 문장의 스냅샷에서 보이는 기록 수 + 1보다 크면 true
+#   5. food_found: food_list에 음식이 없으면(카탈로그가 갱신되기 전에 삭제된 경우 등) false. 식사가 없어도 한 행은 반환
+# 같은 사용자/날짜의 저장은 total_today 행 잠금으로 순서대로 처리되므로 동시에 요청해도 기록 수 제한을 넘지 않음
+# 다만 3의 조회는 잠금을 기다리기 전에 만든 스냅샷을 쓰므로, 기다리는 동안 commit된 기록이 빠질 수 있음 (4로 확인)
+# postgresql insert(on_conflict)로 만든 문장은 SQLAlchemy 문장 캐시를 쓰지 못해 매번 컴파일되므로 text로 작성
+SAVE_HISTORY_AND_GET_MEALS = text("""
+WITH new_id AS (
+    SELECT CAST(nextval(pg_get_serial_sequence('history', 'id')) AS integer) AS id
+), food AS (
+    SELECT food_kcal, food_car, food_prot, food_fat
+    FROM food_list WHERE category_id = CAST(:category_id AS integer) ORDER BY id LIMIT 1
+), total AS (
+    INSERT INTO total_today AS t (user_id, total_kcal, total_car, total_prot, total_fat,
+                                  condition, created_at, updated_at, today, history_ids)
+    SELECT CAST(:user_id AS integer), least(food_kcal, 9999.99), least(food_car, 9999.99),
+           least(food_prot, 9999.99), least(food_fat, 9999.99), false, now(), now(), CAST(:today AS date), ARRAY[new_id.id]
+    FROM food, new_id
+    ON CONFLICT ON CONSTRAINT uq_total_today_user_id_today DO UPDATE SET
+        total_kcal = least(t.total_kcal + excluded.total_kcal, 9999.99),
+        total_car = least(t.total_car + excluded.total_car, 9999.99),
+        total_prot = least(t.total_prot + excluded.total_prot, 9999.99),
+        total_fat = least(t.total_fat + excluded.total_fat, 9999.99),
+        history_ids = array_cat(t.history_ids, excluded.history_ids),
+        updated_at = now()
+    WHERE cardinality(t.history_ids) < CAST(:max_meals AS integer)
+    RETURNING t.id, cardinality(t.history_ids) AS meal_count
+), new_history AS (
+    INSERT INTO history (id, user_id, category_id, meal_type_id, image_url, date, created_at, updated_at)
+    SELECT new_id.id, CAST(:user_id AS integer), CAST(:category_id AS integer), CAST(:meal_type_id AS integer),
+           CAST(:image_url AS varchar), CAST(:date AS timestamp), now(), now()
+    FROM new_id, total
+    RETURNING id, meal_type_id, category_id, date
+), rollup AS (
+    INSERT INTO nutrition_rollup AS r (user_id, period, period_start, total_kcal, total_car, total_prot, total_fat,
+                                       meal_count, updated_at)
+    SELECT CAST(:user_id AS integer), p.period, p.period_start, food_kcal, food_car, food_prot, food_fat, 1, now()
+    FROM total, food, unnest(CAST(:periods AS varchar[]), CAST(:period_starts AS date[])) AS p(period, period_start)
+    ON CONFLICT ON CONSTRAINT uq_nutrition_rollup_user_period_start DO UPDATE SET
+        total_kcal = r.total_kcal + excluded.total_kcal,
+        total_car = r.total_car + excluded.total_car,
+        total_prot = r.total_prot + excluded.total_prot,
+        total_fat = r.total_fat + excluded.total_fat,
+        meal_count = r.meal_count + excluded.meal_count,
+        updated_at = now()
+), visible AS (
+    SELECT count(*) AS meal_count FROM history
+    WHERE user_id = CAST(:user_id AS integer)
+      AND date >= CAST(:today AS date) AND date < CAST(:today AS date) + 1
+)
+SELECT meals.*, status.missed, status.food_found
+FROM (
+    SELECT (SELECT meal_count FROM total) > (SELECT meal_count FROM visible) + 1 AS missed,
+           EXISTS (SELECT 1 FROM food) AS food_found
+) status
+LEFT JOIN (
+    SELECT id AS history_id, meal_type_id, category_id, date, false AS is_new
+    FROM history WHERE user_id = CAST(:user_id AS integer) AND date = CAST(:date AS timestamp)
+    UNION ALL
+    SELECT id, meal_type_id, category_id, date, true FROM new_history
+) meals ON true
+ORDER BY history_id
+""")
+
+# 식사 기록을 저장하고 같은 date의 식사 목록을 반환
+#   반환값: (저장된 history id, 식사 목록). 하루 기록 수 제한(MAX_MEALS_PER_DAY)에 걸려 저장하지 않았으면 id는 None
+#   food_list에 음식이 없으면 404
+async def save_history_and_get_meals(db: AsyncSession, current_user: models.User, category_id: int, meal_type_id: int,
+                                     image_url: str, date: datetime):
+    day = to_day(date)
     try:
-        # 최대 허용 범위에 맞춰 값 제한
-        max_value = Decimal('9999.99')
-        total_today.total_kcal = min(total_today.total_kcal, max_value)
-        total_today.total_car = min(total_today.total_car, max_value)
-        total_today.total_prot = min(total_today.total_prot, max_value)
-        total_today.total_fat = min(total_today.total_fat, max_value)
-        
-        # condition 값이 없을 경우 False로 설정
-        if total_today.condition is None:
-            total_today.condition = False
-        
-        db.refresh(total_today)
-        db.commit()
-        return total_today
+        result = await db.execute(SAVE_HISTORY_AND_GET_MEALS, {
+            "user_id": current_user.id,
+            "category_id": category_id,
+            "meal_type_id": meal_type_id,
+            "image_url": image_url,
+            "date": date,
+            "today": day,
+            "max_meals": MAX_MEALS_PER_DAY,
+            "periods": list(ROLLUP_PERIODS),
+            "period_starts": [rollup_period_start(period, day) for period in ROLLUP_PERIODS],
+        })
+        rows = result.all()
+        if not rows[0].food_found:
+            raise HTTPException(status_code=404, detail="Food category not found")
+        new_history_id = next((row.history_id for row in rows if row.is_new), None)
+        rows = [row for row in rows if row.history_id is not None]
+
+        # 잠금을 기다리는 동안 같은 날짜의 다른 저장이 commit되었으면 새 스냅샷으로 목록만 다시 조회
+        # (드문 경우에만 쿼리가 하나 늘어남. 이 요청의 잠금은 아직 유지되므로 그 사이에 다른 저장은 commit되지 않음)
+        if new_history_id is not None and rows[0].missed:
+            logger.info(f"Concurrent meal saved for user {current_user.id} on {day}, re-reading meals")
+            result = await db.execute(
+                select(
+                    History.id.label("history_id"),
+                    History.meal_type_id,
+                    History.category_id,
+                    History.date
+                ).where(History.user_id == current_user.id)
+                 .where(History.date == date)
+                 .order_by(History.id)
+            )
+            rows = result.all()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Invalid data: Integrity constraint violated")
     except SQLAlchemyError as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Failed to update Total_Today: {str(e)}")
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+    catalog = await ensure_food_catalog()
+    meal_types = await ensure_meal_type_registry()
+    meal_rows = [to_meal_row(row, catalog, meal_types) for row in rows]
+    return new_history_id, [meal for meal in meal_rows if meal is not None]
 
-def get_food_by_category(db: Session, category_id: int) -> Food_List:
-     food_item = db.query(Food_List).filter(Food_List.category_id == category_id).first()
-     
-     if not food_item:
-          raise HTTPException(status_code=404, detail="Food category not found")
-     
-     return food_item
+# 여러 식사 기록을 한 트랜잭션에서 저장 (다중 행 INSERT 한 번 + 날짜/기간별 집계 upsert 한 번씩)
+#   items: category_id, meal_type_id, image_url, date 속성을 가진 객체 목록 (HistoryCreateRequest)
+#   저장 후 하루 식사 기록 수가 MAX_MEALS_PER_DAY를 넘는 날이 있으면 전부 저장하지 않고 429
+async def create_histories(db: AsyncSession, current_user: models.User, items):
+    try:
+        result = await db.execute(
+            pg_insert(History.__table__).values([
+                {
+                    "user_id": current_user.id,
+                    "category_id": item.category_id,
+                    "meal_type_id": item.meal_type_id,
+                    "image_url": item.image_url,
+                    "date": item.date,
+                }
+                for item in items
+            ]).returning(History.id, History.category_id, History.date)
+        )
+        saved = result.all()
 
+        counts = await add_histories_to_total_today(db, current_user.id, saved)
+        over_limit = sorted(day.isoformat() for day, count in counts.items() if count > MAX_MEALS_PER_DAY)
+        if over_limit:
+            await db.rollback()
+            raise HTTPException(status_code=429, detail=f"Too many meal records for {', '.join(over_limit)}")
 
-def get_recommend_by_user(db: Session, currnet_user: models.User) -> Recommend:
-     Recommendation = db.query(Recommend).filter(Recommend.user_id == currnet_user.id).first()
-     
-     if not Recommendation:
-          raise HTTPException(status_code=400, detail="Recommendation not found")
-     
-     return Recommendation
+        await add_histories_to_rollups(db, current_user.id, [(row.category_id, row.date) for row in saved])
+        logger.info(f"{len(saved)} histories 저장됨: user_id {current_user.id}")
+        return saved
 
-# history 저장 함수 
-def create_history(db: Session, current_user: models.User, category_id: int, meal_type_id: int, image_url: str, date: date):
-    # current_user가 User 객체인지 확인
-    if not hasattr(current_user, 'id'):
-        logger.error(f"current_user가 User 객체가 아님: {current_user}")
-        raise HTTPException(status_code=400, detail="Invalid user object")
-    
-    new_history = History(
-        user_id=current_user.id,
-        category_id=category_id,
-        meal_type_id=meal_type_id,
-        image_url=image_url,
-        date=date
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Invalid data: Integrity constraint violated")
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+# 하루 최대 식사 기록 수
+MAX_MEALS_PER_DAY = 10
+
+def to_day(eaten_at) -> date:
+    return eaten_at.date() if isinstance(eaten_at, datetime) else eaten_at
+
+# category_id별 음식 (같은 category가 여러 개면 id가 가장 작은 음식). category_id 열에 대한 LATERAL 서브쿼리
+def food_for_category(category_id):
+    return select(Food_List).where(Food_List.category_id == category_id).order_by(Food_List.id).limit(1).lateral("food")
+
+# 여러 식사 기록(history_id, category_id, eaten_at)을 날짜별로 합산해 total_today에 반영 (행이 없으면 생성)
+# 단일 INSERT ... ON CONFLICT DO UPDATE 문으로 처리하므로 동시에 저장해도 증가분이 유실되지 않음
+#   반환값: {날짜: 반영 후 그날의 식사 기록 수}
+async def add_histories_to_total_today(db: AsyncSession, user_id: int, meals) -> dict:
+    max_value = Decimal('9999.99')
+    eaten = values(column("history_id", Integer), column("category_id", Integer), column("today", DATE), name="eaten").data(
+        [(history_id, category_id, to_day(eaten_at)) for history_id, category_id, eaten_at in meals]
+    )
+    food = food_for_category(eaten.c.category_id)
+
+    # 음식 영양소는 모두 0 이상이므로 합계를 한 번에 제한해도 하나씩 더하며 제한한 것과 같음
+    rows = select(
+        literal(user_id, Integer),
+        func.least(func.sum(func.least(food.c.food_kcal, max_value)), max_value),
+        func.least(func.sum(func.least(food.c.food_car, max_value)), max_value),
+        func.least(func.sum(func.least(food.c.food_prot, max_value)), max_value),
+        func.least(func.sum(func.least(food.c.food_fat, max_value)), max_value),
+        false(),
+        func.now(),
+        func.now(),
+        eaten.c.today,
+        func.array_agg(aggregate_order_by(eaten.c.history_id, eaten.c.history_id)),
+    ).select_from(eaten).join(food, literal_column("true")).group_by(eaten.c.today)
+
+    stmt = pg_insert(Total_Today).from_select(
+        ["user_id", "total_kcal", "total_car", "total_prot", "total_fat",
+         "condition", "created_at", "updated_at", "today", "history_ids"],
+        rows,
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_total_today_user_id_today",
+        set_={
+            "total_kcal": func.least(Total_Today.total_kcal + stmt.excluded.total_kcal, max_value),
+            "total_car": func.least(Total_Today.total_car + stmt.excluded.total_car, max_value),
+            "total_prot": func.least(Total_Today.total_prot + stmt.excluded.total_prot, max_value),
+            "total_fat": func.least(Total_Today.total_fat + stmt.excluded.total_fat, max_value),
+            "history_ids": func.array_cat(Total_Today.history_ids, stmt.excluded.history_ids),
+            "updated_at": func.now(),
+        },
+    ).returning(Total_Today.today, func.cardinality(Total_Today.history_ids))
+    result = await db.execute(stmt)
+    return dict(result.all())
+
+ROLLUP_PERIODS = ("day", "week", "month")
+
+# 날짜가 속한 집계 기간의 시작일 (week는 ISO 주 기준 월요일)
+def rollup_period_start(period: str, day: date) -> date:
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+# 여러 식사 기록(category_id, eaten_at)을 일/주/월 기간별로 합산해 하나의 upsert 문으로 반영
+async def add_histories_to_rollups(db: AsyncSession, user_id: int, meals):
+    eaten = values(column("category_id", Integer), column("period", String), column("period_start", DATE), name="eaten").data([
+        (category_id, period, rollup_period_start(period, to_day(eaten_at)))
+        for category_id, eaten_at in meals
+        for period in ROLLUP_PERIODS
+    ])
+    food = food_for_category(eaten.c.category_id)
+
+    rows = select(
+        literal(user_id, Integer),
+        eaten.c.period,
+        eaten.c.period_start,
+        func.sum(food.c.food_kcal),
+        func.sum(food.c.food_car),
+        func.sum(food.c.food_prot),
+        func.sum(food.c.food_fat),
+        func.count(),
+        func.now(),
+    ).select_from(eaten).join(food, literal_column("true")).group_by(eaten.c.period, eaten.c.period_start)
+
+    stmt = pg_insert(Nutrition_Rollup).from_select(
+        ["user_id", "period", "period_start", "total_kcal", "total_car", "total_prot", "total_fat",
+         "meal_count", "updated_at"],
+        rows,
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_nutrition_rollup_user_period_start",
+        set_={
+            "total_kcal": Nutrition_Rollup.total_kcal + stmt.excluded.total_kcal,
+            "total_car": Nutrition_Rollup.total_car + stmt.excluded.total_car,
+            "total_prot": Nutrition_Rollup.total_prot + stmt.excluded.total_prot,
+            "total_fat": Nutrition_Rollup.total_fat + stmt.excluded.total_fat,
+            "meal_count": Nutrition_Rollup.meal_count + stmt.excluded.meal_count,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+
+# 기간별 집계 조회 (start가 속한 기간부터 end까지)
+async def get_rollups_by_range(db: AsyncSession, user_id: int, period: str, start: date, end: date):
+    result = await db.execute(
+        select(Nutrition_Rollup)
+        .where(Nutrition_Rollup.user_id == user_id)
+        .where(Nutrition_Rollup.period == period)
+        .where(Nutrition_Rollup.period_start >= rollup_period_start(period, start))
+        .where(Nutrition_Rollup.period_start <= end)
+        .order_by(Nutrition_Rollup.period_start)
     )
-    db.add(new_history)
-    db.commit()
-    db.refresh(new_history)
-    logger.info(f"new_history 저장됨: {new_history}")
-    return new_history
-
-# meals 조회 함수
-def get_meals_by_user_and_date(db: Session, current_user: models.User, date: datetime):
+    return result.scalars().all()
+
+# history로부터 집계 행을 다시 계산 (user_id가 없으면 전체 사용자)
+async def rebuild_nutrition_rollups(db: AsyncSession, user_id: int = None) -> int:
+    delete_stmt = delete(Nutrition_Rollup)
+    if user_id is not None:
+        delete_stmt = delete_stmt.where(Nutrition_Rollup.user_id == user_id)
+    await db.execute(delete_stmt)
+
+    # 저장할 때와 같은 기준(같은 category가 여러 개면 id가 가장 작은 음식)으로 영양소를 합산
+    food = select(Food_List).distinct(Food_List.category_id).order_by(Food_List.category_id, Food_List.id).subquery()
+    inserted = 0
+    for period in ROLLUP_PERIODS:
+        # date_trunc('week')는 ISO 주(월요일 시작) 기준
+        period_start = func.date_trunc(literal_column(f"'{period}'"), History.date).cast(DATE)
+        rows = select(
+            History.user_id,
+            literal(period, String),
+            period_start,
+            func.sum(food.c.food_kcal),
+            func.sum(food.c.food_car),
+            func.sum(food.c.food_prot),
+            func.sum(food.c.food_fat),
+            func.count(),
+            func.now(),
+        ).join(food, food.c.category_id == History.category_id).group_by(History.user_id, period_start)
+        if user_id is not None:
+            rows = rows.where(History.user_id == user_id)
+
+        result = await db.execute(pg_insert(Nutrition_Rollup).from_select(
+            ["user_id", "period", "period_start", "total_kcal", "total_car", "total_prot", "total_fat",
+             "meal_count", "updated_at"],
+            rows,
+        ))
+        inserted += result.rowcount
+    await db.commit()
+    return inserted
+
+# meals 조회 결과 행
+class MealRow(NamedTuple):
+    history_id: int
+    meal_type_name: str
+    category_name: str
+    food_kcal: Decimal
+    food_car: Decimal
+    food_prot: Decimal
+    food_fat: Decimal
+    date: datetime
+
+# history 행(history_id, meal_type_id, category_id, date)을 MealRow로 변환
+#   카탈로그/레지스트리에 없는 항목은 기존 inner join과 같이 None (응답에서 제외)
+def to_meal_row(row, catalog, meal_types) -> Optional[MealRow]:
+    food = catalog.get(row.category_id)
+    meal_type_name = meal_types.name(row.meal_type_id)
+    if food is None or meal_type_name is None:
+        return None
+    return MealRow(
+        history_id=row.history_id,
+        meal_type_name=meal_type_name,
+        category_name=food.category_name,
+        food_kcal=food.food_kcal,
+        food_car=food.food_car,
+        food_prot=food.food_prot,
+        food_fat=food.food_fat,
+        date=row.date,
+    )
+
+# meals 조회 함수 (음식/식사 종류 이름은 조인 대신 메모리 카탈로그/레지스트리에서 가져옴)
+async def get_meals_by_user_and_date(db: AsyncSession, current_user: models.User, date: datetime):
     logger.info(f"get_meals_by_user_and_date 호출됨, user_id: {current_user.id}, date: {date}")
-    return db.query(
+    result = await db.execute(
+        select(
+            History.id.label("history_id"),
+            History.meal_type_id,
+            History.category_id,
+            History.date
+        ).where(History.date == date) \
+         .where(History.user_id == current_user.id)
+    )
+    catalog = await ensure_food_catalog()
+    meal_types = await ensure_meal_type_registry()
+    meals = []
+    for row in result.all():
+        meal = to_meal_row(row, catalog, meal_types)
+        if meal is not None:
+            meals.append(meal)
+    return meals
+
+# 여러 날짜의 식사 기록을 한 번에 조회 (날짜별 목록, 각 목록은 시간/id 순)
+async def get_meals_by_user_and_days(db: AsyncSession, current_user: models.User, days) -> dict:
+    days = sorted(set(days))
+    starts = [datetime.combine(day, datetime.min.time()) for day in days]
+    result = await db.execute(
+        select(
+            History.id.label("history_id"),
+            History.meal_type_id,
+            History.category_id,
+            History.date
+        ).where(History.user_id == current_user.id)
+         .where(or_(*(and_(History.date >= start, History.date < start + timedelta(days=1)) for start in starts)))
+         .order_by(History.date, History.id)
+    )
+    catalog = await ensure_food_catalog()
+    meal_types = await ensure_meal_type_registry()
+    meals = {day: [] for day in days}
+    for row in result.all():
+        meal = to_meal_row(row, catalog, meal_types)
+        if meal is not None:
+            meals[row.date.date()].append(meal)
+    return meals
+
+# 전체 식사 기록을 최신순((date, id) 내림차순)으로 limit개 조회 (keyset 페이지네이션)
+#   before: 이전 페이지 마지막 행의 (date, history_id). 이 행보다 오래된 기록부터 조회
+#   서버 측 커서로 실행한 결과(AsyncResult)를 반환하므로 호출한 쪽에서 partitions()로 나눠 읽고,
+#   다 읽을 때까지 세션을 닫지 않아야 함
+async def stream_meal_history(db: AsyncSession, user_id: int, limit: int,
+                              before: Optional[Tuple[datetime, int]] = None, batch_size: int = 500):
+    query = select(
         History.id.label("history_id"),
-        Meal_Type.type_name.label("meal_type_name"),
-        Food_List.category_name,
-        Food_List.food_kcal,
-        Food_List.food_car,
-        Food_List.food_prot,
-        Food_List.food_fat,
+        History.meal_type_id,
+        History.category_id,
         History.date
-    ).join(Food_List, History.category_id == Food_List.category_id) \
-     .join(Meal_Type, History.meal_type_id == Meal_Type.id) \
-     .filter(History.date == date) \
-     .filter(History.user_id == current_user.id) \
-     .all()
+    ).where(History.user_id == user_id)
+    if before is not None:
+        query = query.where(tuple_(History.date, History.id) < tuple_(*before))
+    query = query.order_by(History.date.desc(), History.id.desc()).limit(limit)
+    return await db.stream(query.execution_options(yield_per=batch_size))
+
+# 사용자당 하나의 auth 행을 유지하도록 토큰을 upsert
+async def upsert_auth(db: AsyncSession, user_id: int, access_token: str, refresh_token: str,
+                      access_expired_at: datetime, refresh_expired_at: datetime):
+    now = datetime.utcnow()
+    values = {
+        "user_id": user_id,
+        "access_token": access_token,
+        "access_created_at": now,
+        "access_expired_at": access_expired_at,
+        "refresh_token": refresh_token,
+        "refresh_created_at": now,
+        "refresh_expired_at": refresh_expired_at,
+    }
+    stmt = pg_insert(Auth).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Auth.user_id],
+        set_={key: stmt.excluded[key] for key in values if key != "user_id"},
+    )
+    await db.execute(stmt)
+
+# 만료된 auth 행을 batch_size 단위로 삭제하고 삭제된 행 수를 반환
+async def delete_expired_auth(db: AsyncSession, batch_size: int) -> int:
+    expired_ids = select(Auth.id) \
+        .where(Auth.refresh_expired_at < datetime.utcnow()) \
+        .limit(batch_size) \
+        .scalar_subquery()
+    result = await db.execute(delete(Auth).where(Auth.id.in_(expired_ids)).execution_options(synchronize_session=False))
+    await db.commit()
+    return result.rowcount
+
+# 폐기 토큰 등록 (이미 등록된 토큰이면 무시)
+async def revoke_token(db: AsyncSession, token: str, expired_at: datetime):
+    stmt = pg_insert(Revoked_Token).values(token=token, expired_at=expired_at, created_at=func.now())
+    await db.execute(stmt.on_conflict_do_nothing(index_elements=[Revoked_Token.token]))
+
+# 로그아웃한 access token을 auth 행에서 만료 처리 (db 모드 검증에서 거부되고, 다음 로그인에서 재발급)
+async def expire_access_token(db: AsyncSession, user_id: int, token: str):
+    await db.execute(
+        update(Auth)
+        .where(Auth.user_id == user_id, Auth.access_token == token)
+        .values(access_expired_at=datetime.utcnow().replace(microsecond=0))
+    )
 
-def get_user_by_email(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
+# 만료된 폐기 토큰 삭제
+async def delete_expired_revoked_tokens(db: AsyncSession) -> int:
+    result = await db.execute(delete(Revoked_Token).where(Revoked_Token.expired_at < datetime.utcnow()))
+    await db.commit()
+    return result.rowcount
+
+# 아직 만료되지 않은 폐기 토큰 목록 조회
+async def get_active_revoked_tokens(db: AsyncSession):
+    result = await db.execute(select(Revoked_Token.token).where(Revoked_Token.expired_at > datetime.utcnow()))
+    return list(result.scalars().all())
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(models.User).where(models.User.email == email))
+    return result.scalars().first()
 
 # 사용자 생성
-def create_user(db: Session, user: schemas.UserCreate, age: int):
+async def create_user(db: AsyncSession, user: schemas.UserCreate, age: int):
     db_user = models.User(
         birthday=user.birthday,
         age=age,
@@ -232,40 +686,10 @@ def create_user(db: Session, user: schemas.UserCreate, age: int):
         email=user.email
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.flush()  # id 할당 (권장 영양소, total_today, 토큰 생성에 필요)
     return db_user
 
 
-# total_today condition 업데이트
-def update_total_today_condition(db: Session, total_today_id: int, new_condition: bool):
-    try:
-        total_today = db.query(models.Total_Today).filter(models.Total_Today.id == total_today_id).first()
-        if total_today:
-            # 사용자 권장 영양소 가져오기
-            recommendation = db.query(models.Recommend).filter(models.Recommend.user_id == total_today.user_id).first()
-
-            if recommendation:
-                # 새로운 condition 계산
-                new_condition = total_today.total_kcal > recommendation.rec_kcal
-                # 현재 condition과 새로운 condition이 다를 경우에만 db 업데이트
-                if total_today.condition != new_condition:
-                    total_today.condition = new_condition
-                    db.commit() 
-                    db.refresh(total_today)  
-        
-        return total_today
-
-    except SQLAlchemyError as e:
-        db.rollback()  
-        print(f"Database error occurred: {e}")
-        return None
-
-    except Exception as e:
-        db.rollback()  
-        print(f"An unexpected error occurred: {e}")
-        return None
-    
 # 만 나이 계산 함수 추가(create_user에서 사용)
 def calculate_age(birth_date) -> int:
     today = date.today()
@@ -274,6 +698,5 @@ def calculate_age(birth_date) -> int:
     # 생일 지나지 않은 경우 나이 - 1
     if(today.month, today.day) < (birth_date.month, birth_date.day):
         age -= 1
-    
-    return age
 
+    return age
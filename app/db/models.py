@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, Column, Integer, String, DECIMAL, TIMESTAMP, DATE, text, Boolean, DateTime
+from sqlalchemy import ForeignKey, Column, Integer, String, DECIMAL, TIMESTAMP, DATE, text, Boolean, DateTime, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from db.session import Base
@@ -9,18 +9,27 @@ class Auth(Base):
     __tablename__ = 'auth'
     
     id= Column(Integer, primary_key=True,autoincrement=True)
-    user_id= Column(Integer, ForeignKey('user_info.id'), nullable=False)
-    access_token= Column(String(255), nullable=False, unique=True)
+    user_id= Column(Integer, ForeignKey('user_info.id'), nullable=False, unique=True)
+    access_token= Column(String(512), nullable=False, unique=True)
     access_created_at= Column(DateTime, nullable=False)
     access_expired_at= Column(DateTime, nullable=False)
-    refresh_token= Column(String(255), nullable=False, unique=True)
+    refresh_token= Column(String(512), nullable=False, unique=True)
     refresh_created_at= Column(DateTime, nullable=False)
     refresh_expired_at= Column(DateTime, nullable=False)
     
     user= relationship("User", back_populates="auth")
 
+class Revoked_Token(Base):
+    __tablename__ = 'revoked_token'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    token = Column(String(512), nullable=False, unique=True)
+    expired_at = Column(DateTime, nullable=False)
+    created_at = Column(TIMESTAMP, default=func.now(), nullable=False)
+
 class User(Base): 
     __tablename__ = 'user_info'
+    __table_args__ = (UniqueConstraint('email', name='uq_user_info_email'),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     age = Column(Integer, nullable=False)
@@ -42,6 +51,7 @@ class User(Base):
 
 class Recommend(Base):
     __tablename__ = 'recommend'
+    __table_args__ = (UniqueConstraint('user_id', name='uq_recommend_user_id'),)
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('user_info.id'), nullable=False)
@@ -57,6 +67,7 @@ class Recommend(Base):
 
 class Food_List(Base):
     __tablename__ = 'food_list'
+    __table_args__ = (Index('ix_food_list_category_id', 'category_id'),)
 
     id = Column(Integer, primary_key=True)
     category_id = Column(Integer, nullable=False)
@@ -81,6 +92,7 @@ class Meal_Type(Base):
 
 class History(Base):
     __tablename__ = 'history'
+    __table_args__ = (Index('ix_history_user_id_date_id', 'user_id', 'date', 'id'),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('user_info.id'), nullable=False)
@@ -98,6 +110,7 @@ class History(Base):
 
 class Total_Today(Base):
     __tablename__ = 'total_today'
+    __table_args__ = (UniqueConstraint('user_id', 'today', name='uq_total_today_user_id_today'),)
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('user_info.id'), nullable=False)
@@ -111,4 +124,20 @@ class Total_Today(Base):
     today = Column(DATE, nullable=False)
     history_ids = Column(ARRAY(Integer), nullable=False)
 
-    user = relationship("User", back_populates="total_today")
\ No newline at end of file
+    user = relationship("User", back_populates="total_today")
+
+class Nutrition_Rollup(Base):
+    __tablename__ = 'nutrition_rollup'
+    # (user_id, period, period_start) 유니크 인덱스로 upsert와 기간 조회를 모두 처리
+    __table_args__ = (UniqueConstraint('user_id', 'period', 'period_start', name='uq_nutrition_rollup_user_period_start'),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey('user_info.id'), nullable=False)
+    period = Column(String(5), nullable=False)  # day, week(ISO 주, 월요일 시작), month
+    period_start = Column(DATE, nullable=False)
+    total_kcal = Column(DECIMAL(10, 2), nullable=False)
+    total_car = Column(DECIMAL(10, 2), nullable=False)
+    total_prot = Column(DECIMAL(10, 2), nullable=False)
+    total_fat = Column(DECIMAL(10, 2), nullable=False)
+    meal_count = Column(Integer, nullable=False)
+    updated_at = Column(TIMESTAMP, default=func.now(), onupdate=func.now(), nullable=False)
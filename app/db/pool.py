@@ -0,0 +1,119 @@
+# /app/db/pool.py
+from collections import deque
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# 커넥션 풀 checkout/checkin 횟수와 checkout 대기 시간 통계
+class PoolStats:
+    def __init__(self, samples: int = 1000):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=samples)  # 최근 checkout 대기 시간(ms)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._waits.clear()
+            self.checkouts = 0
+            self.checkins = 0
+            self.waits = 0
+            self.connects = 0
+            self.timeouts = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+
+    def record_wait(self, wait_ms: float):
+        with self._lock:
+            self._waits.append(wait_ms)
+            self.waits += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+
+    def record_checkin(self):
+        with self._lock:
+            self.checkins += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            waited = len(waits)
+            return {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total_ms / self.waits, 3) if self.waits else 0.0,
+                "wait_max_ms": round(self.wait_max_ms, 3),
+                "wait_p50_ms": round(waits[waited // 2], 3) if waited else 0.0,
+                "wait_p99_ms": round(waits[min(int(waited * 0.99), waited - 1)], 3) if waited else 0.0,
+            }
+
+
+# checkout 대기 시간을 측정하는 비동기 엔진용 풀
+# dispose() 시 풀이 재생성되어도 통계가 유지되도록 클래스 속성으로 보관
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_timeout()
+            logger.warning(f"Connection pool checkout timed out: {self.status()}")
+            raise
+        finally:
+            self.stats.record_wait((time.perf_counter() - start) * 1000)
+
+
+# replica 엔진용 풀 (primary와 통계를 따로 집계)
+class InstrumentedReplicaPool(InstrumentedAsyncPool):
+    stats = PoolStats()
+
+
+# 엔진 풀에 checkout/checkin/connect 이벤트 리스너 등록
+def instrument_pool(engine, stats: PoolStats):
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.record_checkout()
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        stats.record_checkin()
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        stats.record_connect()
+
+
+# 현재 풀 상태(사용 중/유휴/overflow)와 누적 통계 조회
+def pool_status(pool) -> dict:
+    status = {
+        "pool_size": pool.size(),
+        "in_use": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # overflow()는 풀이 다 차기 전까지 음수이므로 실제 사용 중인 overflow 연결 수로 변환
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+    }
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
@@ -0,0 +1,83 @@
+# /app/db/query_stats.py
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from core.config import SQL_N_PLUS_ONE_THRESHOLD
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """한 요청(또는 with 블록)에서 실행된 SQL 문 수, 총 DB 시간, 가장 느린 문"""
+
+    def __init__(self, parent: Optional["QueryStats"] = None):
+        self.parent = parent  # 중첩 수집 시 바깥 수집기에도 함께 기록
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_sql = None
+        self.statements = Counter()  # SQL 문 -> 실행 횟수 (같은 문이 반복되면 N+1 의심)
+
+    def record(self, statement: str, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.statements[statement] += 1
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_sql = statement
+        if self.parent is not None:
+            self.parent.record(statement, elapsed_ms)
+
+    # 같은 SQL 문이 threshold번 이상 실행된 경우 (문, 횟수) 목록
+    def repeated(self, threshold: int = SQL_N_PLUS_ONE_THRESHOLD):
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+    def summary(self) -> str:
+        return f"{self.count} queries, {self.total_ms:.2f}ms in DB, slowest {self.slowest_ms:.2f}ms"
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.total_ms:.2f};desc="{self.count} queries", db-slowest;dur={self.slowest_ms:.2f}'
+
+
+# 현재 요청의 수집기 (요청 밖의 백그라운드 작업 등에서는 None이므로 기록하지 않음)
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+# with 블록 안에서 실행된 SQL 문을 수집 (미들웨어, 테스트의 쿼리 수 검사에서 사용)
+@contextmanager
+def collect_queries():
+    stats = QueryStats(parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+# 엔진에 SQL 실행 시간 측정 이벤트 리스너 등록 (비동기 엔진은 sync_engine에 등록)
+def instrument_queries(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, (time.perf_counter() - start) * 1000)
+
+    # 실행이 실패하면 after_cursor_execute가 호출되지 않으므로 시작 시각만 정리
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
@@ -0,0 +1,147 @@
+# /app/db/replica.py
+import asyncio
+import logging
+import time
+from collections import Counter, OrderedDict
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import READ_YOUR_WRITES_SECONDS, REPLICA_MAX_LAG_SECONDS, REPLICA_LAG_CHECK_SECONDS
+from db.pool import pool_status
+from db.session import AsyncSessionLocal, get_async_engine, get_replica_async_engine
+
+logger = logging.getLogger(__name__)
+
+# replica의 복제 지연(초). primary(복구 중이 아님)이거나 받은 WAL을 모두 적용했으면 0
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+# 조회 라우팅 결과
+REPLICA = "replica"
+PRIMARY_NO_REPLICA = "primary_no_replica"          # REPLICA_DATABASE_URL 미설정
+PRIMARY_RECENT_WRITE = "primary_recent_write"      # 최근에 쓰기 요청을 보낸 사용자
+PRIMARY_REPLICA_LAGGING = "primary_replica_lagging"  # 지연이 크거나 지연을 확인하지 못함
+
+
+class ReplicaRouter:
+    """조회를 replica로 보낼지 primary로 보낼지 결정 (복제 지연, 사용자별 최근 쓰기 기준)"""
+
+    def __init__(self, window: float = READ_YOUR_WRITES_SECONDS, max_lag: float = REPLICA_MAX_LAG_SECONDS,
+                 check_interval: int = REPLICA_LAG_CHECK_SECONDS):
+        self.window = window
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        # user_id -> 마지막 쓰기 시각(monotonic). 쓰기 순서대로 유지되므로 앞에서부터 만료 항목 제거
+        self._writes = OrderedDict()
+        self.lag_seconds = None
+        self.checked_at = None
+        self.check_error = None
+        self.decisions = Counter()
+
+    def mark_write(self, user_id: int):
+        now = time.monotonic()
+        self._writes.pop(user_id, None)
+        self._writes[user_id] = now
+        while self._writes:
+            oldest_user, written_at = next(iter(self._writes.items()))
+            if now - written_at < self.window:
+                break
+            del self._writes[oldest_user]
+
+    def recently_wrote(self, user_id: Optional[int]) -> bool:
+        written_at = self._writes.get(user_id)
+        return written_at is not None and time.monotonic() - written_at < self.window
+
+    def record_lag(self, lag_seconds: Optional[float]):
+        self.lag_seconds = lag_seconds
+        self.checked_at = time.monotonic()
+        self.check_error = None
+
+    def record_check_failure(self, error: str):
+        self.lag_seconds = None
+        self.checked_at = time.monotonic()
+        self.check_error = error
+
+    def replica_healthy(self) -> bool:
+        # 확인한 지 오래되었으면(확인 작업이 멈춘 경우 등) 지연을 모르는 것으로 처리
+        if self.lag_seconds is None or self.checked_at is None:
+            return False
+        if time.monotonic() - self.checked_at > self.check_interval * 3:
+            return False
+        return self.lag_seconds <= self.max_lag
+
+    def route(self, user_id: Optional[int], has_replica: bool) -> str:
+        if not has_replica:
+            decision = PRIMARY_NO_REPLICA
+        elif self.recently_wrote(user_id):
+            decision = PRIMARY_RECENT_WRITE
+        elif not self.replica_healthy():
+            decision = PRIMARY_REPLICA_LAGGING
+        else:
+            decision = REPLICA
+        self.decisions[decision] += 1
+        logger.debug(f"Read for user {user_id} routed: {decision}")
+        return decision
+
+    def stats(self) -> dict:
+        return {
+            "lag_seconds": round(self.lag_seconds, 3) if self.lag_seconds is not None else None,
+            "max_lag_seconds": self.max_lag,
+            "healthy": self.replica_healthy(),
+            "checked_seconds_ago": round(time.monotonic() - self.checked_at, 3) if self.checked_at else None,
+            "check_error": self.check_error,
+            "read_your_writes_seconds": self.window,
+            "recent_writers": sum(1 for user_id in self._writes if self.recently_wrote(user_id)),
+            "decisions": dict(self.decisions),
+        }
+
+
+replica_router = ReplicaRouter()
+
+
+# 조회 전용 세션: 조건이 맞으면 replica, 아니면 primary에 연결
+def async_read_session(user_id: Optional[int] = None) -> AsyncSession:
+    replica_engine = get_replica_async_engine()
+    decision = replica_router.route(user_id, replica_engine is not None)
+    engine = replica_engine if decision == REPLICA else get_async_engine()
+    return AsyncSessionLocal(bind=engine)
+
+
+async def check_replica_lag() -> Optional[float]:
+    replica_engine = get_replica_async_engine()
+    if replica_engine is None:
+        return None
+    try:
+        async with AsyncSession(bind=replica_engine) as db:
+            lag = (await db.execute(REPLICA_LAG_QUERY)).scalar()
+    except Exception as e:
+        replica_router.record_check_failure(str(e))
+        raise
+    lag = float(lag) if lag is not None else None
+    replica_router.record_lag(lag)
+    if lag is None or lag > replica_router.max_lag:
+        logger.warning(f"Replica lag {lag}s exceeds {replica_router.max_lag}s, reads go to primary")
+    return lag
+
+
+async def check_replica_lag_periodically(interval: int = REPLICA_LAG_CHECK_SECONDS):
+    while True:
+        try:
+            await check_replica_lag()
+        except Exception as e:
+            logger.error(f"Failed to check replica lag: {str(e)}")
+        await asyncio.sleep(interval)
+
+
+# replica 설정 여부, 복제 지연, 라우팅 결과 횟수, replica 풀 상태
+def replica_status() -> dict:
+    replica_engine = get_replica_async_engine()
+    status = {"configured": replica_engine is not None}
+    status.update(replica_router.stats())
+    if replica_engine is not None:
+        status["pool"] = pool_status(replica_engine.pool)
+    return status
@@ -1,42 +1,144 @@
 # /app/db/session.py
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
-from typing import Generator
-from core.config import DATABASE_URL, TEST_DATABASE_URL  # config.py에서 환경 변수 가져오기
+from typing import AsyncGenerator, Generator
+from core.config import DATABASE_URL, TEST_DATABASE_URL, REPLICA_DATABASE_URL  # config.py에서 환경 변수 가져오기
+from core.config import DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING
+from db.pool import InstrumentedAsyncPool, InstrumentedReplicaPool, instrument_pool
+from db.query_stats import instrument_queries
 
-# SQLAlchemy 엔진 생성
-engine = create_engine(DATABASE_URL)
-test_engine = create_engine(TEST_DATABASE_URL)
+# 동기 드라이버 URL을 asyncpg 드라이버 URL로 변환
+def to_async_url(url: str):
+    url = make_url(url)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    return url
 
-# 세션 생성
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+# 커넥션 풀 설정 (core/config.py에서 조정)
+pool_options = {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_recycle": DB_POOL_RECYCLE,
+    "pool_pre_ping": DB_POOL_PRE_PING,
+}
+
+# 엔진은 import 시점이 아니라 처음 필요할 때 생성 (앱에서는 lifespan에서 생성/정리)
+_engine = None
+_test_engine = None
+_async_engine = None
+_replica_async_engine = None
+
+# 세션 생성 (bind는 세션을 만들 때 지연 생성된 엔진으로 지정)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+TestSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+# commit 후 속성 접근 시 암묵적 I/O가 일어나지 않도록 expire_on_commit=False
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
 
 # Base 클래스 생성
 Base = declarative_base()
 
-# 모델 정의를 데이터베이스에 반영합니다.
-Base.metadata.create_all(engine)
+# 동기 엔진 (스크립트용)
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = create_engine(DATABASE_URL, **pool_options)
+        instrument_queries(_engine)
+    return _engine
+
+def get_test_engine():
+    global _test_engine
+    if _test_engine is None:
+        if not TEST_DATABASE_URL:
+            raise RuntimeError("TEST_DATABASE_URL is not set")
+        _test_engine = create_engine(TEST_DATABASE_URL, **pool_options)
+        instrument_queries(_test_engine)
+    return _test_engine
+
+# API 핸들러용 비동기 엔진 (checkout 대기 시간 등 풀 통계 수집)
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(to_async_url(DATABASE_URL), poolclass=InstrumentedAsyncPool, **pool_options)
+        instrument_pool(_async_engine.sync_engine, InstrumentedAsyncPool.stats)
+        instrument_queries(_async_engine.sync_engine)
+    return _async_engine
+
+# 읽기 전용 replica 비동기 엔진 (REPLICA_DATABASE_URL이 없으면 None)
+def get_replica_async_engine():
+    global _replica_async_engine
+    if _replica_async_engine is None and REPLICA_DATABASE_URL:
+        _replica_async_engine = create_async_engine(
+            to_async_url(REPLICA_DATABASE_URL), poolclass=InstrumentedReplicaPool, **pool_options
+        )
+        instrument_pool(_replica_async_engine.sync_engine, InstrumentedReplicaPool.stats)
+        instrument_queries(_replica_async_engine.sync_engine)
+    return _replica_async_engine
+
+# 생성된 엔진의 연결을 모두 정리 (lifespan 종료 시 호출)
+async def dispose_engines():
+    global _engine, _test_engine, _async_engine, _replica_async_engine
+    for async_engine in (_async_engine, _replica_async_engine):
+        if async_engine is not None:
+            await async_engine.dispose()
+    for sync_engine in (_engine, _test_engine):
+        if sync_engine is not None:
+            sync_engine.dispose()
+    _engine = _test_engine = _async_engine = _replica_async_engine = None
+
+# 비동기 세션 생성 (백그라운드 작업 등 의존성 주입 밖에서 사용)
+def async_session() -> AsyncSession:
+    return AsyncSessionLocal(bind=get_async_engine())
 
 # DB 연결 세션 함수
 def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
+    db = SessionLocal(bind=get_engine())
     try:
         yield db
     finally:
         db.close()
 
+# 비동기 DB 연결 세션 함수 (API 핸들러에서 사용)
+#   요청 하나가 트랜잭션 하나: crud 헬퍼는 flush만 하고, 핸들러가 정상 종료하면 여기서 한 번 commit
+#   (예외가 나면 rollback. 응답은 commit이 끝난 뒤에 전송됨)
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with async_session() as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
+        if db.in_transaction():
+            await db.commit()
+
+# commit이 끝난 뒤에 실행할 작업 등록 (캐시 무효화 등). rollback되면 실행하지 않고 버림
+def after_commit(db: AsyncSession, callback):
+    db.info.setdefault("after_commit", []).append(callback)
+
+@event.listens_for(Session, "after_commit")
+def run_after_commit_callbacks(session):
+    for callback in session.info.pop("after_commit", ()):
+        callback()
+
+@event.listens_for(Session, "after_rollback")
+def discard_after_commit_callbacks(session):
+    session.info.pop("after_commit", None)
+
 # Test DB 연결 세션 함수
 def get_test_db() -> Generator[Session, None, None]:
-    db = TestSessionLocal()
+    db = TestSessionLocal(bind=get_test_engine())
     try:
         yield db
     finally:
         db.close()
 
-# 테이블 생성
+# 테이블 생성 (scripts/init_db.py에서 명시적으로 실행)
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    from db import models  # 모델을 Base.metadata에 등록
+    Base.metadata.create_all(bind=get_engine())
 
 def init_test_db():
-    Base.metadata.create_all(bind=test_engine)
\ No newline at end of file
+    from db import models  # 모델을 Base.metadata에 등록
+    Base.metadata.create_all(bind=get_test_engine())
@@ -5,12 +5,22 @@ from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from fastapi.security import OAuth2PasswordBearer
 from requests import session
-from api.v1 import recommend, model, register, oauth, login
-from api.v1.auth import validate_token
+from api.v1 import recommend, model, register, oauth, login, internal, profile
+from api.v1.auth import validate_token, verify_internal_key
 from db import models
-from db.session import get_db
+from db.session import get_db, get_async_engine, dispose_engines
+from db.replica import replica_router, check_replica_lag_periodically
+from db.query_stats import collect_queries
 from db.models import Auth
 from api.v1.history import router as history_router
+from core.config import AUTH_VERIFY_MODE, REPLICA_DATABASE_URL
+from core.security import refresh_revoked_tokens_periodically, sweep_expired_auth_periodically
+from services.food_service import refresh_food_catalog, refresh_food_catalog_periodically
+from services.meal_type_service import load_meal_type_registry
+from utils.model_client import get_model_client, close_model_client
+from utils.s3 import close_s3_client
+from contextlib import asynccontextmanager
+import asyncio
 import logging
 import os
 import time
@@ -31,8 +41,49 @@ logger = logging.getLogger(__name__)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# 앱 시작/종료 시 DB 엔진과 백그라운드 작업 관리
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # DB 엔진 생성 (스키마 생성은 scripts/init_db.py에서 별도로 실행)
+    get_async_engine()
+
+    # food_list 메모리 카탈로그 로드 (실패해도 주기적 갱신에서 다시 시도)
+    try:
+        await refresh_food_catalog()
+    except Exception as e:
+        logger.error(f"Failed to load food catalog: {str(e)}")
+
+    # meal_type 레지스트리 로드 (실패하면 첫 사용 시 다시 시도)
+    try:
+        await load_meal_type_registry()
+    except Exception as e:
+        logger.error(f"Failed to load meal type registry: {str(e)}")
+
+    # 모델 API 공유 클라이언트 생성 (keep-alive 연결을 요청 간에 재사용)
+    get_model_client()
+
+    # 만료된 auth 행을 주기적으로 정리하고 food_list 변경을 확인
+    tasks = [
+        asyncio.create_task(sweep_expired_auth_periodically()),
+        asyncio.create_task(refresh_food_catalog_periodically()),
+    ]
+    if AUTH_VERIFY_MODE == "jwt":
+        # jwt 모드에서는 폐기 토큰 목록을 주기적으로 DB에서 갱신
+        tasks.append(asyncio.create_task(refresh_revoked_tokens_periodically()))
+    if REPLICA_DATABASE_URL:
+        # replica 복제 지연을 주기적으로 확인 (확인 전까지는 조회를 primary로 보냄)
+        tasks.append(asyncio.create_task(check_replica_lag_periodically()))
+
+    yield
+
+    for task in tasks:
+        task.cancel()
+    await close_model_client()
+    close_s3_client()
+    await dispose_engines()
+
 # fastapi 앱 생성
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # 요청 및 응답을 기록하는 미들웨어 추가
 @app.middleware("http")
@@ -43,12 +94,30 @@ async def log_requests(request: Request, call_next):
     # 요청 처리 시간 측정
     start_time = time.time()
     
-    # 요청을 처리하여 응답 생성
-    response = await call_next(request)
+    # 요청을 처리하여 응답 생성 (실행된 SQL 문 수와 DB 시간 수집)
+    with collect_queries() as query_stats:
+        response = await call_next(request)
     
-    # 처리 완료 후, 응답 시간 기록
+    # 쓰기 요청을 보낸 사용자는 잠시 동안 조회도 primary에서 하도록 기록 (replica 지연으로 방금 쓴 데이터가 안 보이는 문제 방지)
+    user_id = getattr(request.state, "user_id", None)
+    if user_id is not None and request.method not in ("GET", "HEAD", "OPTIONS"):
+        replica_router.mark_write(user_id)
+
+    # 처리 완료 후, 응답 시간과 SQL 통계 기록
+    # (스트리밍 응답은 본문을 보내는 동안 실행된 SQL이 포함되지 않음)
     duration = time.time() - start_time
-    logger.info(f"Completed request in {duration:.2f}s - Status Code: {response.status_code}")
+    logger.info(
+        f"Completed request in {duration:.2f}s - Status Code: {response.status_code} - {query_stats.summary()}"
+    )
+    if query_stats.slowest_sql is not None:
+        logger.info(f"Slowest query ({query_stats.slowest_ms:.2f}ms): {query_stats.slowest_sql}")
+    for statement, count in query_stats.repeated():
+        logger.warning(f"Possible N+1: query executed {count} times in {request.method} {request.url.path}: {statement}")
+    # 핸들러가 단계별 시간(Server-Timing)을 넣었으면 그 뒤에 DB/전체 시간을 덧붙임
+    server_timing = f"{query_stats.server_timing()}, total;dur={duration * 1000:.2f}"
+    if "Server-Timing" in response.headers:
+        server_timing = f"{response.headers['Server-Timing']}, {server_timing}"
+    response.headers["Server-Timing"] = server_timing
     
     return response
 
@@ -74,9 +143,12 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 app.include_router(oauth.router, prefix="/api/v1/oauth", tags=["Oauth_kakaotoken"])
 app.include_router(login.router, prefix="/api/v1/user", tags=["user_Login"])
 app.include_router(register.router, prefix="/api/v1/user", tags=["user_Register"])
+app.include_router(profile.router, prefix="/api/v1/user", tags=["user_Profile"])
 app.include_router(recommend.router, prefix="/api/v1/recommend", tags=["Recommend"], dependencies=[Depends(validate_token)])
 app.include_router(model.router, prefix="/api/v1/model", tags=["Model"], dependencies=[Depends(validate_token)])
 app.include_router(history_router, prefix="/api/v1/history", tags=["History"], dependencies=[Depends(validate_token)])
+app.include_router(internal.router, prefix="/api/v1/internal", tags=["Internal"], include_in_schema=False,
+                   dependencies=[Depends(verify_internal_key)])
 
 # 서버 시작 시 로그 출력
 logger.info("FastAPI application has started.")
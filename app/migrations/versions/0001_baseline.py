@@ -0,0 +1,108 @@
+"""baseline schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+기존에 create_all로 만든 DB는 `alembic stamp 0001` 후 upgrade
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_info",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("age", sa.Integer(), nullable=False),
+        sa.Column("gender", sa.Integer(), nullable=False),
+        sa.Column("height", sa.DECIMAL(4, 1), nullable=False),
+        sa.Column("weight", sa.DECIMAL(4, 1), nullable=False),
+        sa.Column("birthday", sa.DATE(), nullable=False),
+        sa.Column("email", sa.String(100), nullable=False),
+        sa.Column("nickname", sa.String(20), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(), nullable=False),
+    )
+    op.create_table(
+        "food_list",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.Column("food_name", sa.String(15), nullable=False),
+        sa.Column("category_name", sa.String(10), nullable=False),
+        sa.Column("food_kcal", sa.DECIMAL(6, 2), nullable=False),
+        sa.Column("food_car", sa.DECIMAL(6, 2), nullable=False),
+        sa.Column("food_prot", sa.DECIMAL(6, 2), nullable=False),
+        sa.Column("food_fat", sa.DECIMAL(6, 2), nullable=False),
+    )
+    op.create_table(
+        "meal_type",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("type_name", sa.String(5), nullable=False),
+    )
+    op.create_table(
+        "auth",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("user_info.id"), nullable=False),
+        sa.Column("access_token", sa.String(255), nullable=False, unique=True),
+        sa.Column("access_created_at", sa.DateTime(), nullable=False),
+        sa.Column("access_expired_at", sa.DateTime(), nullable=False),
+        sa.Column("refresh_token", sa.String(255), nullable=False, unique=True),
+        sa.Column("refresh_created_at", sa.DateTime(), nullable=False),
+        sa.Column("refresh_expired_at", sa.DateTime(), nullable=False),
+    )
+    op.create_table(
+        "recommend",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("user_info.id"), nullable=False),
+        sa.Column("rec_kcal", sa.DECIMAL(6, 2), nullable=False),
+        sa.Column("rec_car", sa.DECIMAL(6, 2), nullable=False),
+        sa.Column("rec_prot", sa.DECIMAL(6, 2), nullable=False),
+        sa.Column("rec_fat", sa.DECIMAL(6, 2), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(), nullable=False),
+    )
+    op.create_table(
+        "history",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("user_info.id"), nullable=False),
+        sa.Column("category_id", sa.Integer(), sa.ForeignKey("food_list.id"), nullable=False),
+        sa.Column("meal_type_id", sa.Integer(), sa.ForeignKey("meal_type.id"), nullable=False),
+        sa.Column("image_url", sa.String(255), nullable=False),
+        sa.Column("date", sa.TIMESTAMP(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(), nullable=False),
+    )
+    op.create_table(
+        "total_today",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("user_info.id"), nullable=False),
+        sa.Column("total_kcal", sa.DECIMAL(6, 2), nullable=False),
+        sa.Column("total_car", sa.DECIMAL(6, 2), nullable=False),
+        sa.Column("total_prot", sa.DECIMAL(6, 2), nullable=False),
+        sa.Column("total_fat", sa.DECIMAL(6, 2), nullable=False),
+        sa.Column("condition", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(), nullable=False),
+        sa.Column("today", sa.DATE(), nullable=False),
+        sa.Column("history_ids", postgresql.ARRAY(sa.Integer()), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("total_today")
+    op.drop_table("history")
+    op.drop_table("recommend")
+    op.drop_table("auth")
+    op.drop_table("meal_type")
+    op.drop_table("food_list")
+    op.drop_table("user_info")
@@ -0,0 +1,40 @@
+"""one auth row per user and revoked_token table
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 로그인마다 쌓인 auth 행 중 사용자별 최신 행만 남기고 삭제
+    op.execute(
+        "DELETE FROM auth a USING auth b "
+        "WHERE a.user_id = b.user_id AND a.id < b.id"
+    )
+    op.create_unique_constraint("auth_user_id_key", "auth", ["user_id"])
+
+    op.create_table(
+        "revoked_token",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("token", sa.String(255), nullable=False, unique=True),
+        sa.Column("expired_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("revoked_token")
+    op.drop_constraint("auth_user_id_key", "auth", type_="unique")
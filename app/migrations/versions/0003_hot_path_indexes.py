@@ -0,0 +1,75 @@
+"""indexes for hot lookups
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+auth.access_token / auth.user_id는 이미 unique 제약(인덱스)이 있음
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # get_meals_by_user_and_date: user_id + date 조회
+    op.create_index("ix_history_user_id_date", "history", ["user_id", "date"])
+
+    # get_total_today: 사용자/날짜당 한 행. 중복 행은 가장 오래된 행(id가 가장 작은 행)에 합친 뒤 삭제
+    #   섭취량은 합산(DECIMAL(6, 2) 최대값으로 제한), history_ids는 중복 없이 합침, condition은 하나라도 true면 true
+    op.execute("""
+        UPDATE total_today t SET
+            total_kcal = least(d.total_kcal, 9999.99),
+            total_car = least(d.total_car, 9999.99),
+            total_prot = least(d.total_prot, 9999.99),
+            total_fat = least(d.total_fat, 9999.99),
+            condition = d.condition,
+            history_ids = d.history_ids,
+            updated_at = d.updated_at
+        FROM (
+            SELECT min(id) AS id, sum(total_kcal) AS total_kcal, sum(total_car) AS total_car,
+                   sum(total_prot) AS total_prot, sum(total_fat) AS total_fat, bool_or(condition) AS condition,
+                   max(updated_at) AS updated_at,
+                   coalesce((SELECT array_agg(DISTINCT history_id ORDER BY history_id)
+                             FROM total_today dup, unnest(dup.history_ids) AS history_id
+                             WHERE dup.user_id = g.user_id AND dup.today = g.today), '{}') AS history_ids
+            FROM total_today g
+            GROUP BY user_id, today
+            HAVING count(*) > 1
+        ) d
+        WHERE t.id = d.id
+    """)
+    op.execute(
+        "DELETE FROM total_today a USING total_today b "
+        "WHERE a.user_id = b.user_id AND a.today = b.today AND a.id > b.id"
+    )
+    op.create_unique_constraint("uq_total_today_user_id_today", "total_today", ["user_id", "today"])
+
+    # get_recommend_by_user_id: 사용자당 한 행. 권장 영양소는 다시 계산 가능하므로 최신 행만 남김
+    op.execute(
+        "DELETE FROM recommend a USING recommend b "
+        "WHERE a.user_id = b.user_id AND (a.updated_at, a.id) < (b.updated_at, b.id)"
+    )
+    op.create_unique_constraint("uq_recommend_user_id", "recommend", ["user_id"])
+
+    # get_food_by_category, history와 food_list 조인
+    op.create_index("ix_food_list_category_id", "food_list", ["category_id"])
+
+    # get_user_by_email: 중복 이메일이 있으면 실패하므로 먼저 정리해야 함
+    op.create_unique_constraint("uq_user_info_email", "user_info", ["email"])
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_user_info_email", "user_info", type_="unique")
+    op.drop_index("ix_food_list_category_id", table_name="food_list")
+    op.drop_constraint("uq_recommend_user_id", "recommend", type_="unique")
+    op.drop_constraint("uq_total_today_user_id_today", "total_today", type_="unique")
+    op.drop_index("ix_history_user_id_date", table_name="history")
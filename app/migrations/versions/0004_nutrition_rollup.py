@@ -0,0 +1,40 @@
+"""nutrition rollups by day, week and month
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+
+기존 history는 scripts/rebuild_rollups.py로 채움
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "nutrition_rollup",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("user_info.id"), nullable=False),
+        sa.Column("period", sa.String(5), nullable=False),
+        sa.Column("period_start", sa.DATE(), nullable=False),
+        sa.Column("total_kcal", sa.DECIMAL(10, 2), nullable=False),
+        sa.Column("total_car", sa.DECIMAL(10, 2), nullable=False),
+        sa.Column("total_prot", sa.DECIMAL(10, 2), nullable=False),
+        sa.Column("total_fat", sa.DECIMAL(10, 2), nullable=False),
+        sa.Column("meal_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(), nullable=False),
+        sa.UniqueConstraint("user_id", "period", "period_start", name="uq_nutrition_rollup_user_period_start"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("nutrition_rollup")
@@ -0,0 +1,32 @@
+"""widen token columns for typ/jti claims
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00
+
+토큰에 typ(access/refresh)와 jti(토큰마다 다른 값) claim이 추가되어 이메일이 긴 사용자는 255자를 넘을 수 있음
+varchar 길이만 늘리므로 테이블을 다시 쓰지 않음
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TOKEN_COLUMNS = [("auth", "access_token"), ("auth", "refresh_token"), ("revoked_token", "token")]
+
+
+def upgrade() -> None:
+    for table, column in TOKEN_COLUMNS:
+        op.alter_column(table, column, type_=sa.String(512), existing_type=sa.String(255), existing_nullable=False)
+
+
+def downgrade() -> None:
+    for table, column in TOKEN_COLUMNS:
+        op.alter_column(table, column, type_=sa.String(255), existing_type=sa.String(512), existing_nullable=False)
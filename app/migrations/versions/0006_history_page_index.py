@@ -0,0 +1,30 @@
+"""history (user_id, date, id) index for cursor pages
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+
+전체 식사 기록 조회는 (date, id) 역순 정렬 + (date, id) < 커서 조건이라 id까지 인덱스에 있어야 정렬 없이 LIMIT에서 멈춤
+(user_id, date) 조회도 앞부분으로 처리되므로 ix_history_user_id_date를 대체
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_history_user_id_date_id", "history", ["user_id", "date", "id"])
+    op.drop_index("ix_history_user_id_date", table_name="history")
+
+
+def downgrade() -> None:
+    op.create_index("ix_history_user_id_date", "history", ["user_id", "date"])
+    op.drop_index("ix_history_user_id_date_id", table_name="history")
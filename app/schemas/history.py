@@ -1,4 +1,5 @@
 from decimal import Decimal
+from typing import List
 from pydantic import BaseModel
 from datetime import datetime
 from decimal import Decimal
@@ -9,6 +10,10 @@ class HistoryCreateRequest(BaseModel):
     meal_type_id: int
     image_url: str
     date: datetime
+
+# 여러 식사 기록 일괄 저장 요청
+class HistoryBatchCreateRequest(BaseModel):
+    items: List[HistoryCreateRequest]
       
 class MealResponse(BaseModel):
     history_id: int
@@ -33,13 +33,14 @@ class User(UserBase):
     class Config:
         from_attributes = True  
 
+# 프로필 수정 요청 (보낸 필드만 변경)
 class UserUpdate(BaseModel):
-    birthday: date
-    gender: int
-    height: Decimal
-    weight: Decimal
-    email: EmailStr
-    nickname: str = Field(max_length=20)
+    birthday: Optional[date] = None
+    gender: Optional[int] = None
+    height: Optional[Decimal] = None
+    weight: Optional[Decimal] = None
+    email: Optional[EmailStr] = None
+    nickname: Optional[str] = Field(default=None, max_length=20)
 
 class Recommendations(BaseModel):
     rec_kcal: Decimal
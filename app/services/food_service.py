@@ -0,0 +1,132 @@
+# /app/services/food_service.py
+import asyncio
+import logging
+from array import array
+from datetime import datetime
+from decimal import Decimal
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import FOOD_CATALOG_REFRESH_SECONDS
+from db.models import Food_List
+from db.session import async_session
+
+logger = logging.getLogger(__name__)
+
+
+class FoodItem(NamedTuple):
+    id: int
+    category_id: int
+    food_name: str
+    category_name: str
+    food_kcal: Decimal
+    food_car: Decimal
+    food_prot: Decimal
+    food_fat: Decimal
+
+
+class FoodCatalog:
+    """category_id로 조회하는 food_list의 읽기 전용 메모리 사본"""
+
+    __slots__ = ("version", "loaded_at", "_index", "_ids", "_food_names", "_category_names",
+                 "_kcal", "_car", "_prot", "_fat")
+
+    def __init__(self, rows=(), version: Optional[str] = None):
+        index = {}
+        ids, food_names, category_names = [], [], []
+        # 영양소는 DECIMAL(6, 2)이므로 0.01 단위 정수 배열로 보관 (정확하고 메모리가 작음)
+        kcal, car, prot, fat = array("i"), array("i"), array("i"), array("i")
+        for row in rows:
+            # 같은 category_id가 여러 개면 id가 가장 작은 음식 사용 (rows는 id 순)
+            if row.category_id in index:
+                continue
+            index[row.category_id] = len(ids)
+            ids.append(row.id)
+            food_names.append(row.food_name)
+            category_names.append(row.category_name)
+            kcal.append(int(row.food_kcal * 100))
+            car.append(int(row.food_car * 100))
+            prot.append(int(row.food_prot * 100))
+            fat.append(int(row.food_fat * 100))
+
+        self.version = version
+        self.loaded_at = datetime.utcnow() if version is not None else None
+        self._index = MappingProxyType(index)
+        self._ids = tuple(ids)
+        self._food_names = tuple(food_names)
+        self._category_names = tuple(category_names)
+        self._kcal, self._car, self._prot, self._fat = kcal, car, prot, fat
+
+    def get(self, category_id: int) -> Optional[FoodItem]:
+        i = self._index.get(category_id)
+        if i is None:
+            return None
+        return FoodItem(
+            id=self._ids[i],
+            category_id=category_id,
+            food_name=self._food_names[i],
+            category_name=self._category_names[i],
+            food_kcal=Decimal(self._kcal[i]).scaleb(-2),
+            food_car=Decimal(self._car[i]).scaleb(-2),
+            food_prot=Decimal(self._prot[i]).scaleb(-2),
+            food_fat=Decimal(self._fat[i]).scaleb(-2),
+        )
+
+    def __contains__(self, category_id: int) -> bool:
+        return category_id in self._index
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self),
+            "version": self.version,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+        }
+
+
+# 현재 카탈로그 (갱신 시 새 객체로 통째로 교체하므로 조회 중인 요청과 경합이 없음)
+_catalog = FoodCatalog()
+
+
+def get_food_catalog() -> FoodCatalog:
+    return _catalog
+
+
+# 아직 한 번도 로드되지 않았으면(시작 시 로드 실패 등) 먼저 로드
+async def ensure_food_catalog() -> FoodCatalog:
+    if _catalog.version is None:
+        await refresh_food_catalog()
+    return _catalog
+
+
+# food_list 내용의 지문 (내용이 바뀌면 값이 바뀜)
+async def get_food_catalog_version(db: AsyncSession) -> str:
+    result = await db.execute(text(
+        "SELECT md5(coalesce(string_agg(food_list::text, ',' ORDER BY id), '')) FROM food_list"
+    ))
+    return result.scalar()
+
+
+async def refresh_food_catalog(force: bool = False) -> bool:
+    global _catalog
+    async with async_session() as db:
+        version = await get_food_catalog_version(db)
+        if not force and version == _catalog.version:
+            return False
+        result = await db.execute(select(Food_List).order_by(Food_List.id))
+        _catalog = FoodCatalog(result.scalars().all(), version)
+    logger.info(f"Food catalog loaded: {len(_catalog)} categories, version {version}")
+    return True
+
+
+async def refresh_food_catalog_periodically(interval: int = FOOD_CATALOG_REFRESH_SECONDS):
+    # 최초 로드는 lifespan에서 수행하므로 먼저 대기
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await refresh_food_catalog()
+        except Exception as e:
+            logger.error(f"Failed to refresh food catalog: {str(e)}")
@@ -0,0 +1,64 @@
+# /app/services/meal_type_service.py
+import logging
+from types import MappingProxyType
+from typing import Optional
+from sqlalchemy import select
+from db.models import Meal_Type
+from db.session import async_session
+
+logger = logging.getLogger(__name__)
+
+# meal_type.type_name 값
+BREAKFAST = "아침"
+LUNCH = "점심"
+DINNER = "저녁"
+OTHER = "기타"
+
+
+class MealTypeRegistry:
+    """meal_type 테이블의 읽기 전용 메모리 사본 (id <-> type_name)"""
+
+    __slots__ = ("_names", "_ids", "loaded")
+
+    def __init__(self, rows=(), loaded: bool = False):
+        names = {row.id: row.type_name for row in rows}
+        self._names = MappingProxyType(names)
+        self._ids = MappingProxyType({name: meal_type_id for meal_type_id, name in names.items()})
+        self.loaded = loaded
+
+    def name(self, meal_type_id: int) -> Optional[str]:
+        return self._names.get(meal_type_id)
+
+    # 등록되지 않은 이름은 "기타"의 id로 처리
+    def id_for(self, type_name: str) -> Optional[int]:
+        return self._ids.get(type_name, self._ids.get(OTHER))
+
+    def __contains__(self, meal_type_id: int) -> bool:
+        return meal_type_id in self._names
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+_registry = MealTypeRegistry()
+
+
+def get_meal_type_registry() -> MealTypeRegistry:
+    return _registry
+
+
+# meal_type은 거의 바뀌지 않으므로 시작 시 한 번만 로드
+async def load_meal_type_registry() -> MealTypeRegistry:
+    global _registry
+    async with async_session() as db:
+        result = await db.execute(select(Meal_Type).order_by(Meal_Type.id))
+        _registry = MealTypeRegistry(result.scalars().all(), loaded=True)
+    logger.info(f"Meal type registry loaded: {len(_registry)} types")
+    return _registry
+
+
+# 아직 로드되지 않았으면(시작 시 로드 실패 등) 먼저 로드
+async def ensure_meal_type_registry() -> MealTypeRegistry:
+    if not _registry.loaded:
+        await load_meal_type_registry()
+    return _registry
@@ -0,0 +1,44 @@
+# /app/services/prediction_service.py
+from core.config import PREDICTION_CACHE_MAXSIZE, PREDICTION_CACHE_TTL_SECONDS
+from utils.cache import TTLCache
+
+# 이미지 object URL(내용 해시로 만든 키) -> 모델이 분류한 category_id
+prediction_cache = TTLCache(maxsize=PREDICTION_CACHE_MAXSIZE, ttl=PREDICTION_CACHE_TTL_SECONDS)
+
+
+class UploadStats:
+    """예측 요청 이미지의 S3 업로드 수와 중복이라 생략한 업로드/바이트 수"""
+
+    def __init__(self):
+        self.uploads = 0
+        self.skipped_uploads = 0
+        self.bytes_uploaded = 0
+        self.bytes_saved = 0
+
+    def record(self, size: int, uploaded: bool) -> None:
+        if uploaded:
+            self.uploads += 1
+            self.bytes_uploaded += size
+        else:
+            self.skipped_uploads += 1
+            self.bytes_saved += size
+
+    def stats(self) -> dict:
+        total = self.uploads + self.skipped_uploads
+        return {
+            "uploads": self.uploads,
+            "skipped_uploads": self.skipped_uploads,
+            "bytes_uploaded": self.bytes_uploaded,
+            "bytes_saved": self.bytes_saved,
+            "skip_rate": round(self.skipped_uploads / total, 4) if total else 0.0,
+        }
+
+
+upload_stats = UploadStats()
+
+
+def prediction_status() -> dict:
+    return {
+        "prediction_cache": prediction_cache.stats(),
+        "uploads": upload_stats.stats(),
+    }
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from db import crud, models
 from fastapi import HTTPException
 from decimal import Decimal, ROUND_HALF_UP
+import numpy as np
 
 # def recommend_nutrition(user_id: int, db: Session):
 #     try:
@@ -82,4 +83,44 @@ def recommend_nutrition(weight: Decimal, height: Decimal, age: int, gender: int)
         "rec_car": rec_car,
         "rec_prot": rec_prot,
         "rec_fat": rec_fat
-    }
\ No newline at end of file
+    }
+
+
+# 해리스-베네딕트 계수를 정수로 환산 (키/몸무게는 0.1 단위 정수, BMR은 0.0001 단위 정수)
+#   남성: 88.362 + 13.397 * W + 4.799 * H - 5.677 * age
+#   여성: 447.593 + 9.247 * W + 3.098 * H - 4.330 * age
+_BMR_COEFFICIENTS = np.array([
+    [883620, 13397, 4799, 56770],   # gender 0
+    [4475930, 9247, 3098, 43300],   # gender 1
+], dtype=np.int64)
+
+
+# n / d를 0.01 단위로 ROUND_HALF_UP (0에서 먼 쪽으로) 반올림한 정수
+def _round_half_up(n: np.ndarray, d: int) -> np.ndarray:
+    return np.sign(n) * ((2 * np.abs(n) + d) // (2 * d))
+
+
+# recommend_nutrition의 벡터 버전
+#   weight_tenths, height_tenths: 몸무게/키 * 10 (DECIMAL(4, 1)을 정수로)
+#   반환값은 0.01 단위 정수 배열이며 recommend_nutrition 결과 * 100과 정확히 같음
+#   valid가 False인 행은 recommend_nutrition이 ValueError를 내는 입력
+def recommend_nutrition_bulk(weight_tenths, height_tenths, age, gender):
+    weight_tenths = np.asarray(weight_tenths, dtype=np.int64)
+    height_tenths = np.asarray(height_tenths, dtype=np.int64)
+    age = np.asarray(age, dtype=np.int64)
+    gender = np.asarray(gender, dtype=np.int64)
+
+    valid = (weight_tenths > 0) & (height_tenths > 0) & (age > 0) & ((gender == 0) | (gender == 1))
+    coefficients = _BMR_COEFFICIENTS[np.where(gender == 0, 0, 1)]
+    bmr = (coefficients[:, 0] + coefficients[:, 1] * weight_tenths
+           + coefficients[:, 2] * height_tenths - coefficients[:, 3] * age)
+
+    # rec_kcal = bmr * 1.55 (0.000001 단위), 탄:단:지 = 5:3:2, 1g당 4/4/9 kcal
+    kcal = bmr * 155
+    return {
+        "rec_kcal": _round_half_up(kcal, 10_000),
+        "rec_car": _round_half_up(kcal, 80_000),
+        "rec_prot": _round_half_up(3 * kcal, 400_000),
+        "rec_fat": _round_half_up(kcal, 450_000),
+        "valid": valid,
+    }
@@ -0,0 +1,84 @@
+# /app/utils/cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """최대 크기(LRU)와 만료 시간(TTL)을 가진 프로세스 내 캐시"""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            # 만료된 항목은 조회 시점에 제거
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        # 기본 TTL과 개별 TTL 중 짧은 값을 사용
+        if ttl is None:
+            ttl = self.ttl
+        elif self.ttl is not None:
+            ttl = min(ttl, self.ttl)
+
+        if ttl is not None and ttl <= 0:
+            return
+
+        expires_at = time.monotonic() + ttl if ttl is not None else float("inf")
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            # 최대 크기를 넘으면 가장 오래 사용되지 않은 항목부터 제거
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def evict_where(self, predicate: Callable[[Any], bool]) -> int:
+        """조건에 맞는 값을 가진 항목을 모두 제거하고 제거된 개수를 반환"""
+        with self._lock:
+            keys = [key for key, (value, _) in self._data.items() if predicate(value)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
@@ -1,8 +1,54 @@
 # /app/utils/image_processing.py
-from PIL import Image, ExifTags, UnidentifiedImageError
+from PIL import Image, ImageOps, ExifTags, UnidentifiedImageError
 from io import BytesIO
 import datetime
 from fastapi import HTTPException, status
+from core.config import MODEL_IMAGE_SIZE, THUMBNAIL_SIZE, DERIVED_IMAGE_QUALITY
+from services.meal_type_service import BREAKFAST, LUNCH, DINNER, OTHER
+from typing import BinaryIO, NamedTuple, Optional
+
+# 파일 앞부분(매직 바이트)으로 구분하는 허용 이미지 형식
+IMAGE_SIGNATURES = {
+    b"\xff\xd8\xff": "image/jpeg",
+    b"\x89PNG\r\n\x1a\n": "image/png",
+}
+# S3 객체 키에 붙이는 확장자
+IMAGE_EXTENSIONS = {"image/jpeg": "jpg", "image/png": "png"}
+
+# 파일 이름이 아닌 실제 내용으로 이미지 형식 확인 (허용 형식이 아니면 None)
+def sniff_image_type(header: bytes) -> Optional[str]:
+    for signature, mime_type in IMAGE_SIGNATURES.items():
+        if header.startswith(signature):
+            return mime_type
+    return None
+
+class DerivedImages(NamedTuple):
+    model_image: bytes
+    thumbnail: bytes
+
+def encode_jpeg(img: Image.Image, quality: int) -> bytes:
+    buffer = BytesIO()
+    img.save(buffer, "JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+# 모델 입력용 축소 이미지(긴 변 max_size)와 썸네일을 JPEG으로 생성
+# JPEG은 draft 모드로 디코딩 단계에서 1/2~1/8 크기로 줄여 읽으므로 전체 해상도로 디코딩하지 않음
+# 파일은 처음부터 읽고 끝나면 원래 위치로 되돌림
+def make_derived_images(fileobj: BinaryIO, max_size: int = MODEL_IMAGE_SIZE, thumbnail_size: int = THUMBNAIL_SIZE,
+                        quality: int = DERIVED_IMAGE_QUALITY) -> DerivedImages:
+    position = fileobj.tell()
+    fileobj.seek(0)
+    try:
+        with Image.open(fileobj) as img:
+            img.draft("RGB", (max_size, max_size))
+            # 휴대폰 사진의 EXIF 회전 정보를 적용해 똑바로 세운 이미지로 저장
+            img = ImageOps.exif_transpose(img).convert("RGB")
+        img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+        model_image = encode_jpeg(img, quality)
+        img.thumbnail((thumbnail_size, thumbnail_size), Image.Resampling.LANCZOS)
+        return DerivedImages(model_image, encode_jpeg(img, quality))
+    finally:
+        fileobj.seek(position)
 
 def extract_exif_data(file_bytes: bytes):
     try:
@@ -28,7 +74,11 @@ def extract_exif_data(file_bytes: bytes):
             }
         )
     
-    except AttributeError:
+    # 앞부분(header)만 받으므로 큰 이미지(PNG 등)는 EXIF를 읽는 중 잘린 데이터를 만날 수 있음. EXIF가 없는 것으로 처리
+    except OSError:
+        return None
+
+    except AttributeError as e:
         return HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail={
@@ -52,13 +102,13 @@ def determine_meal_type(taken_time: str) -> str:
         taken_time_obj = datetime.datetime.strptime(taken_time, time_format)  # datetime의 datetime 모듈 사용
         hour = taken_time_obj.hour
         if 6 <= hour <= 8:
-            return "아침"
+            return BREAKFAST
         elif 11 <= hour <= 13:
-            return "점심"
+            return LUNCH
         elif 17 <= hour <= 19:
-            return "저녁"
+            return DINNER
         else:
-            return "기타"
+            return OTHER
         
     except ValueError as e:
         return HTTPException(
@@ -0,0 +1,61 @@
+# /app/utils/model_client.py
+import asyncio
+import logging
+from typing import Optional
+import httpx
+from core.config import (
+    MODEL_API_URL, MODEL_API_CONNECT_TIMEOUT, MODEL_API_READ_TIMEOUT, MODEL_API_RETRIES,
+    MODEL_API_MAX_CONNECTIONS, MODEL_API_MAX_KEEPALIVE,
+)
+
+logger = logging.getLogger(__name__)
+
+# 다시 시도해도 되는 응답 (모델 서버 재시작, 프록시 오류 등)
+RETRY_STATUS_CODES = (502, 503, 504)
+# 다시 시도해도 되는 오류: 요청이 모델 서버에 도달하지 못했거나 재사용한 keep-alive 연결이 끊긴 경우
+# (ReadTimeout은 추론이 오래 걸린 것이므로 다시 시도하지 않음)
+RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+RETRY_BACKOFF_SECONDS = 0.1
+
+# 모델 API 공유 클라이언트 (lifespan에서 생성/정리)
+_client: Optional[httpx.AsyncClient] = None
+
+
+def create_model_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(MODEL_API_READ_TIMEOUT, connect=MODEL_API_CONNECT_TIMEOUT),
+        limits=httpx.Limits(max_connections=MODEL_API_MAX_CONNECTIONS,
+                            max_keepalive_connections=MODEL_API_MAX_KEEPALIVE),
+    )
+
+
+# 아직 생성되지 않았으면(lifespan 밖에서 호출 등) 먼저 생성
+def get_model_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_model_client()
+    return _client
+
+
+async def close_model_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+
+
+# 이미지 URL로 음식 분류 모델 호출 (응답 JSON 반환, 실패 시 httpx.HTTPError)
+async def predict_image_url(image_url: str, url: str = MODEL_API_URL, retries: int = MODEL_API_RETRIES) -> dict:
+    client = get_model_client()
+    for attempt in range(retries + 1):
+        try:
+            response = await client.post(url, params={"image_url": image_url})
+            if response.status_code not in RETRY_STATUS_CODES or attempt == retries:
+                response.raise_for_status()
+                return response.json()
+            logger.warning(f"Model API returned {response.status_code}, retrying ({attempt + 1}/{retries})")
+        except RETRY_ERRORS as e:
+            if attempt == retries:
+                raise
+            logger.warning(f"Model API request failed: {e!r}, retrying ({attempt + 1}/{retries})")
+        await asyncio.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
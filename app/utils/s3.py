@@ -1,11 +1,26 @@
 # /app/utils/s3.py
+import asyncio
+import hashlib
+import logging
 import boto3
-from botocore.exceptions import NoCredentialsError
+from botocore.config import Config
+from botocore.exceptions import ClientError, NoCredentialsError
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import HTTPException
 from io import BytesIO
 from dotenv import load_dotenv
+from typing import BinaryIO, Optional, Tuple
+from core.config import (
+    S3_ENDPOINT_URL, S3_UPLOAD_WORKERS, S3_MAX_POOL_CONNECTIONS, S3_CONNECT_TIMEOUT, S3_READ_TIMEOUT, S3_MAX_ATTEMPTS,
+    S3_PART_SIZE, MAX_UPLOAD_BYTES,
+)
 import os
 
+logger = logging.getLogger(__name__)
+
+# 해시를 계산할 때 한 번에 읽는 크기
+HASH_CHUNK_BYTES = 1024 * 1024
+
 # Load environment variables
 load_dotenv()
 
@@ -13,21 +28,172 @@ load_dotenv()
 aws_access_key = os.getenv("AWS_ACCESS_KEY_ID")
 aws_secret_key = os.getenv("AWS_SECRET_ACCESS_KEY")
 
-# Initialize S3 client
-s3_client = boto3.client(
-    's3',
-    aws_access_key_id=aws_access_key,
-    aws_secret_access_key=aws_secret_key
-)
+# 공유 S3 클라이언트와 업로드 스레드 풀 (처음 사용할 때 생성, lifespan 종료 시 정리)
+# botocore 클라이언트는 스레드 안전하므로 업로드 스레드들이 하나의 클라이언트(커넥션 풀)를 함께 사용
+_s3_client = None
+_upload_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_s3_client():
+    global _s3_client
+    if _s3_client is None:
+        _s3_client = boto3.client(
+            's3',
+            aws_access_key_id=aws_access_key,
+            aws_secret_access_key=aws_secret_key,
+            endpoint_url=S3_ENDPOINT_URL,
+            config=Config(
+                max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+                connect_timeout=S3_CONNECT_TIMEOUT,
+                read_timeout=S3_READ_TIMEOUT,
+                retries={"max_attempts": S3_MAX_ATTEMPTS, "mode": "standard"},
+            ),
+        )
+    return _s3_client
+
+
+# 동시에 실행되는 업로드 수를 S3_UPLOAD_WORKERS개로 제한 (나머지는 대기)
+def get_upload_executor() -> ThreadPoolExecutor:
+    global _upload_executor
+    if _upload_executor is None:
+        _upload_executor = ThreadPoolExecutor(max_workers=S3_UPLOAD_WORKERS, thread_name_prefix="s3-upload")
+    return _upload_executor
+
 
-def upload_image_to_s3(image_bytes: BytesIO, bucket_name: str, file_name: str) -> str:
+def close_s3_client():
+    global _s3_client, _upload_executor
+    if _upload_executor is not None:
+        _upload_executor.shutdown(wait=True)
+    if _s3_client is not None:
+        _s3_client.close()
+    _s3_client = _upload_executor = None
+
+
+# 업로드한 객체의 URL (로컬 S3 호환 서버는 path-style URL)
+def object_url(bucket_name: str, file_name: str) -> str:
+    if S3_ENDPOINT_URL:
+        return f"{S3_ENDPOINT_URL.rstrip('/')}/{bucket_name}/{file_name}"
+    return f"https://{bucket_name}.s3.amazonaws.com/{file_name}"
+
+
+def upload_image_to_s3(image_bytes: BytesIO, bucket_name: str, file_name: str, content_type: Optional[str] = None) -> str:
     """S3에 이미지를 업로드하고 URL을 반환하는 함수"""
-    s3 = boto3.client('s3')
+    extra_args = {"ContentType": content_type} if content_type else None
     try:
-        s3.upload_fileobj(image_bytes, bucket_name, file_name)
-        image_url = f"https://{bucket_name}.s3.amazonaws.com/{file_name}"
-        return image_url
+        get_s3_client().upload_fileobj(image_bytes, bucket_name, file_name, ExtraArgs=extra_args)
+        return object_url(bucket_name, file_name)
     except NoCredentialsError:
         raise HTTPException(status_code=500, detail="S3 credentials not available.")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload file to S3: {str(e)}")
+
+
+def check_upload_size(size: int, max_bytes: int = MAX_UPLOAD_BYTES):
+    if size > max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum size is {max_bytes // (1024 * 1024)} MB.",
+        )
+
+
+def upload_stream_to_s3(fileobj: BinaryIO, head: bytes, bucket_name: str, file_name: str,
+                        content_type: Optional[str] = None, max_bytes: int = MAX_UPLOAD_BYTES) -> str:
+    """파일 전체를 메모리에 올리지 않고 S3_PART_SIZE 단위로 읽어 S3에 업로드하고 URL을 반환하는 함수 (head: 이미 읽은 앞부분)"""
+    client = get_s3_client()
+    extra_args = {"ContentType": content_type} if content_type else {}
+    upload_id = None
+    try:
+        part = head + fileobj.read(max(S3_PART_SIZE - len(head), 0))
+        total = len(part)
+        check_upload_size(total, max_bytes)
+
+        # 파트 하나보다 작은 파일은 PutObject 한 번으로 업로드
+        if len(part) < S3_PART_SIZE:
+            client.put_object(Bucket=bucket_name, Key=file_name, Body=part, **extra_args)
+            return object_url(bucket_name, file_name)
+
+        # 큰 파일은 멀티파트 업로드: 한 번에 파트 하나만 메모리에 유지
+        upload_id = client.create_multipart_upload(Bucket=bucket_name, Key=file_name, **extra_args)["UploadId"]
+        parts = []
+        while part:
+            response = client.upload_part(
+                Bucket=bucket_name, Key=file_name, UploadId=upload_id, PartNumber=len(parts) + 1, Body=part
+            )
+            parts.append({"ETag": response["ETag"], "PartNumber": len(parts) + 1})
+            part = None  # 다음 파트를 읽기 전에 이전 파트 해제
+            part = fileobj.read(S3_PART_SIZE)
+            total += len(part)
+            check_upload_size(total, max_bytes)
+        client.complete_multipart_upload(
+            Bucket=bucket_name, Key=file_name, UploadId=upload_id, MultipartUpload={"Parts": parts}
+        )
+        return object_url(bucket_name, file_name)
+    except Exception as e:
+        # 완료되지 않은 멀티파트 업로드는 파트가 S3에 남아 과금되므로 중단
+        if upload_id is not None:
+            try:
+                client.abort_multipart_upload(Bucket=bucket_name, Key=file_name, UploadId=upload_id)
+            except Exception as abort_error:
+                logger.warning(f"Failed to abort multipart upload {file_name}: {abort_error}")
+        if isinstance(e, HTTPException):
+            raise
+        if isinstance(e, NoCredentialsError):
+            raise HTTPException(status_code=500, detail="S3 credentials not available.")
+        raise HTTPException(status_code=500, detail=f"Failed to upload file to S3: {str(e)}")
+
+
+# 파일 내용의 SHA-256과 크기 (head: 이미 읽은 앞부분)
+# 다 읽은 뒤 원래 위치(head 바로 뒤)로 되돌려 업로드가 이어서 읽을 수 있게 함
+def hash_stream(fileobj: BinaryIO, head: bytes, max_bytes: int = MAX_UPLOAD_BYTES) -> Tuple[str, int]:
+    digest = hashlib.sha256(head)
+    total = len(head)
+    start = fileobj.tell()
+    while chunk := fileobj.read(HASH_CHUNK_BYTES):
+        total += len(chunk)
+        check_upload_size(total, max_bytes)
+        digest.update(chunk)
+    fileobj.seek(start)
+    return digest.hexdigest(), total
+
+
+def object_exists(bucket_name: str, file_name: str) -> bool:
+    try:
+        get_s3_client().head_object(Bucket=bucket_name, Key=file_name)
+        return True
+    except ClientError:
+        # 없는 객체(404), 또는 ListBucket 권한이 없어 확인할 수 없는 경우(403)는 업로드
+        return False
+
+
+# 같은 키의 객체가 이미 있으면 업로드를 생략 (키가 내용 해시이므로 같은 키면 같은 내용)
+# (URL, 업로드 여부) 반환
+def upload_stream_to_s3_if_absent(fileobj: BinaryIO, head: bytes, bucket_name: str, file_name: str,
+                                  content_type: Optional[str] = None) -> Tuple[str, bool]:
+    if object_exists(bucket_name, file_name):
+        return object_url(bucket_name, file_name), False
+    return upload_stream_to_s3(fileobj, head, bucket_name, file_name, content_type), True
+
+
+def upload_image_to_s3_if_absent(image_bytes: bytes, bucket_name: str, file_name: str,
+                                 content_type: Optional[str] = None) -> Tuple[str, bool]:
+    if object_exists(bucket_name, file_name):
+        return object_url(bucket_name, file_name), False
+    return upload_image_to_s3(BytesIO(image_bytes), bucket_name, file_name, content_type), True
+
+
+# 업로드를 스레드 풀에서 실행 (업로드하는 동안 이벤트 루프는 다른 작업을 처리)
+# 파일은 업로드 스레드가 읽으므로 동시에 메모리에 있는 파트는 최대 S3_UPLOAD_WORKERS개 (대기 중인 요청은 앞부분만 보유)
+async def upload_stream_to_s3_if_absent_async(fileobj: BinaryIO, head: bytes, bucket_name: str, file_name: str,
+                                              content_type: Optional[str] = None) -> Tuple[str, bool]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_upload_executor(), upload_stream_to_s3_if_absent, fileobj, head, bucket_name, file_name, content_type
+    )
+
+
+async def upload_image_to_s3_if_absent_async(image_bytes: bytes, bucket_name: str, file_name: str,
+                                             content_type: Optional[str] = None) -> Tuple[str, bool]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_upload_executor(), upload_image_to_s3_if_absent, image_bytes, bucket_name, file_name, content_type
+    )
@@ -0,0 +1,66 @@
+# /scripts/bench_concurrency.py
+# 실행 중인 서버에 /api/v1/recommend/eaten_nutrient 요청을 동시에 보내 처리량과 지연 시간을 측정
+# 실행: BENCH_BASE_URL=http://127.0.0.1:8000 BENCH_TOKEN=<access token> python scripts/bench_concurrency.py
+import asyncio
+import os
+import statistics
+import time
+from datetime import date
+
+import httpx
+
+BASE_URL = os.getenv("BENCH_BASE_URL", "http://127.0.0.1:8000")
+TOKEN = os.getenv("BENCH_TOKEN")
+# 서버의 INTERNAL_API_KEY (없으면 커넥션 풀 통계는 출력하지 않음)
+INTERNAL_API_KEY = os.getenv("INTERNAL_API_KEY")
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "500"))
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "3"))
+
+
+async def call(client: httpx.AsyncClient, latencies: list, failures: list):
+    start = time.perf_counter()
+    try:
+        response = await client.get(
+            "/api/v1/recommend/eaten_nutrient",
+            params={"today": date.today().isoformat()},
+            headers={"Authorization": f"Bearer {TOKEN}"},
+        )
+    except httpx.HTTPError as e:
+        failures.append(type(e).__name__)
+        return
+    latencies.append((time.perf_counter() - start) * 1000)
+    if response.status_code != 200:
+        failures.append(response.status_code)
+
+
+async def main():
+    if not TOKEN:
+        raise SystemExit("BENCH_TOKEN is required")
+
+    limits = httpx.Limits(max_connections=CONCURRENCY, max_keepalive_connections=CONCURRENCY)
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=limits, timeout=60) as client:
+        for round_no in range(1, ROUNDS + 1):
+            latencies, failures = [], []
+            start = time.perf_counter()
+            await asyncio.gather(*(call(client, latencies, failures) for _ in range(CONCURRENCY)))
+            elapsed = time.perf_counter() - start
+
+            if not latencies:
+                print(f"round {round_no}: all {CONCURRENCY} requests failed ({failures[0]})")
+                continue
+            latencies.sort()
+            print(
+                f"round {round_no}: {CONCURRENCY} requests in {elapsed:.2f} s "
+                f"({CONCURRENCY / elapsed:.1f} req/s), "
+                f"p50 {statistics.median(latencies):.1f} ms, p99 {latencies[int(len(latencies) * 0.99)]:.1f} ms, "
+                f"failures {len(failures)}"
+            )
+
+        # 서버의 커넥션 풀 checkout 대기 통계
+        response = await client.get("/api/v1/internal/db_pool", headers={"X-Internal-Key": INTERNAL_API_KEY or ""})
+        if response.status_code == 200:
+            print(f"db pool: {response.json()['detail']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
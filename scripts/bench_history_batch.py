@@ -0,0 +1,105 @@
+# /scripts/bench_history_batch.py
+# 식사 기록 N개 저장 처리량 비교
+#   single: POST /api/v1/history/save_and_get를 N번 호출 (기록마다 커밋)
+#   batch : POST /api/v1/history/save_batch 한 번에 N개 (트랜잭션 한 번)
+# 실행: TEST_DATABASE_URL=postgresql://... python scripts/bench_history_batch.py
+# 주의: TEST_DATABASE_URL의 모든 테이블을 삭제 후 다시 생성함
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+if not os.getenv("TEST_DATABASE_URL"):
+    raise SystemExit("TEST_DATABASE_URL is required")
+os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+
+import httpx
+from sqlalchemy import create_engine, text
+from core.config import TEST_DATABASE_URL
+from db.crud import MAX_MEALS_PER_DAY
+from db.session import dispose_engines
+from init_db import upgrade
+from main import app
+
+SIZES = [int(size) for size in os.getenv("BENCH_SIZES", "10,50,100").split(",")]
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "5"))
+MEALS_PER_DAY = 3
+
+
+def seed():
+    engine = create_engine(TEST_DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+    upgrade(TEST_DATABASE_URL)
+
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO meal_type (id, type_name) VALUES (0, '아침'), (1, '점심'), (2, '저녁'), (3, '기타')"))
+        conn.execute(text(
+            "INSERT INTO food_list (id, category_id, food_name, category_name, food_kcal, food_car, food_prot, food_fat) "
+            "SELECT g, g, 'food' || g, 'cat' || g, 300, 50, 10, 8 FROM generate_series(1, 100) AS g"
+        ))
+    engine.dispose()
+
+
+async def login(client, email):
+    user = {"nickname": "bench", "email": email, "birthday": "1994-01-01", "gender": 0,
+            "height": "170.0", "weight": "65.0"}
+    await client.post("/api/v1/user/register", json=user)
+    response = await client.post("/api/v1/user/login", json={"email": email, "nickname": user["nickname"]})
+    token = response.json()["detail"]["wellness_info"]["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+# 하루 MEALS_PER_DAY끼씩 first_day부터 이어지는 n개의 식사 기록
+def meals(n, first_day):
+    return [
+        {
+            "category_id": i % 100 + 1,
+            "meal_type_id": i % MEALS_PER_DAY,
+            "image_url": f"https://example.com/{first_day:%Y%m%d}/{i}",
+            "date": (first_day + timedelta(days=i // MEALS_PER_DAY, hours=8 + i % MEALS_PER_DAY * 5)).isoformat(),
+        }
+        for i in range(n)
+    ]
+
+
+async def save_single(client, headers, items):
+    for item in items:
+        response = await client.post("/api/v1/history/save_and_get", headers=headers, json=item)
+        assert response.json()["status_code"] == 201, response.text
+
+
+async def save_batch(client, headers, items):
+    response = await client.post("/api/v1/history/save_batch", headers=headers, json={"items": items})
+    assert response.json()["status_code"] == 201, response.text
+
+
+async def main():
+    assert MEALS_PER_DAY <= MAX_MEALS_PER_DAY
+    seed()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        headers = await login(client, "bench@example.com")
+        first_day = datetime(2000, 1, 1)
+        for size in SIZES:
+            results = {}
+            for label, save in (("single", save_single), ("batch", save_batch)):
+                elapsed = 0.0
+                for _ in range(ROUNDS):
+                    # 라운드마다 아직 기록이 없는 날짜 사용
+                    items = meals(size, first_day)
+                    first_day += timedelta(days=size // MEALS_PER_DAY + 1)
+                    start = time.perf_counter()
+                    await save(client, headers, items)
+                    elapsed += time.perf_counter() - start
+                results[label] = size * ROUNDS / elapsed
+            print(f"N={size:<4}: single {results['single']:7.0f} meals/s, batch {results['batch']:7.0f} meals/s "
+                  f"({results['batch'] / results['single']:.1f}x)")
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,168 @@
+# /scripts/bench_history_pages.py
+# GET /api/v1/history로 한 사용자의 식사 기록 100k행을 처음부터 끝까지 페이지 단위로 조회
+#   keyset: next_cursor로 다음 페이지 요청 (현재 API)
+#   offset: 같은 정렬에 OFFSET/LIMIT으로 조회한 경우 (비교용, SQL만 실행)
+#   페이지 위치별 지연 시간과, 서버에서 응답을 만드는 동안의 메모리 최대 사용량(tracemalloc)을 출력
+# 실행: TEST_DATABASE_URL=postgresql://... python scripts/bench_history_pages.py
+# 주의: TEST_DATABASE_URL의 모든 테이블을 삭제 후 다시 생성함
+import asyncio
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+if not os.getenv("TEST_DATABASE_URL"):
+    raise SystemExit("TEST_DATABASE_URL is required")
+os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+
+import httpx
+from sqlalchemy import create_engine, select, text
+from core.config import TEST_DATABASE_URL
+from db.models import History
+from db.session import async_session, dispose_engines
+from init_db import upgrade
+from main import app
+
+ROWS = int(os.getenv("BENCH_ROWS", "100000"))
+PAGE_SIZES = [int(size) for size in os.getenv("BENCH_PAGE_SIZES", "100,1000").split(",")]
+FIRST_DAY = datetime(2020, 1, 1)
+
+
+def seed():
+    engine = create_engine(TEST_DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+    upgrade(TEST_DATABASE_URL)
+
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO meal_type (id, type_name) VALUES (0, '아침'), (1, '점심'), (2, '저녁'), (3, '기타')"))
+        conn.execute(text(
+            "INSERT INTO food_list (id, category_id, food_name, category_name, food_kcal, food_car, food_prot, food_fat) "
+            "SELECT g, g, 'food' || g, 'cat' || g, 300, 50, 10, 8 FROM generate_series(1, 100) AS g"
+        ))
+        # 다른 사용자의 기록도 함께 있는 테이블에서 조회
+        conn.execute(text(
+            "INSERT INTO user_info (age, gender, height, weight, birthday, email, nickname, created_at, updated_at) "
+            "SELECT 30, 0, 170.0, 65.0, DATE '1994-01-01', 'user' || g || '@example.com', 'user' || g, now(), now() "
+            "FROM generate_series(1, 10) AS g"
+        ))
+        # 하루 3끼, 같은 끼니는 같은 date 값 (date가 같은 행은 id로 정렬)
+        conn.execute(text(
+            "INSERT INTO history (user_id, category_id, meal_type_id, image_url, date, created_at, updated_at) "
+            "SELECT u, g % 100 + 1, g % 3, 'https://example.com/' || g, "
+            "CAST(:first_day AS timestamp) + (g / 3 || ' hours')::interval, now(), now() "
+            "FROM generate_series(1, 10) AS u, generate_series(0, :rows - 1) AS g"
+        ), {"first_day": FIRST_DAY, "rows": ROWS})
+        conn.execute(text("ANALYZE"))
+    engine.dispose()
+
+
+async def login(client):
+    user = {"nickname": "bench", "email": "bench@example.com", "birthday": "1994-01-01", "gender": 0,
+            "height": "170.0", "weight": "65.0"}
+    await client.post("/api/v1/user/register", json=user)
+    response = await client.post("/api/v1/user/login", json={"email": user["email"], "nickname": user["nickname"]})
+    token = response.json()["detail"]["wellness_info"]["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def keyset_pages(client, headers, page_size):
+    cursor, latencies, rows = None, [], 0
+    while True:
+        params = {"limit": page_size}
+        if cursor:
+            params["cursor"] = cursor
+        start = time.perf_counter()
+        response = await client.get("/api/v1/history", headers=headers, params=params)
+        latencies.append((time.perf_counter() - start) * 1000)
+        detail = response.json()["detail"]
+        rows += len(detail["Wellness_meal_list"])
+        cursor = detail["next_cursor"]
+        if not cursor:
+            return rows, latencies
+
+
+# 응답 본문을 받는 즉시 버리면서 앱을 직접 호출 (클라이언트 쪽 버퍼를 빼고 서버 메모리만 측정)
+async def server_peak_memory(headers, page_size):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/api/v1/history", "raw_path": b"/api/v1/history", "root_path": "",
+        "query_string": f"limit={page_size}".encode(), "server": ("bench", 80), "client": ("bench", 1),
+        "headers": [(key.lower().encode(), value.encode()) for key, value in headers.items()],
+    }
+    chunks = []
+    requested = asyncio.Event()
+
+    # 요청 본문은 한 번만 보내고, 이후에는 연결이 끊기지 않은 것처럼 대기
+    async def receive():
+        if requested.is_set():
+            await asyncio.Event().wait()
+        requested.set()
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            chunks.append(len(message.get("body", b"")))
+
+    tracemalloc.start()
+    await app(scope, receive, send)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, len(chunks), max(chunks)
+
+
+async def offset_pages(user_id, page_size):
+    latencies = []
+    async with async_session() as db:
+        for offset in range(0, ROWS, page_size):
+            start = time.perf_counter()
+            await db.execute(
+                select(History.id, History.meal_type_id, History.category_id, History.date)
+                .where(History.user_id == user_id)
+                .order_by(History.date.desc(), History.id.desc())
+                .offset(offset).limit(page_size)
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def describe(latencies):
+    tenth = max(len(latencies) // 10, 1)
+    return (f"first 10% {statistics.mean(latencies[:tenth]):.1f} ms, "
+            f"last 10% {statistics.mean(latencies[-tenth:]):.1f} ms, total {sum(latencies) / 1000:.1f} s")
+
+
+async def main():
+    seed()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        headers = await login(client)
+        # 가입한 사용자의 기록을 1번 사용자와 같게 복사
+        async with async_session() as db:
+            user_id = (await db.execute(text("SELECT max(id) FROM user_info"))).scalar()
+            await db.execute(text(
+                "INSERT INTO history (user_id, category_id, meal_type_id, image_url, date, created_at, updated_at) "
+                "SELECT :user_id, category_id, meal_type_id, image_url, date, created_at, updated_at "
+                "FROM history WHERE user_id = 1"
+            ), {"user_id": user_id})
+            await db.execute(text("ANALYZE history"))
+            await db.commit()
+
+        for page_size in PAGE_SIZES:
+            rows, latencies = await keyset_pages(client, headers, page_size)
+            print(f"keyset limit={page_size:<5}: {rows} rows in {len(latencies)} pages, {describe(latencies)}")
+        for page_size in PAGE_SIZES:
+            peak, chunks, largest = await server_peak_memory(headers, page_size)
+            print(f"memory limit={page_size:<5}: peak {peak / 1024:.0f} KiB, {chunks} body chunks (largest {largest / 1024:.0f} KiB)")
+        for page_size in PAGE_SIZES:
+            latencies = await offset_pages(user_id, page_size)
+            print(f"offset limit={page_size:<5}: SQL only, {len(latencies)} pages, {describe(latencies)}")
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,144 @@
+# /scripts/bench_history_query.py
+# 하루치 식사 기록 조회(get_meals_by_user_and_date)의 지연 시간을 조인 방식별로 측정
+#   food + meal_type join: history, food_list, meal_type 3개 테이블 조인 (기존 방식)
+#   meal_type join       : history, meal_type 조인 + 음식 정보는 메모리 카탈로그
+#   no join              : history만 조회 + 음식/식사 종류 이름은 메모리 카탈로그/레지스트리 (현재 crud)
+# 실행: TEST_DATABASE_URL=postgresql://... python scripts/bench_history_query.py
+# 주의: TEST_DATABASE_URL의 모든 테이블을 삭제 후 다시 생성함
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+# 카탈로그/레지스트리도 테스트 DB에서 로드되도록 앱 DB를 테스트 DB로 지정
+if not os.getenv("TEST_DATABASE_URL"):
+    raise SystemExit("TEST_DATABASE_URL is required")
+os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+
+from sqlalchemy import create_engine, select, text
+from core.config import TEST_DATABASE_URL
+from db import crud
+from db.models import History, Food_List, Meal_Type
+from db.session import async_session, dispose_engines
+from services.food_service import ensure_food_catalog
+from services.meal_type_service import ensure_meal_type_registry
+from init_db import upgrade
+
+USERS = int(os.getenv("BENCH_USERS", "2000"))
+DAYS = int(os.getenv("BENCH_DAYS", "60"))
+MEALS_PER_DAY = 3
+LOOKUPS = int(os.getenv("BENCH_LOOKUPS", "2000"))
+FIRST_DAY = date(2026, 1, 1)
+
+
+def seed():
+    engine = create_engine(TEST_DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+    upgrade(TEST_DATABASE_URL)
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO user_info (age, gender, height, weight, birthday, email, nickname, created_at, updated_at) "
+            "SELECT 30, g % 2, 170.0, 65.0, DATE '1994-01-01', 'user' || g || '@example.com', 'user' || g, now(), now() "
+            "FROM generate_series(1, :users) AS g"
+        ), {"users": USERS})
+        conn.execute(text("INSERT INTO meal_type (id, type_name) VALUES (0, '아침'), (1, '점심'), (2, '저녁'), (3, '기타')"))
+        conn.execute(text(
+            "INSERT INTO food_list (id, category_id, food_name, category_name, food_kcal, food_car, food_prot, food_fat) "
+            "SELECT g, g, 'food' || g, 'cat' || g, 300, 50, 10, 8 FROM generate_series(1, 100) AS g"
+        ))
+        # 앱과 같이 같은 날의 식사는 같은 date 값으로 저장
+        conn.execute(text(
+            "INSERT INTO history (user_id, category_id, meal_type_id, image_url, date, created_at, updated_at) "
+            "SELECT u.id, (u.id + d * 3 + m) % 100 + 1, m, 'https://example.com/' || u.id || '/' || d || '/' || m, "
+            "CAST(:first_day AS timestamp) + (d || ' days')::interval, now(), now() "
+            "FROM user_info u, generate_series(0, :days - 1) AS d, generate_series(0, :meals - 1) AS m"
+        ), {"first_day": FIRST_DAY, "days": DAYS, "meals": MEALS_PER_DAY})
+        conn.execute(text("ANALYZE"))
+    engine.dispose()
+
+
+async def food_and_meal_type_join(db, user, day):
+    result = await db.execute(
+        select(
+            History.id.label("history_id"),
+            Meal_Type.type_name.label("meal_type_name"),
+            Food_List.category_name,
+            Food_List.food_kcal,
+            Food_List.food_car,
+            Food_List.food_prot,
+            Food_List.food_fat,
+            History.date
+        ).join(Food_List, History.category_id == Food_List.category_id)
+         .join(Meal_Type, History.meal_type_id == Meal_Type.id)
+         .where(History.date == day)
+         .where(History.user_id == user.id)
+    )
+    return result.all()
+
+
+async def meal_type_join(db, user, day):
+    result = await db.execute(
+        select(
+            History.id.label("history_id"),
+            Meal_Type.type_name.label("meal_type_name"),
+            History.category_id,
+            History.date
+        ).join(Meal_Type, History.meal_type_id == Meal_Type.id)
+         .where(History.date == day)
+         .where(History.user_id == user.id)
+    )
+    catalog = await ensure_food_catalog()
+    return [(row, catalog.get(row.category_id)) for row in result.all()]
+
+
+async def no_join(db, user, day):
+    return await crud.get_meals_by_user_and_date(db, user, day)
+
+
+async def run(db, query, lookups):
+    samples = []
+    for user, day in lookups:
+        start = time.perf_counter()
+        meals = await query(db, user, day)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert len(meals) == MEALS_PER_DAY
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99)]
+
+
+async def main():
+    seed()
+    rng = random.Random(0)
+    lookups = [
+        (SimpleNamespace(id=rng.randint(1, USERS)),
+         datetime.combine(FIRST_DAY + timedelta(days=rng.randrange(DAYS)), datetime.min.time()))
+        for _ in range(LOOKUPS)
+    ]
+
+    async with async_session() as db:
+        await ensure_food_catalog()
+        await ensure_meal_type_registry()
+        # 워밍업 (커넥션, prepared statement 캐시)
+        for query in (food_and_meal_type_join, meal_type_join, no_join):
+            await run(db, query, lookups[:100])
+
+        print(f"history rows: {USERS * DAYS * MEALS_PER_DAY}, lookups: {LOOKUPS}")
+        for label, query in (("food + meal_type join", food_and_meal_type_join),
+                             ("meal_type join", meal_type_join),
+                             ("no join", no_join)):
+            p50, p99 = await run(db, query, lookups)
+            print(f"{label:<22}: p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
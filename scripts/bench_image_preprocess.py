@@ -0,0 +1,172 @@
+# /scripts/bench_image_preprocess.py
+# 12MP 휴대폰 사진 기준 축소 이미지 생성 효과 측정
+#   decode: 모델 입력 크기로 만들기까지의 시간 (전체 해상도 디코딩 후 축소 vs draft 모드 디코딩 후 축소, 썸네일 포함)
+#   predict: POST /api/v1/model/predict 지연 시간과 전송 바이트 (MODEL_IMAGE_SIZE=0: 원본을 모델에 전달)
+#     S3: 로컬 S3 호환 서버(moto)
+#     모델 API: 받은 URL의 이미지를 S3에서 내려받아 224x224로 디코딩/축소(분류 모델 전처리)한 뒤 STUB_DELAY_MS 대기
+# 실행: TEST_DATABASE_URL=postgresql://... python scripts/bench_image_preprocess.py
+# 주의: TEST_DATABASE_URL의 모든 테이블을 삭제 후 다시 생성함
+import asyncio
+import os
+import statistics
+import sys
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+if not os.getenv("TEST_DATABASE_URL"):
+    raise SystemExit("TEST_DATABASE_URL is required")
+os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+os.environ["BUCKET_NAME"] = "wellness-bench"
+
+from moto.server import ThreadedMotoServer
+
+s3_server = ThreadedMotoServer(ip_address="127.0.0.1", port=0)
+s3_server.start()
+os.environ["S3_ENDPOINT_URL"] = "http://%s:%d" % s3_server.get_host_and_port()
+
+import httpx
+from PIL import Image, ImageChops
+from sqlalchemy import create_engine, text
+from api.v1 import model
+from core.config import TEST_DATABASE_URL, MODEL_IMAGE_SIZE, THUMBNAIL_SIZE
+from db.session import dispose_engines
+from init_db import upgrade
+from main import app
+from services.prediction_service import upload_stats
+from utils import model_client
+from utils.image_processing import make_derived_images
+from utils.s3 import get_s3_client, close_s3_client
+
+PHOTOS = int(os.getenv("BENCH_PHOTOS", "5"))
+REQUESTS = int(os.getenv("BENCH_REQUESTS", "20"))
+STUB_DELAY_MS = float(os.getenv("STUB_DELAY_MS", "50"))
+# 12MP (4032x3024)
+WIDTH, HEIGHT = (int(size) for size in os.getenv("BENCH_IMAGE_SIZE", "4032x3024").split("x"))
+CLASSIFIER_INPUT = (224, 224)
+
+
+def seed():
+    engine = create_engine(TEST_DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+    upgrade(TEST_DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO meal_type (id, type_name) VALUES (0, '아침'), (1, '점심'), (2, '저녁'), (3, '기타')"))
+        conn.execute(text(
+            "INSERT INTO food_list (id, category_id, food_name, category_name, food_kcal, food_car, food_prot, food_fat) "
+            "VALUES (1, 1, '김밥', '김밥', 300, 50, 10, 8)"
+        ))
+    engine.dispose()
+
+
+def phone_photo(seed: int) -> bytes:
+    # 여러 크기의 얼룩(저해상도 노이즈를 키운 것)과 미세 노이즈를 더한 사진 (휴대폰 사진과 비슷한 3~5MB JPEG)
+    size = (WIDTH, HEIGHT)
+    channels = []
+    for i in range(3):
+        layers = [Image.effect_noise((WIDTH // scale, HEIGHT // scale), 60).resize(size, Image.Resampling.BICUBIC)
+                  for scale in (64, 8)]
+        channels.append(ImageChops.add(ImageChops.add(layers[0], layers[1], scale=2),
+                                       Image.effect_noise(size, 6 + seed), scale=1.5))
+    exif = Image.Exif()
+    exif[36867] = "2026:10:18 12:30:00"
+    buffer = BytesIO()
+    Image.merge("RGB", channels).save(buffer, "JPEG", quality=92, exif=exif)
+    return buffer.getvalue()
+
+
+def full_decode(photo: bytes):
+    with Image.open(BytesIO(photo)) as img:
+        img = img.convert("RGB")
+        img.thumbnail((MODEL_IMAGE_SIZE, MODEL_IMAGE_SIZE), Image.Resampling.LANCZOS)
+        return img
+
+
+def median_ms(func, photos, repeat=3) -> float:
+    samples = []
+    for photo in photos:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(photo)
+            samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+fetched_bytes = 0
+
+
+# 분류 모델 전처리: 이미지를 내려받아 입력 크기로 디코딩/축소 (moto는 익명 GET을 막으므로 S3 클라이언트로 읽음)
+def classifier_preprocess(image_url: str) -> int:
+    key = image_url.rsplit("/", 1)[1]
+    image = get_s3_client().get_object(Bucket=os.environ["BUCKET_NAME"], Key=key)["Body"].read()
+    with Image.open(BytesIO(image)) as img:
+        img.convert("RGB").resize(CLASSIFIER_INPUT)
+    return len(image)
+
+
+async def stub_model(request: httpx.Request):
+    global fetched_bytes
+    fetched_bytes += await asyncio.to_thread(classifier_preprocess, request.url.params["image_url"])
+    await asyncio.sleep(STUB_DELAY_MS / 1000)
+    return httpx.Response(200, json={"category_id": 1})
+
+
+async def predict_run(client, headers, photos, model_image_size: int, run_id: int):
+    global fetched_bytes
+    model.MODEL_IMAGE_SIZE = model_image_size
+    fetched_bytes = 0
+    uploaded_before = upload_stats.bytes_uploaded
+    samples = []
+    for i in range(REQUESTS):
+        # 요청마다 내용이 달라지도록 JPEG 끝 뒤에 바이트를 붙임 (분류 결과 캐시/중복 업로드 생략 방지)
+        image = photos[i % len(photos)] + f"{run_id}:{i}".encode()
+        start = time.perf_counter()
+        response = await client.post("/api/v1/model/predict", headers=headers,
+                                     files={"file": ("meal.jpg", image, "image/jpeg")})
+        samples.append((time.perf_counter() - start) * 1000)
+        assert response.json()["status_code"] == 201, response.text
+    samples.sort()
+    return (statistics.median(samples), samples[int(len(samples) * 0.9)],
+            (upload_stats.bytes_uploaded - uploaded_before) / REQUESTS, fetched_bytes / REQUESTS)
+
+
+async def main():
+    photos = [phone_photo(i) for i in range(PHOTOS)]
+    derived = make_derived_images(BytesIO(photos[0]))
+    mb = 1024 * 1024
+    print(f"{PHOTOS} photos {WIDTH}x{HEIGHT}, avg {statistics.mean(map(len, photos)) / mb:.2f} MB | "
+          f"model image {MODEL_IMAGE_SIZE}px {len(derived.model_image) / 1024:.0f} KB, "
+          f"thumbnail {THUMBNAIL_SIZE}px {len(derived.thumbnail) / 1024:.0f} KB")
+    print(f"decode to {MODEL_IMAGE_SIZE}px: full {median_ms(full_decode, photos):.1f} ms, "
+          f"draft + thumbnail {median_ms(lambda photo: make_derived_images(BytesIO(photo)), photos):.1f} ms")
+
+    seed()
+    get_s3_client().create_bucket(Bucket=os.environ["BUCKET_NAME"])
+    model_client._client = httpx.AsyncClient(transport=httpx.MockTransport(stub_model))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        user = {"nickname": "bench", "email": "bench@example.com", "birthday": "1994-01-01", "gender": 0,
+                "height": "170.0", "weight": "65.0"}
+        response = await client.post("/api/v1/user/register", json=user)
+        headers = {"Authorization": f"Bearer {response.json()['detail']['wellness_info']['access_token']}"}
+        await predict_run(client, headers, photos[:1], MODEL_IMAGE_SIZE, 0)  # 워밍업
+
+        for run_id, (label, size) in enumerate((("original", 0), (f"{MODEL_IMAGE_SIZE}px", MODEL_IMAGE_SIZE)), 1):
+            p50, p90, uploaded, fetched = await predict_run(client, headers, photos, size, run_id)
+            print(f"predict {label:<8}: p50 {p50:6.1f} ms, p90 {p90:6.1f} ms | per request: "
+                  f"uploaded to S3 {uploaded / mb:.2f} MB, fetched by model {fetched / 1024:.0f} KB")
+
+    await model_client.close_model_client()
+    close_s3_client()
+    await dispose_engines()
+    s3_server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
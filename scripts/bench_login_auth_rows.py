@@ -0,0 +1,103 @@
+# /scripts/bench_login_auth_rows.py
+# auth 테이블에 과거 토큰 행이 100만 개 쌓인 상태에서 로그인 시 auth 조회 지연 시간을 측정
+#   before: 사용자당 여러 행, user_id 유니크 인덱스 없음 (기존 insert 방식)
+#   after : 만료 행 정리 후 사용자당 한 행, user_id 유니크 인덱스 사용 (upsert 방식)
+# 실행: TEST_DATABASE_URL=postgresql://... python scripts/bench_login_auth_rows.py
+# 주의: TEST_DATABASE_URL의 user_info/auth 테이블을 삭제 후 다시 생성함
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from core.config import TEST_DATABASE_URL
+from db import crud
+from db.models import Auth, User
+from db.session import to_async_url
+
+HISTORICAL_ROWS = int(os.getenv("BENCH_AUTH_ROWS", "1000000"))
+USERS = int(os.getenv("BENCH_USERS", "10000"))
+LOOKUPS = 200
+
+
+def time_lookups(db):
+    samples = []
+    # 순서대로 조회하면 synchronized seqscan 때문에 스캔 비용이 가려지므로 섞어서 조회
+    user_ids = [i * USERS // LOOKUPS + 1 for i in range(LOOKUPS)]
+    random.Random(0).shuffle(user_ids)
+    for user_id in user_ids:
+        start = time.perf_counter()
+        db.query(Auth).filter(Auth.user_id == user_id).first()
+        samples.append((time.perf_counter() - start) * 1000)
+    # 조회 트랜잭션을 끝내 이후 DDL이 잠금 대기하지 않도록 함
+    db.rollback()
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99)]
+
+
+async def sweep(batch_size: int) -> int:
+    async_engine = create_async_engine(to_async_url(TEST_DATABASE_URL))
+    swept = 0
+    async with async_sessionmaker(bind=async_engine)() as db:
+        while True:
+            deleted = await crud.delete_expired_auth(db, batch_size)
+            swept += deleted
+            if deleted < batch_size:
+                break
+    await async_engine.dispose()
+    return swept
+
+
+def main():
+    engine = create_engine(TEST_DATABASE_URL)
+    Auth.__table__.drop(engine, checkfirst=True)
+    User.__table__.drop(engine, checkfirst=True)
+    User.__table__.create(engine)
+    Auth.__table__.create(engine)
+
+    with engine.begin() as conn:
+        # before 상태 재현: user_id 유니크 제약 제거
+        conn.execute(text("ALTER TABLE auth DROP CONSTRAINT IF EXISTS auth_user_id_key"))
+        conn.execute(text(
+            "INSERT INTO user_info (age, gender, height, weight, birthday, email, nickname, created_at, updated_at) "
+            "SELECT 30, g % 2, 170.0, 65.0, DATE '1994-01-01', 'user' || g || '@example.com', 'user' || g, now(), now() "
+            "FROM generate_series(1, :users) AS g"
+        ), {"users": USERS})
+        # 로그인할 때마다 새 행을 추가하던 기존 방식의 누적 결과 (대부분 만료된 행)
+        # 행은 시간 순으로 쌓이므로 나중에 가입한 사용자의 행일수록 테이블 뒤쪽에 위치
+        conn.execute(text(
+            "INSERT INTO auth (user_id, access_token, access_created_at, access_expired_at, "
+            "refresh_token, refresh_created_at, refresh_expired_at) "
+            "SELECT ((g - 1)::bigint * :users / :rows + 1)::int, 'access-' || g, now() - interval '30 days', now() - interval '30 days', "
+            "'refresh-' || g, now() - interval '30 days', "
+            "CASE WHEN g % (:rows / :users) = 0 THEN now() + interval '7 days' ELSE now() - interval '23 days' END "
+            "FROM generate_series(1, :rows) AS g"
+        ), {"users": USERS, "rows": HISTORICAL_ROWS})
+        conn.execute(text("ANALYZE auth"))
+
+    db = sessionmaker(bind=engine)()
+    p50, p99 = time_lookups(db)
+    print(f"before: {HISTORICAL_ROWS} rows, p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+
+    start = time.perf_counter()
+    swept = asyncio.run(sweep(10000))
+    print(f"sweeper: deleted {swept} expired rows in {time.perf_counter() - start:.1f} s")
+
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE auth ADD CONSTRAINT auth_user_id_key UNIQUE (user_id)"))
+        conn.execute(text("ANALYZE auth"))
+
+    p50, p99 = time_lookups(db)
+    remaining = db.query(Auth).count()
+    print(f"after : {remaining} rows, p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# /scripts/bench_model_predict.py
+# 모델 API 동시 호출 비교 (로컬 stub 모델 서버, 추론 시간은 STUB_DELAY_MS로 흉내)
+#   requests: 핸들러 안에서 동기 requests.post (호출마다 새 연결, 응답을 기다리는 동안 이벤트 루프가 멈춤)
+#   httpx   : 공유 AsyncClient (keep-alive 연결 재사용, 기다리는 동안 다른 요청 처리)
+# 이벤트 루프 지연: 10ms마다 깨어나는 작업이 예정보다 얼마나 늦게 실행되었는지 (다른 요청이 얼마나 막히는지)
+# 실행: python scripts/bench_model_predict.py
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+import requests
+import uvicorn
+from fastapi import FastAPI, Request
+from utils.model_client import predict_image_url, close_model_client
+
+PORT = int(os.getenv("BENCH_STUB_PORT", "18001"))
+STUB_URL = f"http://127.0.0.1:{PORT}/predict_url/"
+STUB_DELAY_MS = float(os.getenv("STUB_DELAY_MS", "50"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "20"))
+CALLS = int(os.getenv("BENCH_CALLS", "200"))
+
+stub = FastAPI()
+# stub 서버가 받은 TCP 연결 (클라이언트 포트가 다르면 다른 연결)
+client_ports = set()
+
+
+@stub.post("/predict_url/")
+async def predict_url(image_url: str, request: Request):
+    client_ports.add(request.client.port)
+    await asyncio.sleep(STUB_DELAY_MS / 1000)
+    return {"category_id": 1}
+
+
+def start_stub():
+    server = uvicorn.Server(uvicorn.Config(stub, host="127.0.0.1", port=PORT, log_level="warning",
+                                          timeout_keep_alive=30))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def blocking_predict(image_url: str) -> dict:
+    response = requests.post(STUB_URL, params={"image_url": image_url})
+    response.raise_for_status()
+    return response.json()
+
+
+async def pooled_predict(image_url: str) -> dict:
+    return await predict_image_url(image_url, url=STUB_URL)
+
+
+async def loop_lag(stop: asyncio.Event, samples: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        samples.append((time.perf_counter() - start - 0.01) * 1000)
+
+
+async def run(predict):
+    latencies, lags = [], []
+    queue = list(range(CALLS))
+
+    async def worker():
+        while queue:
+            i = queue.pop()
+            start = time.perf_counter()
+            assert (await predict(f"https://example.com/{i}.jpg"))["category_id"] == 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(loop_lag(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await lag_task
+    latencies.sort()
+    return CALLS / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.99)], max(lags, default=0.0)
+
+
+async def main():
+    server = start_stub()
+    print(f"stub delay {STUB_DELAY_MS:.0f} ms, {CALLS} calls, concurrency {CONCURRENCY}")
+    for label, predict in (("requests", blocking_predict), ("httpx", pooled_predict)):
+        client_ports.clear()
+        throughput, p50, p99, lag = await run(predict)
+        print(f"{label:<9}: {throughput:7.1f} calls/s, p50 {p50:7.1f} ms, p99 {p99:7.1f} ms, "
+              f"max event loop lag {lag:7.1f} ms, {len(client_ports)} connections")
+    await close_model_client()
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
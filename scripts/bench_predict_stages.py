@@ -0,0 +1,156 @@
+# /scripts/bench_predict_stages.py
+# POST /api/v1/model/predict 단계별 소요 시간 (응답의 Server-Timing 헤더 평균)
+#   S3: 로컬 S3 호환 서버(moto), 모델 API: STUB_DELAY_MS 후 category_id를 반환하는 가짜 서버
+#   S3 업로드(원본/축소 이미지/썸네일), 모델 호출, exif는 동시에 실행되므로
+#   upload_model_wall(모두 기다린 시간)이 각 단계 합보다 작으면 겹쳐서 실행된 것
+#   new: 요청마다 다른 사진 (JPEG 끝 뒤에 요청 번호를 붙여 내용 해시가 다름)
+#   resubmit: 같은 사진을 다시 올림 (분류 결과 캐시 hit, S3 업로드와 모델 호출 생략)
+# 실행: TEST_DATABASE_URL=postgresql://... python scripts/bench_predict_stages.py
+# 주의: TEST_DATABASE_URL의 모든 테이블을 삭제 후 다시 생성함
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from io import BytesIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+if not os.getenv("TEST_DATABASE_URL"):
+    raise SystemExit("TEST_DATABASE_URL is required")
+os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+os.environ["BUCKET_NAME"] = "wellness-bench"
+
+from moto.server import ThreadedMotoServer
+
+s3_server = ThreadedMotoServer(ip_address="127.0.0.1", port=0)
+s3_server.start()
+os.environ["S3_ENDPOINT_URL"] = "http://%s:%d" % s3_server.get_host_and_port()
+
+import httpx
+from PIL import Image
+from sqlalchemy import create_engine, text
+from core.config import TEST_DATABASE_URL
+from db.session import dispose_engines
+from init_db import upgrade
+from main import app
+from utils import model_client
+from utils.s3 import get_s3_client, close_s3_client
+
+STUB_DELAY_MS = float(os.getenv("STUB_DELAY_MS", "50"))
+REQUESTS = int(os.getenv("BENCH_REQUESTS", "40"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "8"))
+# 동시에 실행되는 단계
+PARALLEL_STAGES = ("s3", "s3_model_image", "s3_thumbnail", "exif", "model")
+# 휴대폰 사진과 비슷한 크기의 JPEG (노이즈가 있어야 압축 후에도 수 MB)
+WIDTH, HEIGHT = (int(size) for size in os.getenv("BENCH_IMAGE_SIZE", "4000x3000").split("x"))
+
+
+def seed():
+    engine = create_engine(TEST_DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+    upgrade(TEST_DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO meal_type (id, type_name) VALUES (0, '아침'), (1, '점심'), (2, '저녁'), (3, '기타')"))
+        conn.execute(text(
+            "INSERT INTO food_list (id, category_id, food_name, category_name, food_kcal, food_car, food_prot, food_fat) "
+            "VALUES (1, 1, '김밥', '김밥', 300, 50, 10, 8)"
+        ))
+    engine.dispose()
+
+
+def phone_photo() -> bytes:
+    noise = Image.frombytes("L", (WIDTH // 4, HEIGHT // 4), random.randbytes(WIDTH * HEIGHT // 16))
+    image = Image.merge("RGB", (noise, noise.rotate(90, expand=False), noise.transpose(Image.FLIP_LEFT_RIGHT)))
+    exif = Image.Exif()
+    exif[36867] = "2026:10:18 12:30:00"
+    buffer = BytesIO()
+    image.resize((WIDTH, HEIGHT)).save(buffer, "JPEG", quality=90, exif=exif)
+    return buffer.getvalue()
+
+
+async def stub_model(request: httpx.Request):
+    await asyncio.sleep(STUB_DELAY_MS / 1000)
+    return httpx.Response(200, json={"category_id": 1})
+
+
+def parse_server_timing(header: str) -> dict:
+    stages = {}
+    for entry in header.split(","):
+        parts = [part.strip() for part in entry.split(";")]
+        for part in parts[1:]:
+            if part.startswith("dur="):
+                stages[parts[0]] = float(part[4:])
+    return stages
+
+
+async def run(client, headers, image_for, concurrency):
+    totals, count = defaultdict(float), 0
+    queue = list(range(REQUESTS))
+
+    async def worker():
+        nonlocal count
+        while queue:
+            image = image_for(queue.pop())
+            response = await client.post("/api/v1/model/predict", headers=headers,
+                                         files={"file": ("meal.jpg", image, "image/jpeg")})
+            assert response.json()["status_code"] == 201, response.text
+            for stage, duration in parse_server_timing(response.headers["server-timing"]).items():
+                totals[stage] += duration
+            count += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {stage: total / count for stage, total in totals.items()}, REQUESTS / elapsed
+
+
+async def main():
+    seed()
+    get_s3_client().create_bucket(Bucket=os.environ["BUCKET_NAME"])
+    model_client._client = httpx.AsyncClient(transport=httpx.MockTransport(stub_model))
+    image = phone_photo()
+    print(f"image {WIDTH}x{HEIGHT}, {len(image) / 1024 / 1024:.1f} MB, model stub {STUB_DELAY_MS:.0f} ms, {REQUESTS} requests")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        user = {"nickname": "bench", "email": "bench@example.com", "birthday": "1994-01-01", "gender": 0,
+                "height": "170.0", "weight": "65.0"}
+        response = await client.post("/api/v1/user/register", json=user)
+        headers = {"Authorization": f"Bearer {response.json()['detail']['wellness_info']['access_token']}"}
+        runs = iter(range(1, 1000))
+
+        def new_images():
+            run_id = next(runs)
+            return lambda i: image + f"{run_id}:{i}".encode()
+
+        await run(client, headers, new_images(), 1)  # 워밍업
+        await client.post("/api/v1/model/predict", headers=headers, files={"file": ("meal.jpg", image, "image/jpeg")})
+
+        for label, image_for, concurrency in (
+            ("new", new_images(), 1),
+            ("new", new_images(), CONCURRENCY),
+            ("resubmit", lambda i: image, 1),
+        ):
+            stages, throughput = await run(client, headers, image_for, concurrency)
+            parallel = sum(stages.get(stage, 0.0) for stage in PARALLEL_STAGES)
+            overlap = parallel - stages["upload_model_wall"] if "upload_model_wall" in stages else 0.0
+            print(f"{label:<8} concurrency {concurrency:<2}: {throughput:5.1f} req/s | "
+                  + ", ".join(f"{stage} {stages[stage]:.1f}" for stage in
+                              ("read", "hash", "resize") + PARALLEL_STAGES + ("upload_model_wall", "total")
+                              if stage in stages)
+                  + f" ms | overlapped {overlap:.1f} ms")
+
+    await model_client.close_model_client()
+    close_s3_client()
+    await dispose_engines()
+    s3_server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+# /scripts/bench_refresh_ages.py
+# 나이 일괄 갱신(refresh_aged_recommendations)의 속도와 정확성 측정
+#   bulk     : NumPy로 계산 + 청크마다 UPDATE 한 번 (현재 crud)
+#   row by row: 사용자마다 calculate_age + upsert_recommendation (ORM, 일부 사용자만 측정 후 환산)
+#   모든 결과를 recommend_nutrition(Decimal, ROUND_HALF_UP)과 비교
+# 실행: TEST_DATABASE_URL=postgresql://... python scripts/bench_refresh_ages.py
+# 주의: TEST_DATABASE_URL의 모든 테이블을 삭제 후 다시 생성함
+import asyncio
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+if not os.getenv("TEST_DATABASE_URL"):
+    raise SystemExit("TEST_DATABASE_URL is required")
+os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+
+from sqlalchemy import create_engine, select, text
+from core.config import TEST_DATABASE_URL
+from db import crud
+from db.models import User, Recommend
+from db.session import async_session, dispose_engines
+from services.recommend_service import recommend_nutrition
+from init_db import upgrade
+
+USERS = int(os.getenv("BENCH_USERS", "1000000"))
+ROW_BY_ROW_USERS = int(os.getenv("BENCH_ROW_BY_ROW_USERS", "2000"))
+TODAY = date(2026, 10, 18)
+
+
+def seed():
+    engine = create_engine(TEST_DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+    upgrade(TEST_DATABASE_URL)
+
+    # 1년 전 나이로 저장해 모든 사용자가 갱신 대상이 되도록 함 (최악의 경우)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO user_info (age, gender, height, weight, birthday, email, nickname, created_at, updated_at) "
+            "SELECT extract(year FROM age(CAST(:today AS timestamp) - interval '1 year', b)), g % 2, "
+            "140 + (g::bigint * 7919 % 600) / 10.0, 40 + (g::bigint * 104729 % 800) / 10.0, b, "
+            "'user' || g || '@example.com', 'user' || g, now(), now() "
+            "FROM generate_series(1, :users) AS g, "
+            "LATERAL (SELECT DATE '1940-01-01' + (g::bigint * 7907 % 25000)::int) AS d(b)"
+        ), {"users": USERS, "today": TODAY})
+        conn.execute(text(
+            "INSERT INTO recommend (user_id, rec_kcal, rec_car, rec_prot, rec_fat, updated_at) "
+            "SELECT id, 0, 0, 0, 0, now() FROM user_info"
+        ))
+        conn.execute(text("ANALYZE"))
+    engine.dispose()
+
+
+async def row_by_row(db, limit):
+    result = await db.execute(select(User).order_by(User.id).limit(limit))
+    for user in result.scalars().all():
+        age = crud.calculate_age(user.birthday)
+        if age != user.age:
+            user.age = age
+            await crud.upsert_recommendation(db, user)
+    await db.commit()
+
+
+async def verify(db):
+    result = await db.execute(
+        select(User.age, User.weight, User.height, User.gender, User.birthday,
+               Recommend.rec_kcal, Recommend.rec_car, Recommend.rec_prot, Recommend.rec_fat)
+        .join(Recommend, Recommend.user_id == User.id)
+    )
+    mismatches = 0
+    for row in result.all():
+        expected = recommend_nutrition(row.weight, row.height, row.age, row.gender)
+        if (row.rec_kcal, row.rec_car, row.rec_prot, row.rec_fat) != tuple(expected.values()):
+            mismatches += 1
+    return mismatches
+
+
+async def main():
+    seed()
+    async with async_session() as db:
+        start = time.perf_counter()
+        await row_by_row(db, ROW_BY_ROW_USERS)
+        elapsed = time.perf_counter() - start
+        print(f"row by row: {ROW_BY_ROW_USERS} users in {elapsed:.2f} s "
+              f"(~{elapsed / ROW_BY_ROW_USERS * USERS / 60:.0f} min for {USERS})")
+
+    seed()
+    async with async_session() as db:
+        start = time.perf_counter()
+        updated = await crud.refresh_aged_recommendations(db, TODAY)
+        print(f"bulk      : {updated} of {USERS} users in {time.perf_counter() - start:.2f} s")
+        again = await crud.refresh_aged_recommendations(db, TODAY)
+        print(f"second run: {again} users")
+        # 평소처럼 하루 한 번 실행하면 그날 생일인 사용자만 갱신 대상
+        start = time.perf_counter()
+        next_day = await crud.refresh_aged_recommendations(db, TODAY + timedelta(days=1))
+        print(f"next day  : {next_day} users in {time.perf_counter() - start:.2f} s")
+
+    async with async_session() as db:
+        print(f"mismatches vs recommend_nutrition: {await verify(db)}")
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
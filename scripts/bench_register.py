@@ -0,0 +1,74 @@
+# /scripts/bench_register.py
+# POST /api/v1/user/register 한 번의 지연 시간, SQL 문 수, 커밋 수 측정
+# 실행: TEST_DATABASE_URL=postgresql://... python scripts/bench_register.py
+# 주의: TEST_DATABASE_URL의 모든 테이블을 삭제 후 다시 생성함
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+if not os.getenv("TEST_DATABASE_URL"):
+    raise SystemExit("TEST_DATABASE_URL is required")
+os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+
+import httpx
+from sqlalchemy import create_engine, event, text
+from core.config import TEST_DATABASE_URL
+from db.query_stats import collect_queries
+from db.session import dispose_engines, get_async_engine
+from init_db import upgrade
+from main import app
+
+USERS = int(os.getenv("BENCH_USERS", "500"))
+WARMUP = 20
+
+
+def seed():
+    engine = create_engine(TEST_DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+    upgrade(TEST_DATABASE_URL)
+    engine.dispose()
+
+
+def user(i):
+    return {"nickname": f"bench{i}", "email": f"bench{i}@example.com", "birthday": "1994-01-01",
+            "gender": i % 2, "height": "170.0", "weight": "65.0"}
+
+
+async def main():
+    seed()
+    commits = 0
+
+    def on_commit(conn):
+        nonlocal commits
+        commits += 1
+
+    event.listen(get_async_engine().sync_engine, "commit", on_commit)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for i in range(WARMUP):
+            await client.post("/api/v1/user/register", json=user(-i - 1))
+
+        samples, statements = [], 0
+        commits = 0
+        for i in range(USERS):
+            with collect_queries() as stats:
+                start = time.perf_counter()
+                response = await client.post("/api/v1/user/register", json=user(i))
+                samples.append((time.perf_counter() - start) * 1000)
+            assert response.json()["status_code"] == 201, response.text
+            statements += stats.count
+
+    samples.sort()
+    print(f"register x{USERS}: p50 {statistics.median(samples):.2f} ms, p99 {samples[int(len(samples) * 0.99)]:.2f} ms, "
+          f"{statements / USERS:.1f} statements/request, {commits / USERS:.1f} commits/request")
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+# /scripts/bench_startup.py
+# 콜드 워커의 시작 비용 측정
+#   import: 새 프로세스에서 main 모듈 import에 걸린 시간
+#   first request: uvicorn 프로세스 실행부터 첫 요청 응답까지 걸린 시간
+# 실행: DATABASE_URL=postgresql://... python scripts/bench_startup.py
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+RUNS = int(os.getenv("BENCH_RUNS", "5"))
+PATH = os.getenv("BENCH_PATH", "/openapi.json")
+
+IMPORT_SNIPPET = "import time; start = time.perf_counter(); import main; print(time.perf_counter() - start)"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import() -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=APP_DIR,
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1]) * 1000
+
+
+def measure_first_request() -> float:
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            if server.poll() is not None:
+                raise SystemExit(f"server exited with code {server.returncode}")
+            try:
+                httpx.get(f"http://127.0.0.1:{port}{PATH}", timeout=1).raise_for_status()
+                return (time.perf_counter() - start) * 1000
+            except httpx.TransportError:
+                time.sleep(0.01)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    imports = sorted(measure_import() for _ in range(RUNS))
+    first_requests = sorted(measure_first_request() for _ in range(RUNS))
+    print(f"import main   : median {statistics.median(imports):.0f} ms, max {imports[-1]:.0f} ms ({RUNS} runs)")
+    print(f"first request : median {statistics.median(first_requests):.0f} ms, max {first_requests[-1]:.0f} ms ({RUNS} runs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# /scripts/bench_token_cache.py
+# authenticate_token(validate_token의 토큰 검증)의 요청당 쿼리 수와 지연 시간을 캐시 miss/hit 별로 측정
+# 실행: TEST_DATABASE_URL=postgresql://... python scripts/bench_token_cache.py
+# 주의: TEST_DATABASE_URL의 user_info/auth 테이블을 삭제 후 다시 생성함
+import asyncio
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from core.config import TEST_DATABASE_URL
+from db.models import Auth, User
+from db.session import get_test_engine, to_async_url
+from api.v1.auth import authenticate_token
+from core.security import token_cache
+
+ITERATIONS = 1000
+
+
+async def main():
+    test_engine = get_test_engine()
+    Auth.__table__.drop(test_engine, checkfirst=True)
+    User.__table__.drop(test_engine, checkfirst=True)
+    User.__table__.create(test_engine)
+    Auth.__table__.create(test_engine)
+
+    engine = create_async_engine(to_async_url(TEST_DATABASE_URL))
+    query_count = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_queries(*args):
+        nonlocal query_count
+        query_count += 1
+
+    db = async_sessionmaker(bind=engine, expire_on_commit=False)()
+    user = User(age=30, gender=0, height=Decimal("175.0"), weight=Decimal("70.0"),
+                birthday=date(1994, 1, 1), email="bench@example.com", nickname="bench")
+    db.add(user)
+    await db.flush()
+    now = datetime.utcnow()
+    db.add(Auth(user_id=user.id, access_token="bench-token", refresh_token="bench-refresh",
+                access_created_at=now, access_expired_at=now + timedelta(minutes=30),
+                refresh_created_at=now, refresh_expired_at=now + timedelta(days=7)))
+    await db.commit()
+
+    async def run(n: int):
+        nonlocal query_count
+        query_count = 0
+        start = time.perf_counter()
+        for _ in range(n):
+            await authenticate_token(db, "bench-token")
+        return query_count / n, (time.perf_counter() - start) / n * 1e6
+
+    # 캐시를 매번 비워 miss 경로 측정
+    miss_queries = 0
+    miss_elapsed = 0.0
+    for _ in range(ITERATIONS):
+        token_cache.clear()
+        queries, elapsed = await run(1)
+        miss_queries += queries
+        miss_elapsed += elapsed
+
+    # 캐시를 채운 뒤 hit 경로 측정
+    token_cache.clear()
+    await run(1)
+    hit_queries, hit_elapsed = await run(ITERATIONS)
+
+    print(f"cache miss: {miss_queries / ITERATIONS:.1f} queries/request, {miss_elapsed / ITERATIONS:.1f} us/request")
+    print(f"cache hit : {hit_queries:.1f} queries/request, {hit_elapsed:.1f} us/request")
+    print(f"stats     : {token_cache.stats()}")
+    await db.close()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,187 @@
+# /scripts/bench_upload_memory.py
+# POST /api/v1/model/predict 동시 업로드 시 서버 프로세스 메모리(RSS) 측정
+#   서버: uvicorn 별도 프로세스 (/proc/<pid>/status의 VmRSS를 주기적으로 읽음)
+#   S3/모델 API: 이 프로세스 안의 stub 서버 (S3 요청 본문은 읽고 버림, 모델은 category_id 1 반환)
+#   이미지: EXIF가 있는 작은 JPEG 뒤를 채워 BENCH_UPLOAD_MB 크기로 만든 파일 (클라이언트는 디스크에서 스트리밍 전송)
+#   모든 요청이 같은 파일이므로 분류 결과 캐시를 끄고 stub S3는 HEAD에 404를 반환해 매번 업로드하게 함
+# 실행: TEST_DATABASE_URL=postgresql://... python scripts/bench_upload_memory.py
+# 주의: TEST_DATABASE_URL의 모든 테이블을 삭제 후 다시 생성함
+import asyncio
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from io import BytesIO
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+sys.path.insert(0, APP_DIR)
+
+if not os.getenv("TEST_DATABASE_URL"):
+    raise SystemExit("TEST_DATABASE_URL is required")
+os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from PIL import Image
+from sqlalchemy import create_engine, text
+from core.config import TEST_DATABASE_URL
+from init_db import upgrade
+
+UPLOADS = int(os.getenv("BENCH_UPLOADS", "200"))
+UPLOAD_MB = int(os.getenv("BENCH_UPLOAD_MB", "10"))
+STUB_PORT = int(os.getenv("BENCH_STUB_PORT", "18002"))
+APP_PORT = int(os.getenv("BENCH_APP_PORT", "18003"))
+
+stub = FastAPI()
+
+
+# 모델 API (S3 경로보다 먼저 등록)
+@stub.post("/predict_url/")
+async def predict_url(image_url: str):
+    return {"category_id": 1}
+
+
+# S3 API (path-style): 본문은 읽고 버리고 업로드 성공 응답만 반환
+@stub.api_route("/{bucket}/{key:path}", methods=["PUT", "POST", "DELETE", "HEAD"])
+async def s3_object(bucket: str, key: str, request: Request):
+    async for _ in request.stream():
+        pass
+    if request.method == "HEAD":
+        return Response(status_code=404)
+    if request.method == "POST" and "uploads" in request.query_params:
+        return Response(
+            f"<InitiateMultipartUploadResult><Bucket>{bucket}</Bucket><Key>{key}</Key>"
+            f"<UploadId>bench</UploadId></InitiateMultipartUploadResult>",
+            media_type="application/xml",
+        )
+    if request.method == "POST":
+        return Response(
+            f"<CompleteMultipartUploadResult><Bucket>{bucket}</Bucket><Key>{key}</Key>"
+            f"<ETag>\"bench\"</ETag></CompleteMultipartUploadResult>",
+            media_type="application/xml",
+        )
+    if request.method == "DELETE":
+        return Response(status_code=204)
+    return Response(headers={"ETag": "\"bench\""})
+
+
+def start_stub():
+    server = uvicorn.Server(uvicorn.Config(stub, host="127.0.0.1", port=STUB_PORT, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def seed():
+    engine = create_engine(TEST_DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+    upgrade(TEST_DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO meal_type (id, type_name) VALUES (0, '아침'), (1, '점심'), (2, '저녁'), (3, '기타')"))
+        conn.execute(text(
+            "INSERT INTO food_list (id, category_id, food_name, category_name, food_kcal, food_car, food_prot, food_fat) "
+            "VALUES (1, 1, '김밥', '김밥', 300, 50, 10, 8)"
+        ))
+    engine.dispose()
+
+
+def write_photo(path: str):
+    exif = Image.Exif()
+    exif[36867] = "2026:10:18 12:30:00"
+    buffer = BytesIO()
+    Image.new("RGB", (640, 480), "orange").save(buffer, "JPEG", exif=exif)
+    with open(path, "wb") as f:
+        f.write(buffer.getvalue())
+        f.write(b"\0" * (UPLOAD_MB * 1024 * 1024 - buffer.tell()))
+
+
+def start_app() -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        S3_ENDPOINT_URL=f"http://127.0.0.1:{STUB_PORT}",
+        MODEL_API_URL=f"http://127.0.0.1:{STUB_PORT}/predict_url/",
+        BUCKET_NAME="wellness-bench",
+        AWS_ACCESS_KEY_ID="bench",
+        AWS_SECRET_ACCESS_KEY="bench",
+        AWS_DEFAULT_REGION="us-east-1",
+        PREDICTION_CACHE_MAXSIZE="0",
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(APP_PORT), "--log-level", "warning"],
+        cwd=APP_DIR, env=env,
+    )
+    for _ in range(200):
+        try:
+            socket.create_connection(("127.0.0.1", APP_PORT), timeout=0.1).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit("app server did not start")
+
+
+def rss_mb(pid: int, field: str = "VmRSS") -> float:
+    with open(f"/proc/{pid}/status") as f:
+        return int(re.search(rf"{field}:\s+(\d+)", f.read()).group(1)) / 1024
+
+
+async def sample_rss(pid: int, stop: asyncio.Event, samples: list):
+    while not stop.is_set():
+        samples.append(rss_mb(pid))
+        await asyncio.sleep(0.05)
+
+
+async def main():
+    seed()
+    stub_server = start_stub()
+    app_process = start_app()
+    photo = os.path.join(tempfile.mkdtemp(), "photo.jpg")
+    write_photo(photo)
+
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{APP_PORT}", timeout=None,
+                                     limits=httpx.Limits(max_connections=UPLOADS)) as client:
+            user = {"nickname": "bench", "email": "bench@example.com", "birthday": "1994-01-01", "gender": 0,
+                    "height": "170.0", "weight": "65.0"}
+            response = await client.post("/api/v1/user/register", json=user)
+            headers = {"Authorization": f"Bearer {response.json()['detail']['wellness_info']['access_token']}"}
+
+            async def upload():
+                with open(photo, "rb") as f:
+                    response = await client.post("/api/v1/model/predict", headers=headers,
+                                                 files={"file": ("meal.jpg", f, "image/jpeg")})
+                return response.json()["status_code"]
+
+            assert await upload() == 201  # 워밍업 (라이브러리 import, 커넥션 생성)
+            baseline = rss_mb(app_process.pid)
+
+            samples, stop = [], asyncio.Event()
+            sampler = asyncio.create_task(sample_rss(app_process.pid, stop, samples))
+            start = time.perf_counter()
+            codes = await asyncio.gather(*(upload() for _ in range(UPLOADS)))
+            elapsed = time.perf_counter() - start
+            stop.set()
+            await sampler
+
+        peak = max(samples + [rss_mb(app_process.pid, "VmHWM")])
+        print(f"{UPLOADS} concurrent {UPLOAD_MB} MB uploads in {elapsed:.1f} s, "
+              f"{codes.count(201)}/{UPLOADS} succeeded")
+        print(f"server RSS: baseline {baseline:.0f} MB, peak {peak:.0f} MB (+{peak - baseline:.0f} MB), "
+              f"after {rss_mb(app_process.pid):.0f} MB")
+    finally:
+        app_process.terminate()
+        app_process.wait()
+        stub_server.should_exit = True
+        os.remove(photo)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
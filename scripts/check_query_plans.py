@@ -0,0 +1,200 @@
+# /scripts/check_query_plans.py
+# 자주 호출되는 crud 쿼리의 실행 계획(EXPLAIN)을 확인하고, 순차 스캔(Seq Scan)이 있으면 실패(exit 1)
+#   1. TEST_DATABASE_URL의 public 스키마를 비우고 alembic 마이그레이션 적용
+#   2. 테스트 데이터 생성 후 ANALYZE
+#   3. crud 함수를 실제로 호출하며 실행된 SQL을 수집하고, 같은 파라미터로 EXPLAIN 실행
+# enable_seqscan=off 상태에서도 Seq Scan이 나오면 사용할 수 있는 인덱스가 없다는 뜻
+# READ_ONLY_CALLS의 함수는 실행된 SQL 수가 기대값과 다르거나 커밋하면 실패
+# 실행: TEST_DATABASE_URL=postgresql://... python scripts/check_query_plans.py
+# 주의: TEST_DATABASE_URL의 모든 테이블을 삭제 후 다시 생성함
+# pytest(tests/db/test_query_plans.py)는 데이터를 만들지 않고 테스트 사용자로 check_hot_query_plans만 실행
+import asyncio
+import json
+import os
+import sys
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from core.config import TEST_DATABASE_URL
+from core.security import token_cache
+from db import crud
+from db.models import Auth, User
+from db.session import to_async_url
+from api.v1.auth import authenticate_token
+from init_db import upgrade
+
+USERS = int(os.getenv("BENCH_USERS", "10000"))
+HISTORY_PER_USER = int(os.getenv("BENCH_HISTORY_PER_USER", "10"))
+SEQ_SCAN_NODES = ("Seq Scan", "Parallel Seq Scan")
+SORT_NODES = ("Sort", "Incremental Sort")
+# 인덱스 순서 그대로 읽어 LIMIT에서 멈춰야 하는 쿼리 (정렬 단계가 있으면 실패)
+#   행이 적으면 정렬하는 계획이 더 싸게 나오므로 enable_sort=off로 EXPLAIN (순서를 만족하는 인덱스가 없을 때만 Sort가 나옴)
+INDEX_ORDERED_CALLS = ("stream_meal_history",)
+# 읽기 전용 함수: 호출당 SQL 수
+READ_ONLY_CALLS = {
+    "get_recommend_with_total_today": 1,
+}
+
+
+def seed():
+    engine = create_engine(TEST_DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+    upgrade(TEST_DATABASE_URL)
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO user_info (age, gender, height, weight, birthday, email, nickname, created_at, updated_at) "
+            "SELECT 30, g % 2, 170.0, 65.0, DATE '1994-01-01', 'user' || g || '@example.com', 'user' || g, now(), now() "
+            "FROM generate_series(1, :users) AS g"
+        ), {"users": USERS})
+        conn.execute(text("INSERT INTO meal_type (id, type_name) VALUES (0, '아침'), (1, '점심'), (2, '저녁'), (3, '기타')"))
+        conn.execute(text(
+            "INSERT INTO food_list (id, category_id, food_name, category_name, food_kcal, food_car, food_prot, food_fat) "
+            "SELECT g, g, 'food' || g, 'cat' || g, 300, 50, 10, 8 FROM generate_series(1, 100) AS g"
+        ))
+        conn.execute(text(
+            "INSERT INTO recommend (user_id, rec_kcal, rec_car, rec_prot, rec_fat, updated_at) "
+            "SELECT id, 2000, 250, 150, 55, now() FROM user_info"
+        ))
+        conn.execute(text(
+            "INSERT INTO auth (user_id, access_token, access_created_at, access_expired_at, "
+            "refresh_token, refresh_created_at, refresh_expired_at) "
+            "SELECT id, 'access-' || id, now(), now() + interval '30 minutes', "
+            "'refresh-' || id, now(), now() + interval '7 days' FROM user_info"
+        ))
+        conn.execute(text(
+            "INSERT INTO history (user_id, category_id, meal_type_id, image_url, date, created_at, updated_at) "
+            "SELECT u.id, (g % 100) + 1, g % 4, 'https://example.com/' || g, "
+            "date_trunc('day', now()) - (g || ' days')::interval, now(), now() "
+            "FROM user_info u, generate_series(1, :per_user) AS g"
+        ), {"per_user": HISTORY_PER_USER})
+        conn.execute(text(
+            "INSERT INTO total_today (user_id, total_kcal, total_car, total_prot, total_fat, condition, "
+            "created_at, updated_at, today, history_ids) "
+            "SELECT user_id, 300, 50, 10, 8, false, now(), now(), date::date, ARRAY[id] FROM history"
+        ))
+        conn.execute(text("ANALYZE"))
+    engine.dispose()
+
+
+# 서버 측 커서로 한 페이지를 끝까지 읽음
+async def read_meal_history(db, user_id, before_date):
+    result = await crud.stream_meal_history(db, user_id, 51, (before_date, 2 ** 31 - 1))
+    return [row async for row in result]
+
+
+# 각 crud 호출에서 실행된 SQL 목록 (읽기 전용 함수의 SQL 수/커밋 여부가 다르면 failures에 추가)
+#   user_id의 사용자(token: auth 행의 access token)가 있어야 함
+async def hot_queries(db, user_id: int, token: str, day: date, captured: list, commits: list, failures: list):
+    user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
+
+    calls = {
+        "validate_token": lambda: authenticate_token(db, token),
+        "get_user_by_email": lambda: crud.get_user_by_email(db, user.email),
+        "get_recommend_by_user": lambda: crud.get_recommend_by_user(db, user),
+        "update_user_profile": lambda: crud.update_user_profile(db, user.id, {"weight": user.weight + 1}),
+        "get_recommend_with_total_today": lambda: crud.get_recommend_with_total_today(db, user.id, day),
+        "get_meals_by_user_and_date": lambda: crud.get_meals_by_user_and_date(db, user, datetime.combine(day, datetime.min.time())),
+        "stream_meal_history": lambda: read_meal_history(db, user.id, datetime.combine(day, datetime.min.time())),
+        "get_rollups_by_range": lambda: crud.get_rollups_by_range(db, user.id, "day", day - timedelta(days=90), day),
+        "save_history_and_get_meals": lambda: crud.save_history_and_get_meals(db, user, 1, 1, "https://example.com/new",
+                                                                              datetime.combine(day, datetime.min.time())),
+        "create_histories": lambda: crud.create_histories(db, user, [
+            SimpleNamespace(category_id=1 + i % 2, meal_type_id=1, image_url=f"https://example.com/batch/{i}",
+                            date=datetime.combine(day - timedelta(days=i % 3), datetime.min.time()))
+            for i in range(5)
+        ]),
+        "get_meals_by_user_and_days": lambda: crud.get_meals_by_user_and_days(db, user, [day, day - timedelta(days=1)]),
+        "upsert_auth": lambda: crud.upsert_auth(db, user.id, f"access-{user.id}-new", f"refresh-{user.id}-new",
+                                                datetime.utcnow() + timedelta(minutes=30), datetime.utcnow() + timedelta(days=7)),
+    }
+    statements = []
+    for name, call in calls.items():
+        token_cache.clear()
+        captured.clear()
+        commits.clear()
+        await call()
+        if name in READ_ONLY_CALLS and (len(captured) != READ_ONLY_CALLS[name] or commits):
+            failures.append(f"{name}: {len(captured)} statements (expected {READ_ONLY_CALLS[name]}), {len(commits)} commits")
+        statements.extend((name, statement, parameters) for statement, parameters in captured)
+    return statements
+
+
+def scan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from scan_nodes(child)
+
+
+# 실행된 SQL을 EXPLAIN한 결과 줄 목록과 실패 목록 반환
+# enable_seqscan=off이므로 테이블 크기와 통계에 관계없이 사용할 수 있는 인덱스가 없을 때만 Seq Scan이 나옴
+async def check_hot_query_plans(url: str, user_id: int, token: str, day: date):
+    engine = create_async_engine(to_async_url(url))
+    captured = []
+    commits = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        # savepoint 문(SAVEPOINT/RELEASE/ROLLBACK TO)은 EXPLAIN 대상이 아님
+        if not statement.lstrip().upper().startswith(("SAVEPOINT", "RELEASE", "ROLLBACK")):
+            captured.append((statement, parameters))
+
+    @event.listens_for(engine.sync_engine, "commit")
+    def capture_commit(conn):
+        commits.append(conn)
+
+    failures = []
+    # 쓰기 함수의 변경은 commit하지 않고 세션을 닫을 때 rollback
+    async with async_sessionmaker(bind=engine, expire_on_commit=False)() as db:
+        statements = await hot_queries(db, user_id, token, day, captured, commits, failures)
+
+    lines = []
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql("SET enable_seqscan = off")
+        for name, statement, parameters in statements:
+            await conn.exec_driver_sql(f"SET enable_sort = {'off' if name in INDEX_ORDERED_CALLS else 'on'}")
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar()
+            plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+            seq_scans = [node.get("Relation Name") for node in scan_nodes(plan) if node["Node Type"] in SEQ_SCAN_NODES]
+            scans = [
+                f"{node['Node Type']} on {node['Relation Name']}" + (f" using {node['Index Name']}" if "Index Name" in node else "")
+                for node in scan_nodes(plan) if "Relation Name" in node
+            ]
+            sorts = name in INDEX_ORDERED_CALLS and any(node["Node Type"] in SORT_NODES for node in scan_nodes(plan))
+            line = f"{name:<30} {', '.join(scans) or plan['Node Type']}"
+            if seq_scans:
+                failures.append(f"{line} (sequential scan)")
+            if sorts:
+                failures.append(f"{line} (sort instead of index order)")
+            lines.append(f"{'FAIL' if seq_scans or sorts else 'ok  '} {line}")
+    await engine.dispose()
+    return lines, failures
+
+
+async def main():
+    if not TEST_DATABASE_URL:
+        raise SystemExit("TEST_DATABASE_URL is required")
+    seed()
+
+    user_id = USERS // 2
+    lines, failures = await check_hot_query_plans(
+        TEST_DATABASE_URL, user_id, f"access-{user_id}", date.today() - timedelta(days=1)
+    )
+    for line in lines:
+        print(line)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        raise SystemExit(f"{len(failures)} hot queries fall back to a sequential scan, run extra statements or commit")
+    print("all hot queries use an index")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
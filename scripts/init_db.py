@@ -0,0 +1,35 @@
+# /scripts/init_db.py
+# alembic 마이그레이션을 최신 버전까지 적용 (앱 import/시작 시에는 스키마를 생성하지 않음)
+# 실행: DATABASE_URL=postgresql://... python scripts/init_db.py [--test]
+#   --test: TEST_DATABASE_URL에 적용
+# create_all로 만든 기존 DB는 먼저 `alembic stamp <revision>`으로 현재 버전을 기록해야 함
+import os
+import sys
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+sys.path.insert(0, APP_DIR)
+
+from alembic import command
+from alembic.config import Config
+from core.config import DATABASE_URL, TEST_DATABASE_URL
+
+
+def upgrade(url: str):
+    config = Config(os.path.join(APP_DIR, "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+    command.upgrade(config, "head")
+
+
+def main():
+    if "--test" in sys.argv[1:]:
+        if not TEST_DATABASE_URL:
+            raise SystemExit("TEST_DATABASE_URL is not set")
+        upgrade(TEST_DATABASE_URL)
+        print("test database migrated")
+    else:
+        upgrade(DATABASE_URL)
+        print("database migrated")
+
+
+if __name__ == "__main__":
+    main()
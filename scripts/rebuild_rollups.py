@@ -0,0 +1,27 @@
+# /scripts/rebuild_rollups.py
+# 기존 history로부터 일/주/월 영양소 집계(nutrition_rollup)를 다시 계산
+# 실행: DATABASE_URL=postgresql://... python scripts/rebuild_rollups.py [user_id]
+#   user_id를 지정하면 해당 사용자만 다시 계산
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from db import crud
+from db.session import async_session, dispose_engines
+
+
+async def main():
+    user_id = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    start = time.perf_counter()
+    async with async_session() as db:
+        inserted = await crud.rebuild_nutrition_rollups(db, user_id)
+    await dispose_engines()
+    target = "all users" if user_id is None else f"user {user_id}"
+    print(f"rebuilt {inserted} rollup rows for {target} in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
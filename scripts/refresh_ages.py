@@ -0,0 +1,31 @@
+# /scripts/refresh_ages.py
+# 생일이 지나 나이가 바뀐 사용자의 age와 권장 영양소(recommend)를 일괄 갱신 (하루 한 번 cron 등으로 실행)
+# 실행: DATABASE_URL=postgresql://... python scripts/refresh_ages.py [--chunk-size N] [--today YYYY-MM-DD]
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from db import crud
+from db.session import async_session, dispose_engines
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    parser.add_argument("--today", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    async with async_session() as db:
+        updated = await crud.refresh_aged_recommendations(db, args.today, args.chunk_size)
+    await dispose_engines()
+    print(f"refreshed {updated} users in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,180 @@
+# /tests/api/test_auth.py
+# 토큰 검증: jwt 모드의 토큰 종류(typ) 확인, 교체/로그아웃된 토큰 폐기, 만료된 auth 행 정리 후 로그인
+from datetime import datetime, timedelta
+import pytest
+from jose import jwt
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from api.v1 import auth, login
+from core import security
+from core.security import RevocationList, refresh_revoked_tokens, sweep_expired_auth
+from db.session import get_test_engine
+
+PROTECTED = "/api/v1/recommend/eaten_nutrient"
+TODAY = {"today": "2026-10-18"}
+
+
+@pytest.fixture
+def jwt_mode(monkeypatch):
+    monkeypatch.setattr(auth, "AUTH_VERIFY_MODE", "jwt")
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def expire_access_token(user_id: int):
+    with get_test_engine().begin() as conn:
+        conn.execute(text(
+            "UPDATE auth SET access_expired_at = now() AT TIME ZONE 'utc' - interval '1 minute' WHERE user_id = :user_id"
+        ), {"user_id": user_id})
+
+
+def is_revoked_in_db(token: str) -> bool:
+    with get_test_engine().connect() as conn:
+        return conn.execute(text("SELECT count(*) FROM revoked_token WHERE token = :token"), {"token": token}).scalar() == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["db", "jwt"])
+async def test_refresh_token_is_not_an_access_token(client, registered_user, monkeypatch, mode):
+    monkeypatch.setattr(auth, "AUTH_VERIFY_MODE", mode)
+    response = await client.get(PROTECTED, headers=registered_user.headers, params=TODAY)
+    assert response.status_code == 200
+
+    response = await client.get(PROTECTED, headers=bearer(registered_user.refresh_token), params=TODAY)
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_token(client, registered_user, jwt_mode, monkeypatch):
+    assert (await client.get(PROTECTED, headers=registered_user.headers, params=TODAY)).status_code == 200
+
+    response = await client.post("/api/v1/user/logout", headers=registered_user.headers)
+    assert response.json()["status_code"] == 200
+    token = registered_user.headers["Authorization"].split()[1]
+    assert is_revoked_in_db(token)
+
+    # 이 인스턴스는 캐시에 남아 있던 토큰도 바로 거부
+    assert (await client.get(PROTECTED, headers=registered_user.headers, params=TODAY)).status_code == 401
+
+    # 다른 인스턴스는 DB에서 폐기 목록을 갱신한 뒤 거부
+    other_instance = RevocationList()
+    for module in (auth, security):
+        monkeypatch.setattr(module, "revoked_tokens", other_instance)
+    await refresh_revoked_tokens()
+    assert other_instance.is_revoked(token)
+    assert (await client.get(PROTECTED, headers=registered_user.headers, params=TODAY)).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_login_revokes_rotated_token(client, registered_user, jwt_mode):
+    old_headers = registered_user.headers
+    assert (await client.get(PROTECTED, headers=old_headers, params=TODAY)).status_code == 200
+
+    # DB 기준으로 access 토큰이 만료되면 로그인에서 교체 (JWT exp는 아직 남아 있음)
+    expire_access_token(registered_user.id)
+    response = await client.post("/api/v1/user/login", json={"email": registered_user.email, "nickname": "tester"})
+    body = response.json()
+    assert body["message"] == "Access token renewed."
+    new_token = body["detail"]["wellness_info"]["access_token"]
+    assert new_token != old_headers["Authorization"].split()[1]
+
+    assert is_revoked_in_db(old_headers["Authorization"].split()[1])
+    assert (await client.get(PROTECTED, headers=old_headers, params=TODAY)).status_code == 401
+    assert (await client.get(PROTECTED, headers=bearer(new_token), params=TODAY)).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_logout_in_db_mode(client, registered_user):
+    response = await client.post("/api/v1/user/logout", headers=registered_user.headers)
+    assert response.json()["status_code"] == 200
+    assert (await client.get(PROTECTED, headers=registered_user.headers, params=TODAY)).status_code == 401
+
+    # 다음 로그인에서 refresh 토큰으로 access 토큰 재발급
+    response = await client.post("/api/v1/user/login", json={"email": registered_user.email, "nickname": "tester"})
+    new_token = response.json()["detail"]["wellness_info"]["access_token"]
+    assert (await client.get(PROTECTED, headers=bearer(new_token), params=TODAY)).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_login_after_expired_auth_row_is_swept(client, registered_user):
+    with get_test_engine().begin() as conn:
+        conn.execute(text(
+            "UPDATE auth SET access_expired_at = now() AT TIME ZONE 'utc' - interval '8 days', "
+            "refresh_expired_at = now() AT TIME ZONE 'utc' - interval '1 day' WHERE user_id = :user_id"
+        ), {"user_id": registered_user.id})
+    assert await sweep_expired_auth() >= 1
+    with get_test_engine().connect() as conn:
+        rows = conn.execute(text("SELECT count(*) FROM auth WHERE user_id = :user_id"), {"user_id": registered_user.id})
+        assert rows.scalar() == 0
+
+    response = await client.post("/api/v1/user/login", json={"email": registered_user.email, "nickname": "tester"})
+    body = response.json()
+    assert response.status_code == 200, body
+    assert body["status_code"] == 201
+    new_token = body["detail"]["wellness_info"]["access_token"]
+    assert (await client.get(PROTECTED, headers=bearer(new_token), params=TODAY)).status_code == 200
+
+
+def stored_access_token(user_id: int) -> str:
+    with get_test_engine().connect() as conn:
+        return conn.execute(text("SELECT access_token FROM auth WHERE user_id = :user_id"), {"user_id": user_id}).scalar()
+
+
+@pytest.mark.asyncio
+async def test_failed_token_renewal_is_rolled_back(client, registered_user, monkeypatch):
+    expire_access_token(registered_user.id)
+    old_token = stored_access_token(registered_user.id)
+
+    async def failing_revoke(db, token):
+        raise SQLAlchemyError("revoked_token insert failed")
+
+    # DB 오류는 refresh 토큰 만료로 처리하지 않고 요청을 실패시킴 (get_async_db에서 rollback)
+    monkeypatch.setattr(login, "revoke_access_token", failing_revoke)
+    with pytest.raises(SQLAlchemyError, match="revoked_token insert failed"):
+        await client.post("/api/v1/user/login", json={"email": registered_user.email, "nickname": "tester"})
+    assert stored_access_token(registered_user.id) == old_token
+
+
+@pytest.mark.asyncio
+async def test_login_replaces_token_without_typ(client, registered_user, jwt_mode):
+    # typ/jti claim이 생기기 전에 발급되어 auth 행에 남아 있는 토큰
+    legacy_token = jwt.encode(
+        {"user_id": registered_user.id, "user_email": registered_user.email,
+         "exp": datetime.utcnow() + timedelta(minutes=30)},
+        login.SECRET_KEY, algorithm=login.ALGORITHM
+    )
+    with get_test_engine().begin() as conn:
+        conn.execute(text("UPDATE auth SET access_token = :token WHERE user_id = :user_id"),
+                     {"token": legacy_token, "user_id": registered_user.id})
+    assert (await client.get(PROTECTED, headers=bearer(legacy_token), params=TODAY)).status_code == 401
+
+    response = await client.post("/api/v1/user/login", json={"email": registered_user.email, "nickname": "tester"})
+    body = response.json()
+    assert body["status_code"] == 201, body
+    new_token = body["detail"]["wellness_info"]["access_token"]
+    assert jwt.get_unverified_claims(new_token)["typ"] == "access"
+    assert is_revoked_in_db(legacy_token)
+    assert (await client.get(PROTECTED, headers=bearer(new_token), params=TODAY)).status_code == 200
+
+    # 다시 로그인하면 새 토큰을 그대로 돌려줌
+    response = await client.post("/api/v1/user/login", json={"email": registered_user.email, "nickname": "tester"})
+    assert response.json()["detail"]["wellness_info"]["access_token"] == new_token
+
+
+@pytest.mark.asyncio
+async def test_login_with_expired_refresh_token_issues_new_tokens(client, registered_user, jwt_mode):
+    old_token = stored_access_token(registered_user.id)
+    with get_test_engine().begin() as conn:
+        conn.execute(text(
+            "UPDATE auth SET access_expired_at = now() AT TIME ZONE 'utc' - interval '1 minute', "
+            "refresh_expired_at = now() AT TIME ZONE 'utc' - interval '1 minute' WHERE user_id = :user_id"
+        ), {"user_id": registered_user.id})
+
+    response = await client.post("/api/v1/user/login", json={"email": registered_user.email, "nickname": "tester"})
+    body = response.json()
+    assert body["message"] == "New access and refresh tokens issued."
+    assert body["detail"]["wellness_info"]["refresh_token"] != registered_user.refresh_token
+    assert is_revoked_in_db(old_token)
+    assert (await client.get(PROTECTED, headers=bearer(old_token), params=TODAY)).status_code == 401
@@ -0,0 +1,345 @@
+# /tests/api/test_history.py
+# 식사 기록 API: 요청당 SQL 문 수 상한(식사 수에 비례해 쿼리가 늘어나는 N+1 회귀 방지)과 저장/집계 결과
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import text
+from api.v1 import history
+from api.v1.history import get_history_page
+from core.config import HISTORY_BATCH_MAX_SIZE
+from db import crud
+from db.session import async_session, get_async_engine, get_test_engine
+from services.food_service import refresh_food_catalog
+
+MEAL_DATE = "2026-10-18T12:00:00"
+MEALS = 5
+
+
+async def save_meals(client, headers, count=MEALS):
+    for i in range(count):
+        response = await client.post("/api/v1/history/save_and_get", headers=headers, json={
+            "category_id": 1 + i % 2,
+            "meal_type_id": i % 4,
+            "image_url": f"https://example.com/{i}.jpg",
+            "date": MEAL_DATE,
+        })
+        assert response.json()["status_code"] == 201
+
+
+@pytest.mark.asyncio
+async def test_get_meals_by_user_and_date(client, registered_user, assert_max_queries):
+    await save_meals(client, registered_user.headers)
+    async with async_session() as db:
+        with assert_max_queries(1):
+            meals = await crud.get_meals_by_user_and_date(
+                db, registered_user, datetime.fromisoformat(MEAL_DATE)
+            )
+    assert len(meals) == MEALS
+
+
+@pytest.mark.asyncio
+async def test_save_and_get(client, registered_user, assert_max_queries):
+    await save_meals(client, registered_user.headers, MEALS - 1)
+    with assert_max_queries(1):
+        await save_meals(client, registered_user.headers, 1)
+
+
+@pytest.mark.asyncio
+async def test_save_batch(client, registered_user, assert_max_queries):
+    items = [
+        {"category_id": 1 + i % 2, "meal_type_id": i % 4, "image_url": f"https://example.com/{i}.jpg", "date": MEAL_DATE}
+        for i in range(MEALS)
+    ]
+    # 토큰 검증(auth, user_info) 2 + 저장(history, total_today, nutrition_rollup) 3 + 날짜별 목록 조회 1
+    with assert_max_queries(6):
+        response = await client.post("/api/v1/history/save_batch", headers=registered_user.headers, json={"items": items})
+    assert response.json()["status_code"] == 201
+
+
+@pytest.mark.asyncio
+async def test_history_page(client, registered_user, assert_max_queries):
+    await save_meals(client, registered_user.headers)
+    with assert_max_queries(1):
+        response = await client.get("/api/v1/history", headers=registered_user.headers)
+    assert len(response.json()["detail"]["Wellness_meal_list"]) == MEALS
+
+
+@pytest.mark.asyncio
+async def test_eaten_nutrient(client, registered_user, assert_max_queries):
+    await save_meals(client, registered_user.headers)
+    with assert_max_queries(1):
+        response = await client.get(
+            "/api/v1/recommend/eaten_nutrient", headers=registered_user.headers, params={"today": MEAL_DATE[:10]}
+        )
+    assert response.json()["status_code"] == 200
+
+
+def total_today_row(user_id: int, day: str):
+    with get_test_engine().connect() as conn:
+        return conn.execute(text(
+            "SELECT total_kcal, total_car, total_prot, total_fat, history_ids FROM total_today "
+            "WHERE user_id = :user_id AND today = :today"
+        ), {"user_id": user_id, "today": day}).one()
+
+
+def history_count(user_id: int) -> int:
+    with get_test_engine().connect() as conn:
+        return conn.execute(text("SELECT count(*) FROM history WHERE user_id = :user_id"), {"user_id": user_id}).scalar()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_saves_keep_totals_and_limit(client, registered_user):
+    # 같은 사용자/날짜로 동시에 저장해도 합계가 정확하고 하루 기록 수 제한을 넘지 않음
+    requests = crud.MAX_MEALS_PER_DAY + 5
+    responses = await asyncio.gather(*(
+        client.post("/api/v1/history/save_and_get", headers=registered_user.headers, json={
+            "category_id": 1, "meal_type_id": i % 4, "image_url": f"https://example.com/{i}.jpg", "date": MEAL_DATE,
+        })
+        for i in range(requests)
+    ))
+    codes = [response.json()["status_code"] for response in responses]
+    assert codes.count(201) == crud.MAX_MEALS_PER_DAY
+    assert codes.count(429) == requests - crud.MAX_MEALS_PER_DAY
+
+    # 김밥(300 kcal, 50/10/8 g) MAX_MEALS_PER_DAY개
+    total = total_today_row(registered_user.id, MEAL_DATE[:10])
+    meals = crud.MAX_MEALS_PER_DAY
+    assert total[:4] == (Decimal(300 * meals), Decimal(50 * meals), Decimal(10 * meals), Decimal(8 * meals))
+    assert len(total.history_ids) == len(set(total.history_ids)) == meals
+    assert history_count(registered_user.id) == meals
+    with get_test_engine().connect() as conn:
+        rollups = conn.execute(text(
+            "SELECT period, total_kcal, meal_count FROM nutrition_rollup WHERE user_id = :user_id ORDER BY period"
+        ), {"user_id": registered_user.id}).all()
+    assert [tuple(row) for row in rollups] == [(period, Decimal(300 * meals), meals) for period in ("day", "month", "week")]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_saves_return_committed_meals(client, registered_user):
+    # 저장은 total_today 행 잠금으로 하나씩 처리되므로, 각 응답의 목록에는 먼저 commit된 식사가 모두 있어야 함
+    # (잠금을 기다리는 동안 commit된 식사도 포함: 목록 길이가 1, 2, ..., n)
+    saves = crud.MAX_MEALS_PER_DAY
+    responses = await asyncio.gather(*(
+        client.post("/api/v1/history/save_and_get", headers=registered_user.headers, json={
+            "category_id": 1, "meal_type_id": i % 4, "image_url": f"https://example.com/{i}.jpg", "date": MEAL_DATE,
+        })
+        for i in range(saves)
+    ))
+    lengths = sorted(len(response.json()["detail"]["Wellness_meal_list"]) for response in responses)
+    assert lengths == list(range(1, saves + 1))
+
+
+# (category_id, 날짜) 김밥(1): 300 kcal, 50/10/8 g, 라면(2): 500 kcal, 70/10/20 g
+ROLLUP_MEALS = [
+    (1, "2026-09-28"), (2, "2026-09-28"),  # 월요일
+    (1, "2026-09-30"),
+    (2, "2026-10-01"), (2, "2026-10-01"),  # 같은 ISO 주, 다음 달
+    (1, "2026-10-05"),                     # 다음 주
+]
+FOODS = {1: (300, 50, 10, 8), 2: (500, 70, 10, 20)}
+
+
+def expected_rollups(period: str) -> list:
+    totals = {}
+    for category_id, day in ROLLUP_MEALS:
+        start = crud.rollup_period_start(period, datetime.fromisoformat(day).date()).isoformat()
+        kcal, car, prot, fat, count = totals.get(start, (0, 0, 0, 0, 0))
+        food = FOODS[category_id]
+        totals[start] = (kcal + food[0], car + food[1], prot + food[2], fat + food[3], count + 1)
+    return [
+        {"period_start": start, "total_kcal": kcal, "total_car": car, "total_prot": prot, "total_fat": fat,
+         "meal_count": count}
+        for start, (kcal, car, prot, fat, count) in sorted(totals.items())
+    ]
+
+
+async def get_range(client, headers, period: str) -> list:
+    response = await client.get("/api/v1/history/range", headers=headers,
+                                params={"start": "2026-09-28", "end": "2026-10-05", "period": period})
+    body = response.json()
+    assert body["status_code"] == 200, body
+    assert body["detail"]["period"] == period
+    return body["detail"]["Wellness_nutrition_range"]
+
+
+@pytest.mark.asyncio
+async def test_history_range_matches_history(client, registered_user):
+    for i, (category_id, day) in enumerate(ROLLUP_MEALS):
+        response = await client.post("/api/v1/history/save_and_get", headers=registered_user.headers, json={
+            "category_id": category_id, "meal_type_id": i % 4, "image_url": f"https://example.com/{i}.jpg",
+            "date": f"{day}T12:00:00",
+        })
+        assert response.json()["status_code"] == 201
+
+    for period in crud.ROLLUP_PERIODS:
+        assert await get_range(client, registered_user.headers, period) == expected_rollups(period), period
+
+    # 범위 밖 기간, 잘못된 period/날짜
+    response = await client.get("/api/v1/history/range", headers=registered_user.headers,
+                                params={"start": "2026-10-06", "end": "2026-10-31"})
+    assert response.json()["detail"]["Wellness_nutrition_range"] == []
+    for params in ({"start": "2026-10-01", "end": "2026-10-05", "period": "year"},
+                   {"start": "2026-10-05", "end": "2026-10-01"},
+                   {"start": "2026/10/01", "end": "2026-10-05"}):
+        response = await client.get("/api/v1/history/range", headers=registered_user.headers, params=params)
+        assert response.json()["status_code"] == 400, params
+
+
+@pytest.mark.asyncio
+async def test_rebuild_nutrition_rollups(client, registered_user):
+    items = [
+        {"category_id": category_id, "meal_type_id": i % 4, "image_url": f"https://example.com/{i}.jpg",
+         "date": f"{day}T12:00:00"}
+        for i, (category_id, day) in enumerate(ROLLUP_MEALS)
+    ]
+    response = await client.post("/api/v1/history/save_batch", headers=registered_user.headers, json={"items": items})
+    assert response.json()["status_code"] == 201
+
+    # 집계가 어긋난 상태에서 history로부터 다시 계산
+    with get_test_engine().begin() as conn:
+        conn.execute(text("UPDATE nutrition_rollup SET total_kcal = 0, meal_count = 0 WHERE user_id = :user_id"),
+                     {"user_id": registered_user.id})
+        conn.execute(text("DELETE FROM nutrition_rollup WHERE user_id = :user_id AND period = 'week'"),
+                     {"user_id": registered_user.id})
+    async with async_session() as db:
+        inserted = await crud.rebuild_nutrition_rollups(db, registered_user.id)
+    assert inserted == sum(len(expected_rollups(period)) for period in crud.ROLLUP_PERIODS)
+
+    for period in crud.ROLLUP_PERIODS:
+        assert await get_range(client, registered_user.headers, period) == expected_rollups(period), period
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("client_gone", ["disconnect", "send_error"])
+async def test_history_stream_returns_connection(client, registered_user, client_gone):
+    await save_meals(client, registered_user.headers)
+    pool = get_async_engine().pool
+    checked_out = pool.checkedout()
+
+    response = await get_history_page(cursor=None, limit=2, current_user=SimpleNamespace(id=registered_user.id))
+    assert pool.checkedout() == checked_out + 1
+
+    # 본문을 하나도 보내지 못한 채 클라이언트가 끊겨도 응답이 세션을 닫음
+    async def receive():
+        if client_gone == "send_error":
+            await asyncio.sleep(10)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if client_gone == "send_error":
+            raise OSError("connection reset")
+
+    if client_gone == "send_error":
+        with pytest.raises(Exception):
+            await response({"type": "http"}, receive, send)
+    else:
+        await response({"type": "http"}, receive, send)
+    assert pool.checkedout() == checked_out
+
+
+def batch_items(day: str, count: int, **overrides) -> list:
+    return [
+        {"category_id": 1, "meal_type_id": i % 4, "image_url": f"https://example.com/{day}-{i}.jpg",
+         "date": f"{day}T12:00:00", **overrides}
+        for i in range(count)
+    ]
+
+
+def rollup_count(user_id: int) -> int:
+    with get_test_engine().connect() as conn:
+        return conn.execute(text("SELECT count(*) FROM nutrition_rollup WHERE user_id = :user_id"),
+                            {"user_id": user_id}).scalar()
+
+
+@pytest.mark.asyncio
+async def test_save_batch_saves_nothing_when_an_item_is_invalid(client, registered_user):
+    for invalid in ({"category_id": 9999}, {"meal_type_id": 99}, {"image_url": "https://example.com/" + "a" * 255}):
+        items = batch_items("2026-10-17", 2) + [{**batch_items("2026-10-18", 1)[0], **invalid}]
+        response = await client.post("/api/v1/history/save_batch", headers=registered_user.headers,
+                                     json={"items": items})
+        body = response.json()
+        assert response.status_code == 400, invalid
+        assert "[2]" in body["detail"], body
+    for items in ([], batch_items("2026-10-18", HISTORY_BATCH_MAX_SIZE + 1)):
+        response = await client.post("/api/v1/history/save_batch", headers=registered_user.headers,
+                                     json={"items": items})
+        assert response.status_code == 400
+    assert history_count(registered_user.id) == 0
+    assert rollup_count(registered_user.id) == 0
+
+
+@pytest.mark.asyncio
+async def test_save_batch_over_daily_limit_saves_nothing(client, registered_user):
+    limit = crud.MAX_MEALS_PER_DAY
+    response = await client.post("/api/v1/history/save_batch", headers=registered_user.headers,
+                                 json={"items": batch_items("2026-10-18", limit - 2)})
+    assert response.json()["status_code"] == 201
+
+    # 다른 날짜 기록이 먼저 있어도 한도를 넘는 날짜가 있으면 배치 전체를 저장하지 않음
+    items = batch_items("2026-10-17", 2) + batch_items("2026-10-18", 3)
+    response = await client.post("/api/v1/history/save_batch", headers=registered_user.headers, json={"items": items})
+    assert response.status_code == 429
+    assert response.json()["status_code"] == 429
+    assert history_count(registered_user.id) == limit - 2
+    assert total_today_row(registered_user.id, "2026-10-18").total_kcal == 300 * (limit - 2)
+    with get_test_engine().connect() as conn:
+        assert conn.execute(text(
+            "SELECT count(*) FROM total_today WHERE user_id = :user_id AND today = '2026-10-17'"
+        ), {"user_id": registered_user.id}).scalar() == 0
+
+    # 한도까지는 저장되고 날짜별 목록을 반환
+    items = batch_items("2026-10-17", 2) + batch_items("2026-10-18", 2)
+    response = await client.post("/api/v1/history/save_batch", headers=registered_user.headers, json={"items": items})
+    body = response.json()
+    assert body["status_code"] == 201, body
+    counts = {day["date"]: len(day["Wellness_meal_list"]) for day in body["detail"]["Wellness_meal_lists"]}
+    assert counts == {"2026-10-17": 2, "2026-10-18": limit}
+    assert history_count(registered_user.id) == limit + 2
+
+
+@pytest.mark.asyncio
+async def test_failed_save_response_rolls_back(client, registered_user, monkeypatch):
+    # 저장 문장이 실행된 뒤 응답을 만들다 실패해도 저장하지 않음
+    def failing_meal_to_dict(meal):
+        raise ValueError("cannot format meal")
+
+    monkeypatch.setattr(history, "meal_to_dict", failing_meal_to_dict)
+    response = await client.post("/api/v1/history/save_and_get", headers=registered_user.headers, json={
+        "category_id": 1, "meal_type_id": 0, "image_url": "https://example.com/0.jpg", "date": MEAL_DATE,
+    })
+    assert response.status_code == 500
+    assert history_count(registered_user.id) == 0
+    assert rollup_count(registered_user.id) == 0
+    with get_test_engine().connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM total_today WHERE user_id = :user_id AND total_kcal > 0"),
+                            {"user_id": registered_user.id}).scalar() == 0
+
+
+@pytest.mark.asyncio
+async def test_save_with_stale_food_catalog(client, registered_user):
+    # 카탈로그에는 남아 있지만 food_list에서 삭제된 음식: 하루 기록 수 제한(429)이 아니라 404
+    with get_test_engine().begin() as conn:
+        conn.execute(text(
+            "INSERT INTO food_list (id, category_id, food_name, category_name, food_kcal, food_car, food_prot, food_fat) "
+            "VALUES (99, 99, '삭제됨', '삭제됨', 100, 10, 10, 1)"
+        ))
+    try:
+        await refresh_food_catalog(force=True)
+        with get_test_engine().begin() as conn:
+            conn.execute(text("DELETE FROM food_list WHERE id = 99"))
+
+        for meals_before in (0, 1):
+            response = await client.post("/api/v1/history/save_and_get", headers=registered_user.headers, json={
+                "category_id": 99, "meal_type_id": 0, "image_url": "https://example.com/99.jpg", "date": MEAL_DATE,
+            })
+            body = response.json()
+            assert response.status_code == 404, body
+            assert body["detail"] == "Food category not found"
+            assert history_count(registered_user.id) == meals_before
+            await save_meals(client, registered_user.headers, count=1)
+    finally:
+        with get_test_engine().begin() as conn:
+            conn.execute(text("DELETE FROM food_list WHERE id = 99"))
+        await refresh_food_catalog(force=True)
@@ -0,0 +1,27 @@
+# /tests/api/test_internal.py
+# /api/v1/internal: INTERNAL_API_KEY(X-Internal-Key 헤더)가 맞을 때만 응답
+import pytest
+from api.v1 import auth
+
+PATHS = ["/api/v1/internal/token_cache", "/api/v1/internal/db_pool", "/api/v1/internal/food_catalog",
+         "/api/v1/internal/db_replica", "/api/v1/internal/prediction_cache"]
+
+
+@pytest.mark.asyncio
+async def test_internal_api_is_disabled_without_key(client, monkeypatch):
+    monkeypatch.setattr(auth, "INTERNAL_API_KEY", None)
+    for path in PATHS:
+        response = await client.get(path, headers={"X-Internal-Key": ""})
+        assert response.status_code == 404, path
+
+
+@pytest.mark.asyncio
+async def test_internal_api_requires_key(client, monkeypatch):
+    monkeypatch.setattr(auth, "INTERNAL_API_KEY", "internal-secret")
+    for path in PATHS:
+        assert (await client.get(path)).status_code == 403, path
+        assert (await client.get(path, headers={"X-Internal-Key": "wrong"})).status_code == 403, path
+
+        response = await client.get(path, headers={"X-Internal-Key": "internal-secret"})
+        assert response.status_code == 200, path
+        assert response.json()["status"] == "success"
@@ -0,0 +1,236 @@
+# /tests/api/test_model.py
+# POST /api/v1/model/predict: 로컬 S3 호환 서버(moto)와 가짜 모델 API로 업로드/분류 흐름 확인
+import hashlib
+import os
+from io import BytesIO
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+from api.v1 import model
+from core.config import S3_PART_SIZE, MODEL_IMAGE_SIZE, THUMBNAIL_SIZE, IMAGE_HEADER_BYTES
+from core.security import token_cache
+from db.session import get_async_engine
+from services.prediction_service import prediction_cache, upload_stats
+from utils import s3
+from utils.image_processing import extract_exif_data, make_derived_images
+from utils.s3 import get_s3_client, upload_stream_to_s3
+
+
+def jpeg_with_exif(taken_at: str, size=(64, 64), orientation=None) -> bytes:
+    exif = Image.Exif()
+    exif[36867] = taken_at  # DateTimeOriginal
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = BytesIO()
+    Image.new("RGB", size, "red").save(buffer, "JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+def stored_image(bucket, url):
+    return get_s3_client().get_object(Bucket=bucket, Key=url.rsplit("/", 1)[1])
+
+
+async def predict(client, registered_user, image):
+    response = await client.post(
+        "/api/v1/model/predict",
+        headers=registered_user.headers,
+        files={"file": ("meal.jpg", image, "image/jpeg")},
+    )
+    body = response.json()
+    assert body["status_code"] == 201, body
+    return body["detail"]["wellness_image_info"]
+
+
+@pytest.mark.asyncio
+async def test_predict_uploads_before_model_call(client, registered_user, s3_bucket, model_api):
+    image = jpeg_with_exif("2026:10:18 12:30:00", size=(1600, 1200))
+    response = await client.post(
+        "/api/v1/model/predict",
+        headers=registered_user.headers,
+        files={"file": ("meal.jpg", image, "image/jpeg")},
+    )
+    body = response.json()
+    assert body["status_code"] == 201, body
+    info = body["detail"]["wellness_image_info"]
+    assert info["meal_type"] == "점심"
+    assert info["category_id"] == 1
+
+    # 원본은 이미지 내용의 해시를 키로 그대로 저장
+    digest = hashlib.sha256(image).hexdigest()
+    assert info["image_url"].endswith(f"/{digest}.jpg")
+    original = stored_image(s3_bucket, info["image_url"])
+    assert original["Body"].read() == image
+    assert original["ContentType"] == "image/jpeg"
+
+    # 모델 API는 업로드가 끝난 축소 이미지의 URL을 받음
+    assert len(model_api) == 1
+    assert model_api[0].endswith(f"/{digest}_{MODEL_IMAGE_SIZE}.jpg")
+    model_image = Image.open(BytesIO(stored_image(s3_bucket, model_api[0])["Body"].read()))
+    assert max(model_image.size) == MODEL_IMAGE_SIZE
+    thumbnail = Image.open(BytesIO(stored_image(s3_bucket, info["thumbnail_url"])["Body"].read()))
+    assert max(thumbnail.size) == THUMBNAIL_SIZE
+
+    # 단계별 시간이 Server-Timing 헤더에 기록됨
+    stages = [entry.split(";")[0].strip() for entry in response.headers["server-timing"].split(",")]
+    assert {"read", "hash", "resize", "s3", "s3_model_image", "s3_thumbnail", "exif", "model",
+            "upload_model_wall", "db", "total"} <= set(stages)
+
+
+@pytest.mark.asyncio
+async def test_predict_without_original(client, registered_user, s3_bucket, model_api, monkeypatch):
+    # 원본을 저장하지 않으면 축소 이미지 URL을 응답하고 원본 키에는 객체가 없음
+    monkeypatch.setattr(model, "STORE_ORIGINAL_IMAGE", False)
+    image = jpeg_with_exif("2026:10:18 12:30:00", size=(1600, 1200))
+    info = await predict(client, registered_user, image)
+    assert model_api == [info["image_url"]]
+    keys = {item["Key"] for item in get_s3_client().list_objects_v2(Bucket=s3_bucket)["Contents"]}
+    digest = hashlib.sha256(image).hexdigest()
+    assert keys == {f"{digest}_{MODEL_IMAGE_SIZE}.jpg", f"{digest}_thumb{THUMBNAIL_SIZE}.jpg"}
+
+
+@pytest.mark.asyncio
+async def test_predict_large_png(client, registered_user, s3_bucket, model_api):
+    # EXIF는 앞부분(header)만 읽으므로 큰 PNG는 잘린 이미지가 됨. EXIF 없음으로 처리하고 정상 저장
+    buffer = BytesIO()
+    Image.frombytes("RGB", (1200, 1200), os.urandom(1200 * 1200 * 3)).save(buffer, "PNG")
+    image = buffer.getvalue()
+    assert len(image) > IMAGE_HEADER_BYTES
+    response = await client.post(
+        "/api/v1/model/predict",
+        headers=registered_user.headers,
+        files={"file": ("meal.png", image, "image/png")},
+    )
+    body = response.json()
+    assert body["status_code"] == 201, body
+    info = body["detail"]["wellness_image_info"]
+    assert info["image_url"].endswith(f"/{hashlib.sha256(image).hexdigest()}.png")
+    assert stored_image(s3_bucket, info["image_url"])["Body"].read() == image
+
+
+def test_exif_of_truncated_png_is_none():
+    # 헤더(IHDR)는 온전하고 이미지 데이터(IDAT) 중간에서 잘린 PNG
+    buffer = BytesIO()
+    Image.frombytes("RGB", (256, 256), os.urandom(256 * 256 * 3)).save(buffer, "PNG")
+    assert extract_exif_data(buffer.getvalue()[:4096]) is None
+
+
+@pytest.mark.asyncio
+async def test_predict_releases_connection_during_upload_and_model(client, registered_user, s3_bucket, model_api,
+                                                                  monkeypatch):
+    pool = get_async_engine().pool
+    checked_out = pool.checkedout()
+    during_model = []
+    predict_image_url = model.predict_image_url
+
+    async def recording_predict(image_url):
+        during_model.append(pool.checkedout())
+        return await predict_image_url(image_url)
+
+    # 토큰 캐시 miss: 토큰 검증에서 DB를 조회한 뒤에도 업로드/모델 호출 동안은 연결을 잡고 있지 않음
+    monkeypatch.setattr(model, "predict_image_url", recording_predict)
+    token_cache.clear()
+    await predict(client, registered_user, jpeg_with_exif("2026:10:18 12:30:00", size=(1600, 1200)))
+    assert during_model == [checked_out]
+
+
+def test_derived_images_follow_exif_orientation():
+    # EXIF 회전(90도)을 적용해 세로 사진으로 축소하고, 읽은 뒤 파일 위치는 그대로
+    fileobj = BytesIO(jpeg_with_exif("2026:10:18 12:30:00", size=(1600, 1200), orientation=6))
+    fileobj.seek(10)
+    derived = make_derived_images(fileobj, 512, 128)
+    assert fileobj.tell() == 10
+    assert Image.open(BytesIO(derived.model_image)).size == (384, 512)
+    assert Image.open(BytesIO(derived.thumbnail)).size == (96, 128)
+
+
+@pytest.mark.asyncio
+async def test_predict_reports_upload_failure(client, registered_user, s3_bucket, model_api, monkeypatch):
+    monkeypatch.setenv("BUCKET_NAME", "missing-bucket")
+    response = await client.post(
+        "/api/v1/model/predict",
+        headers=registered_user.headers,
+        files={"file": ("meal.jpg", jpeg_with_exif("2026:10:18 08:00:00"), "image/jpeg")},
+    )
+    assert response.status_code == 403
+    assert "failed to upload image to s3" in response.json()["detail"]
+    assert model_api == []
+
+
+@pytest.mark.asyncio
+async def test_predict_resubmitted_image_uses_cache(client, registered_user, s3_bucket, model_api, monkeypatch):
+    image = jpeg_with_exif("2026:10:18 18:00:00")
+    first = await predict(client, registered_user, image)
+    saved = upload_stats.bytes_saved
+
+    # 같은 사진을 다시 올리면 S3와 모델 API를 사용하지 않음
+    def unavailable():
+        raise AssertionError("S3 must not be called for a cached image")
+
+    monkeypatch.setattr(s3, "get_s3_client", unavailable)
+    second = await predict(client, registered_user, image)
+    assert second == first
+    assert len(model_api) == 1
+    assert upload_stats.bytes_saved == saved + len(image)
+
+
+@pytest.mark.asyncio
+async def test_predict_skips_upload_of_existing_object(client, registered_user, s3_bucket, model_api):
+    image = jpeg_with_exif("2026:10:18 07:00:00")
+    first = await predict(client, registered_user, image)
+    skipped = upload_stats.skipped_uploads
+
+    # 분류 결과가 캐시에서 밀려나도 S3에 같은 내용의 객체(원본, 축소 이미지, 썸네일)가 있으면
+    # 업로드는 생략하고 모델만 다시 호출
+    prediction_cache.clear()
+    second = await predict(client, registered_user, image)
+    assert second["image_url"] == first["image_url"]
+    assert len(model_api) == 2 and model_api[0] == model_api[1]
+    assert upload_stats.skipped_uploads == skipped + 3
+    assert get_s3_client().list_objects_v2(Bucket=s3_bucket)["KeyCount"] == 3
+
+
+@pytest.mark.asyncio
+async def test_predict_rejects_non_image_content(client, registered_user, s3_bucket, model_api):
+    # 확장자는 jpg지만 내용은 이미지가 아님
+    response = await client.post(
+        "/api/v1/model/predict",
+        headers=registered_user.headers,
+        files={"file": ("meal.jpg", b"GIF89a" + b"\0" * 1024, "image/jpeg")},
+    )
+    assert response.status_code == 403
+    assert get_s3_client().list_objects_v2(Bucket=s3_bucket)["KeyCount"] == 0
+    assert model_api == []
+
+
+@pytest.mark.asyncio
+async def test_predict_rejects_oversized_upload(client, registered_user, s3_bucket, model_api, monkeypatch):
+    monkeypatch.setattr(model, "MAX_UPLOAD_BYTES", 1024)
+    response = await client.post(
+        "/api/v1/model/predict",
+        headers=registered_user.headers,
+        files={"file": ("meal.jpg", jpeg_with_exif("2026:10:18 08:00:00") + b"\0" * 2048, "image/jpeg")},
+    )
+    assert response.status_code == 413
+    assert model_api == []
+
+
+def test_stream_upload_sends_parts(s3_bucket):
+    # 파트 두 개 반 크기: 멀티파트 업로드로 나눠 보낸 내용이 그대로 저장됨
+    data = jpeg_with_exif("2026:10:18 19:00:00")
+    data += bytes(range(256)) * ((S3_PART_SIZE * 5 // 2 - len(data)) // 256)
+    head, rest = data[:1024], BytesIO(data[1024:])
+    url = upload_stream_to_s3(rest, head, s3_bucket, "large.jpg", "image/jpeg")
+    assert url.endswith(f"/{s3_bucket}/large.jpg")
+    stored = get_s3_client().get_object(Bucket=s3_bucket, Key="large.jpg")
+    assert stored["Body"].read() == data
+    assert stored["ContentType"] == "image/jpeg"
+
+
+def test_stream_upload_aborts_over_limit(s3_bucket):
+    data = b"\xff\xd8\xff" + b"\0" * (S3_PART_SIZE * 2)
+    with pytest.raises(HTTPException) as error:
+        upload_stream_to_s3(BytesIO(data[1024:]), data[:1024], s3_bucket, "large.jpg", max_bytes=S3_PART_SIZE + 1)
+    assert error.value.status_code == 413
+    # 중단된 멀티파트 업로드와 객체가 남지 않음
+    assert get_s3_client().list_multipart_uploads(Bucket=s3_bucket).get("Uploads", []) == []
+    assert get_s3_client().list_objects_v2(Bucket=s3_bucket)["KeyCount"] == 0
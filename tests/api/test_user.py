@@ -0,0 +1,103 @@
+# /tests/api/test_user.py
+# 프로필 수정: 권장 영양소를 같은 트랜잭션에서 다시 계산하고, commit 후에만 토큰 캐시를 비움
+import asyncio
+import uuid
+from decimal import Decimal
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from core import security
+from db import crud
+from db.session import get_test_engine
+from services.recommend_service import recommend_nutrition
+
+PROTECTED = "/api/v1/recommend/eaten_nutrient"
+TODAY = {"today": "2026-10-18"}
+
+
+def stored_profile(user_id: int):
+    with get_test_engine().connect() as conn:
+        return conn.execute(text(
+            "SELECT u.height, u.weight, r.rec_kcal, r.rec_car, r.rec_prot, r.rec_fat "
+            "FROM user_info u JOIN recommend r ON r.user_id = u.id WHERE u.id = :user_id"
+        ), {"user_id": user_id}).one()
+
+
+def token_of(user) -> str:
+    return user.headers["Authorization"].split()[1]
+
+
+@pytest.mark.asyncio
+async def test_update_profile_recomputes_recommendation(client, registered_user):
+    # 토큰 검증 결과를 캐시에 올려 둠
+    assert (await client.get(PROTECTED, headers=registered_user.headers, params=TODAY)).status_code == 200
+    assert security.token_cache.get(token_of(registered_user)).weight == Decimal("70.0")
+
+    response = await client.patch("/api/v1/user/profile", headers=registered_user.headers,
+                                  json={"height": "180.5", "weight": "82.3"})
+    body = response.json()
+    assert body["status_code"] == 200, body
+    info = body["detail"]["wellness_info"]
+    expected = recommend_nutrition(Decimal("82.3"), Decimal("180.5"), info["user_age"], info["user_gender"])
+    assert {key: Decimal(str(value)) for key, value in body["detail"]["recommendations"].items()} == expected
+
+    row = stored_profile(registered_user.id)
+    assert (row.height, row.weight) == (Decimal("180.5"), Decimal("82.3"))
+    assert {"rec_kcal": row.rec_kcal, "rec_car": row.rec_car, "rec_prot": row.rec_prot,
+            "rec_fat": row.rec_fat} == expected
+
+    # commit 후 캐시에서 제거되고, 다음 요청은 바뀐 프로필로 다시 캐시
+    assert security.token_cache.get(token_of(registered_user)) is None
+    response = await client.get(PROTECTED, headers=registered_user.headers, params=TODAY)
+    assert Decimal(str(response.json()["detail"]["wellness_recommend_info"]["rec_kcal"])) == expected["rec_kcal"]
+    assert security.token_cache.get(token_of(registered_user)).weight == Decimal("82.3")
+
+
+@pytest.mark.asyncio
+async def test_failed_recommendation_rolls_back_profile(client, registered_user, monkeypatch):
+    assert (await client.get(PROTECTED, headers=registered_user.headers, params=TODAY)).status_code == 200
+    before = stored_profile(registered_user.id)
+
+    async def failing_upsert(db, user):
+        raise SQLAlchemyError("recommend upsert failed")
+
+    monkeypatch.setattr(crud, "upsert_recommendation", failing_upsert)
+    response = await client.patch("/api/v1/user/profile", headers=registered_user.headers,
+                                  json={"height": "180.5", "weight": "82.3"})
+    assert response.json()["status_code"] == 500
+
+    # 사용자 행도 되돌려지고, commit되지 않았으므로 캐시도 그대로
+    assert stored_profile(registered_user.id) == before
+    assert security.token_cache.get(token_of(registered_user)).weight == Decimal("70.0")
+
+
+@pytest.mark.asyncio
+async def test_update_profile_rejects_invalid_changes(client, registered_user):
+    before = stored_profile(registered_user.id)
+    for changes in ({}, {"weight": "0"}, {"height": "-1"}):
+        response = await client.patch("/api/v1/user/profile", headers=registered_user.headers, json=changes)
+        assert response.json()["status_code"] == 400, changes
+    assert stored_profile(registered_user.id) == before
+
+
+@pytest.mark.asyncio
+async def test_concurrent_registration_with_same_email(client):
+    email = f"test-{uuid.uuid4().hex[:12]}@example.com"
+    user = {"nickname": "tester", "email": email, "birthday": "1990-05-01", "gender": 0, "height": "175.0",
+            "weight": "70.0"}
+    try:
+        # 모두 이메일 중복 확인을 통과한 뒤 한 요청만 저장되고 나머지는 unique 제약에 걸림
+        responses = await asyncio.gather(*(client.post("/api/v1/user/register", json=user) for _ in range(5)))
+        bodies = [response.json() for response in responses]
+        assert all(response.status_code == 200 for response in responses), bodies
+        assert sorted(body["status_code"] for body in bodies) == [201, 400, 400, 400, 400], bodies
+        assert all(body["detail"] == "Email already registered" for body in bodies if body["status_code"] == 400)
+        with get_test_engine().connect() as conn:
+            assert conn.execute(text("SELECT count(*) FROM user_info WHERE email = :email"),
+                                {"email": email}).scalar() == 1
+    finally:
+        with get_test_engine().begin() as conn:
+            user_id = conn.execute(text("SELECT id FROM user_info WHERE email = :email"), {"email": email}).scalar()
+            for table in ("total_today", "recommend", "auth"):
+                conn.execute(text(f"DELETE FROM {table} WHERE user_id = :user_id"), {"user_id": user_id})
+            conn.execute(text("DELETE FROM user_info WHERE email = :email"), {"email": email})
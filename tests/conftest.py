@@ -0,0 +1,132 @@
+# /tests/conftest.py
+# 앱 모듈은 app/ 기준으로 import하고, DB를 사용하는 테스트는 TEST_DATABASE_URL에서 실행
+# 실행: TEST_DATABASE_URL=postgresql://... pytest
+import os
+import sys
+import uuid
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+# 앱의 DB(카탈로그/레지스트리 로드 포함)도 테스트 DB를 사용하도록 지정 (앱 모듈 import 전에 설정)
+if os.getenv("TEST_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from db.query_stats import collect_queries
+
+
+@pytest.fixture
+def assert_max_queries():
+    """with assert_max_queries(n): 블록 안에서 실행된 SQL 문이 n개를 넘으면 실패 (N+1 회귀 방지)"""
+
+    @contextmanager
+    def check(limit: int):
+        with collect_queries() as stats:
+            yield stats
+        executed = "\n".join(f"  {count}x {statement}" for statement, count in stats.statements.most_common())
+        assert stats.count <= limit, f"expected at most {limit} queries, got {stats.count}:\n{executed}"
+
+    return check
+
+
+@pytest.fixture(scope="session")
+def test_database():
+    if not os.getenv("TEST_DATABASE_URL"):
+        pytest.skip("TEST_DATABASE_URL is not set")
+    from db.session import get_test_engine, init_test_db
+    init_test_db()
+    with get_test_engine().begin() as conn:
+        conn.execute(text(
+            "INSERT INTO meal_type (id, type_name) VALUES (0, '아침'), (1, '점심'), (2, '저녁'), (3, '기타') "
+            "ON CONFLICT (id) DO NOTHING"
+        ))
+        conn.execute(text(
+            "INSERT INTO food_list (id, category_id, food_name, category_name, food_kcal, food_car, food_prot, food_fat) "
+            "VALUES (1, 1, '김밥', '김밥', 300, 50, 10, 8), (2, 2, '라면', '라면', 500, 70, 10, 20) "
+            "ON CONFLICT (id) DO NOTHING"
+        ))
+
+
+@pytest_asyncio.fixture
+async def client(test_database):
+    from main import app
+    from db.session import dispose_engines
+    from services.food_service import refresh_food_catalog
+    from services.meal_type_service import load_meal_type_registry
+
+    # 테스트마다 이벤트 루프가 바뀌므로 엔진은 테스트가 끝날 때 정리
+    await refresh_food_catalog(force=True)
+    await load_meal_type_registry()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+    await dispose_engines()
+
+
+@pytest_asyncio.fixture
+async def registered_user(client, test_database):
+    """새로 가입한 사용자의 id와 Authorization 헤더 (테스트가 끝나면 사용자의 모든 행 삭제)"""
+    from db.session import get_test_engine
+
+    email = f"test-{uuid.uuid4().hex[:12]}@example.com"
+    response = await client.post("/api/v1/user/register", json={
+        "nickname": "tester", "email": email, "birthday": "1990-05-01",
+        "gender": 0, "height": "175.0", "weight": "70.0",
+    })
+    wellness_info = response.json()["detail"]["wellness_info"]
+    with get_test_engine().connect() as conn:
+        user_id = conn.execute(text("SELECT id FROM user_info WHERE email = :email"), {"email": email}).scalar()
+    yield SimpleNamespace(id=user_id, email=email, refresh_token=wellness_info["refresh_token"],
+                          headers={"Authorization": f"Bearer {wellness_info['access_token']}"})
+
+    with get_test_engine().begin() as conn:
+        for table in ("history", "total_today", "nutrition_rollup", "recommend", "auth"):
+            conn.execute(text(f"DELETE FROM {table} WHERE user_id = :user_id"), {"user_id": user_id})
+        conn.execute(text("DELETE FROM user_info WHERE id = :user_id"), {"user_id": user_id})
+
+
+@pytest.fixture
+def s3_bucket(monkeypatch):
+    """로컬 S3 호환 서버(moto)에 만든 버킷 이름 (앱의 S3 클라이언트가 이 서버를 사용)"""
+    from moto.server import ThreadedMotoServer
+    from utils import s3
+
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    # moto 저장소는 프로세스 전역이므로 이전 테스트가 만든 객체를 비움
+    httpx.post(f"http://{host}:{port}/moto-api/reset")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setattr(s3, "aws_access_key", "test")
+    monkeypatch.setattr(s3, "aws_secret_key", "test")
+    monkeypatch.setattr(s3, "S3_ENDPOINT_URL", f"http://{host}:{port}")
+    monkeypatch.setenv("BUCKET_NAME", "wellness-test")
+    s3.close_s3_client()
+    s3.get_s3_client().create_bucket(Bucket="wellness-test")
+    yield "wellness-test"
+    s3.close_s3_client()
+    server.stop()
+
+
+@pytest_asyncio.fixture
+async def model_api(monkeypatch):
+    """모델 API 대신 응답하는 가짜 서버: 받은 image_url 목록을 기록하고 category_id 1을 반환"""
+    from services.prediction_service import prediction_cache
+    from utils import model_client
+
+    requests = []
+
+    def handler(request: httpx.Request):
+        requests.append(request.url.params["image_url"])
+        return httpx.Response(200, json={"category_id": 1})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(model_client, "_client", client)
+    prediction_cache.clear()
+    yield requests
+    await client.aclose()
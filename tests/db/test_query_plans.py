@@ -0,0 +1,30 @@
+# /tests/db/test_query_plans.py
+# 자주 호출되는 crud 쿼리가 인덱스를 사용하는지 EXPLAIN으로 확인 (scripts/check_query_plans.py와 같은 검사)
+# 인덱스를 지우거나 쿼리 조건이 바뀌어 Seq Scan이 나오면 실패
+import os
+import sys
+from datetime import date, timedelta
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "scripts"))
+
+from check_query_plans import check_hot_query_plans
+
+MEAL_DAY = date.today() - timedelta(days=1)
+
+
+@pytest.mark.asyncio
+async def test_hot_queries_use_indexes(client, registered_user):
+    for i in range(3):
+        response = await client.post("/api/v1/history/save_and_get", headers=registered_user.headers, json={
+            "category_id": 1 + i % 2,
+            "meal_type_id": i,
+            "image_url": f"https://example.com/{i}.jpg",
+            "date": f"{MEAL_DAY.isoformat()}T12:00:00",
+        })
+        assert response.json()["status_code"] == 201
+
+    token = registered_user.headers["Authorization"].split()[1]
+    lines, failures = await check_hot_query_plans(os.environ["TEST_DATABASE_URL"], registered_user.id, token, MEAL_DAY)
+    assert lines
+    assert not failures, "\n".join(lines + failures)
@@ -0,0 +1,110 @@
+# /tests/db/test_replica.py
+# ReplicaRouter: replica 미설정, 최근 쓰기(read-your-writes), 복제 지연/확인 실패, 정상 replica 라우팅
+import pytest
+import main
+from db import replica
+from db.replica import (ReplicaRouter, REPLICA, PRIMARY_NO_REPLICA, PRIMARY_RECENT_WRITE,
+                        PRIMARY_REPLICA_LAGGING)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """db.replica가 보는 time.monotonic을 직접 움직일 수 있는 시계로 교체"""
+
+    class Clock:
+        now = 1000.0
+
+        def advance(self, seconds: float):
+            self.now += seconds
+
+    fake = Clock()
+    monkeypatch.setattr(replica.time, "monotonic", lambda: fake.now)
+    return fake
+
+
+@pytest.fixture
+def router(clock):
+    router = ReplicaRouter(window=5, max_lag=2, check_interval=10)
+    router.record_lag(0.5)
+    return router
+
+
+def test_no_replica_goes_to_primary(router):
+    assert router.route(1, has_replica=False) == PRIMARY_NO_REPLICA
+    router.mark_write(1)
+    assert router.route(1, has_replica=False) == PRIMARY_NO_REPLICA
+
+
+def test_healthy_replica(router):
+    assert router.route(1, has_replica=True) == REPLICA
+    assert router.route(None, has_replica=True) == REPLICA
+    assert router.stats()["healthy"] is True
+    assert router.decisions == {REPLICA: 2}
+
+
+def test_recent_write_reads_from_primary(router, clock):
+    router.mark_write(1)
+    assert router.route(1, has_replica=True) == PRIMARY_RECENT_WRITE
+    # 다른 사용자는 그대로 replica
+    assert router.route(2, has_replica=True) == REPLICA
+
+    clock.advance(4.9)
+    assert router.route(1, has_replica=True) == PRIMARY_RECENT_WRITE
+    clock.advance(0.1)
+    assert router.route(1, has_replica=True) == REPLICA
+
+
+def test_expired_writes_are_pruned(router, clock):
+    router.mark_write(1)
+    router.mark_write(2)
+    clock.advance(5)
+    router.mark_write(3)
+    assert list(router._writes) == [3]
+    assert router.stats()["recent_writers"] == 1
+
+
+def test_lagging_replica_goes_to_primary(router, clock):
+    router.record_lag(2)
+    assert router.route(1, has_replica=True) == REPLICA
+    router.record_lag(2.5)
+    assert router.route(1, has_replica=True) == PRIMARY_REPLICA_LAGGING
+    # 지연을 모르는 경우(재생 시각 없음)도 primary
+    router.record_lag(None)
+    assert router.route(1, has_replica=True) == PRIMARY_REPLICA_LAGGING
+    router.record_lag(0)
+    assert router.route(1, has_replica=True) == REPLICA
+
+
+def test_failed_or_stale_lag_check_goes_to_primary(router, clock):
+    router.record_check_failure("connection refused")
+    assert router.route(1, has_replica=True) == PRIMARY_REPLICA_LAGGING
+    assert router.stats()["check_error"] == "connection refused"
+
+    # 확인 작업이 멈춰 마지막 확인이 check_interval * 3보다 오래되면 primary
+    router.record_lag(0.5)
+    clock.advance(30)
+    assert router.route(1, has_replica=True) == REPLICA
+    clock.advance(0.1)
+    assert router.route(1, has_replica=True) == PRIMARY_REPLICA_LAGGING
+
+
+def test_unchecked_replica_goes_to_primary(clock):
+    assert ReplicaRouter(window=5, max_lag=2, check_interval=10).route(1, has_replica=True) == PRIMARY_REPLICA_LAGGING
+
+
+@pytest.mark.asyncio
+async def test_write_request_marks_user(client, registered_user, monkeypatch):
+    router = ReplicaRouter(window=5, max_lag=2, check_interval=10)
+    monkeypatch.setattr(main, "replica_router", router)
+
+    # validate_token이 request.state에 남긴 사용자 id로 쓰기 요청만 기록
+    response = await client.get("/api/v1/history", headers=registered_user.headers)
+    assert response.status_code == 200
+    assert not router.recently_wrote(registered_user.id)
+
+    response = await client.post("/api/v1/history/save_and_get", headers=registered_user.headers, json={
+        "category_id": 1, "meal_type_id": 0, "image_url": "https://example.com/0.jpg", "date": "2026-10-18T12:00:00",
+    })
+    assert response.json()["status_code"] == 201
+    assert router.recently_wrote(registered_user.id)
+    assert router.route(registered_user.id, has_replica=True) == PRIMARY_RECENT_WRITE
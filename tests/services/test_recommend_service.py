@@ -0,0 +1,40 @@
+# /tests/services/test_recommend_service.py
+# recommend_nutrition_bulk(NumPy, 정수 연산)가 recommend_nutrition(Decimal, ROUND_HALF_UP)과 정확히 같은지 비교
+from decimal import Decimal
+import numpy as np
+import pytest
+from services.recommend_service import recommend_nutrition, recommend_nutrition_bulk
+
+KEYS = ("rec_kcal", "rec_car", "rec_prot", "rec_fat")
+
+
+def assert_matches_scalar(weight_tenths, height_tenths, age, gender):
+    bulk = recommend_nutrition_bulk(weight_tenths, height_tenths, age, gender)
+    for i, (w, h, a, g) in enumerate(zip(weight_tenths, height_tenths, age, gender)):
+        weight, height = Decimal(int(w)).scaleb(-1), Decimal(int(h)).scaleb(-1)
+        try:
+            expected = recommend_nutrition(weight, height, int(a), int(g))
+        except ValueError:
+            assert not bulk["valid"][i], (w, h, a, g)
+            continue
+        assert bulk["valid"][i], (w, h, a, g)
+        actual = {key: Decimal(int(bulk[key][i])).scaleb(-2) for key in KEYS}
+        assert actual == expected, (w, h, a, g)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_bulk_matches_scalar_on_random_profiles(seed):
+    rng = np.random.default_rng(seed)
+    n = 5000
+    # DECIMAL(4, 1) 범위의 키/몸무게, 음수 BMR이 나오는 고령/저체중 조합도 포함
+    assert_matches_scalar(rng.integers(1, 10000, n), rng.integers(1, 10000, n),
+                          rng.integers(1, 150, n), rng.integers(0, 2, n))
+
+
+def test_bulk_matches_scalar_on_edge_profiles():
+    # 마지막 두 개는 rec_kcal이 음수이면서 정확히 0.005 단위에 걸리는 입력 (0에서 먼 쪽으로 반올림)
+    weight_tenths = [1, 9999, 700, 700, 0, 700, 700, 700, 700, 455, 1, 103, 76]
+    height_tenths = [1, 9999, 1750, 1750, 1750, 0, 1750, 1750, 1750, 1620, 1, 1, 1]
+    age = [1, 1, 36, 36, 36, 36, 0, 36, -1, 29, 149, 103, 136]
+    gender = [0, 1, 0, 1, 0, 1, 0, 2, 1, 1, 0, 0, 1]
+    assert_matches_scalar(weight_tenths, height_tenths, age, gender)
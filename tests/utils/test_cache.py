@@ -0,0 +1,99 @@
+# /tests/utils/test_cache.py
+# TTLCache: 만료(TTL), 최대 크기(LRU) 제거, 조건부 제거와 토큰 캐시 무효화
+from datetime import datetime, timedelta
+import pytest
+from core import security
+from core.security import UserSnapshot, cache_token, invalidate_user_tokens
+from utils import cache
+from utils.cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """utils.cache가 보는 time.monotonic을 직접 움직일 수 있는 시계로 교체"""
+
+    class Clock:
+        now = 1000.0
+
+        def advance(self, seconds: float):
+            self.now += seconds
+
+    fake = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", lambda: fake.now)
+    return fake
+
+
+def user(user_id: int) -> UserSnapshot:
+    now = datetime(2026, 10, 18)
+    return UserSnapshot(id=user_id, age=36, gender=0, height=175, weight=70, birthday=now.date(),
+                        email=f"{user_id}@example.com", nickname="tester", created_at=now, updated_at=now)
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    clock.advance(59)
+    assert cache.get("a") == 1
+    clock.advance(1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_shorter_of_default_and_entry_ttl(clock):
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("short", 1, ttl=10)
+    cache.set("long", 2, ttl=600)
+    clock.advance(10)
+    assert cache.get("short") is None
+    clock.advance(49)
+    assert cache.get("long") == 2
+    clock.advance(1)
+    assert cache.get("long") is None
+
+    # 이미 만료된 값(남은 시간 0 이하)은 저장하지 않음
+    cache.set("expired", 3, ttl=0)
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # a를 최근에 사용한 항목으로 만듦
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_evict_where(clock):
+    cache = TTLCache(maxsize=10, ttl=60)
+    for key in range(6):
+        cache.set(key, key % 3)
+    assert cache.evict_where(lambda value: value == 0) == 2
+    assert sorted(key for key in range(6) if cache.get(key) is not None) == [1, 2, 4, 5]
+    assert cache.evict_where(lambda value: value == 0) == 0
+
+
+def test_invalidate_user_tokens(clock, monkeypatch):
+    monkeypatch.setattr(security, "token_cache", TTLCache(maxsize=10, ttl=60))
+    expires = datetime.utcnow() + timedelta(minutes=30)
+    cache_token("token-1a", user(1), expires)
+    cache_token("token-1b", user(1), expires)
+    cache_token("token-2", user(2), expires)
+
+    assert invalidate_user_tokens(1) == 2
+    assert security.token_cache.get("token-1a") is None
+    assert security.token_cache.get("token-1b") is None
+    assert security.token_cache.get("token-2").id == 2
+
+
+def test_cached_token_does_not_outlive_token_expiry(clock, monkeypatch):
+    monkeypatch.setattr(security, "token_cache", TTLCache(maxsize=10, ttl=60))
+    cache_token("almost-expired", user(1), datetime.utcnow() + timedelta(seconds=5))
+    clock.advance(6)
+    assert security.token_cache.get("almost-expired") is None
+    cache_token("expired", user(1), datetime.utcnow() - timedelta(seconds=1))
+    assert len(security.token_cache) == 0